@@ -4,26 +4,51 @@ POST /api/upload
 Accepts a multipart .tar.gz archive, extracts it, runs all existing Python
 performance data processors from webapp/domains/*, and returns a single JSON
 report object conforming to the ReportData TypeScript interface.
+
+POST /api/jobs          same upload, built in the background; returns a job
+GET  /api/jobs/<id>     job status, per-stage progress and report link
+GET  /api/reports/<id>  finished report JSON
+GET  /api/reports/<id>/series?trace=<id>&from=&to=&max_points=
+                        full-resolution window of a downsampled trace
+GET  /api/reports/<id>/pyramid?table=&series=&stat=&from=&to=&max_points=
+                        window of a pyramid series at the finest level
+                        that fits max_points
+POST /api/reports/<id>/sections/<name>
+                        one section recomputed from the stored capture
+                        with JSON parameters (thresholds, top_n,
+                        resolution, cpus/devices/interfaces); queued with
+                        the report jobs and cached like reports
+
+POST /api/upload?stream=1 (or Accept: application/x-ndjson) streams the report
+as NDJSON, one record per section as soon as that section is ready.
 """
 
+import gzip
+import hashlib
 import json
 import os
 import sys
 import tarfile
-import secrets
-import io
 import shutil
 import re
+import tempfile
+import threading
+import time
 import logging
+from contextlib import closing
 from http.server import BaseHTTPRequestHandler
+from urllib.parse import parse_qs, urlsplit
 
 # ── Path setup ──────────────────────────────────────────────────────────────
 WEBAPP_DIR = os.path.join(os.path.dirname(__file__), '..', 'webapp')
 sys.path.insert(0, WEBAPP_DIR)
 
-import plotly.io as pio
-
+from core.base import BaseDataProcessor
+from core.compression import StreamCompressor, choose_encoding, compress
+from core.scheduler import ScheduledTask, TaskScheduler
 from domains.factory import ProcessorFactory
+from domains.perfanalysis.disk.pyramid import (LEVELS, STATS, X_COLUMN,
+                                               column_name, level_stats)
 from domains.procperf.cpu.top_consumers import extract_top_cpu_consumers
 from domains.procperf.io.top_consumers import extract_top_io_consumers
 from domains.procperf.memory.top_consumers import extract_top_mem_consumers
@@ -33,10 +58,150 @@ from domains.procinfo.pidstat.pidstatmem import generate_pidstatmem, pidstatmem_
 from domains.procinfo.top.topcmd import generate_top
 from domains.procinfo.iotop.iotopcmd import generate_iotop
 from domains.sysconfig.lvm.lvmviz import parse_pvs, parse_vgs, parse_lvs
+from domains.ingest import (MultipartError, extract_capture, open_request_body,
+                            parse_multipart)
+from domains.jobs import DONE, FAILED, QUEUED, Job, JobManager, JobQueueFull
+from domains.serialization import (CompactEncoding, Downsampler, SharedResources,
+                                   dumps_report, figure_to_dict, trace_to_dict,
+                                   window_slice)
+from domains.storage import (CaptureStore, FrameCache, ReportCache, ReportStore,
+                             SeriesStore)
 
 logging.basicConfig(level=logging.WARNING)
 log = logging.getLogger('api.upload')
 
+# Bytes of an uploaded part kept in memory before spilling to a temp file
+UPLOAD_SPOOL_SIZE = int(os.environ.get('UPLOAD_SPOOL_SIZE', 8 * 1024 * 1024))
+
+# Response compression (gzip, or brotli when installed) for bodies of at
+# least COMPRESS_MIN_SIZE bytes; COMPRESS_LEVEL is the gzip level (1-9)
+COMPRESS_MIN_SIZE = int(os.environ.get('COMPRESS_MIN_SIZE', 1024))
+COMPRESS_LEVEL = int(os.environ.get('COMPRESS_LEVEL', 6))
+BROTLI_QUALITY = int(os.environ.get('BROTLI_QUALITY', 5))
+
+# HTTP/1.1 persistent connections: seconds an idle connection waits for its
+# next request (keep it above the load balancer's idle timeout), seconds a
+# read or write may stall within a request, requests served per connection
+# before it is closed (0 = no limit), and seconds browsers may cache a CORS
+# preflight response
+HTTP_KEEPALIVE_TIMEOUT = int(os.environ.get('HTTP_KEEPALIVE_TIMEOUT', 75))
+HTTP_IO_TIMEOUT = int(os.environ.get('HTTP_IO_TIMEOUT', 120))
+HTTP_MAX_KEEPALIVE_REQUESTS = int(os.environ.get('HTTP_MAX_KEEPALIVE_REQUESTS', 1000))
+CORS_MAX_AGE = int(os.environ.get('CORS_MAX_AGE', 86400))
+
+# Worker processes used to compute report sections in parallel
+# (1 = run every section inline in the request thread)
+API_WORKERS = int(os.environ.get('API_WORKERS', 1))
+
+scheduler = TaskScheduler(API_WORKERS, logger=log)
+
+# Bump whenever the report JSON layout changes so cached reports are rebuilt
+REPORT_FORMAT_VERSION = 5
+
+# Figure array encoding: 'compact' (typed arrays at REPORT_FLOAT_DTYPE, x0/dx
+# timestamps, sparse mostly-zero series, repeated templates/layouts/x arrays
+# moved to report['shared']) or 'plain' (plotly's own encoding)
+REPORT_ENCODING = os.environ.get('REPORT_ENCODING', 'compact')
+REPORT_FLOAT_DTYPE = os.environ.get('REPORT_FLOAT_DTYPE', 'f4')
+REPORT_SPARSE_THRESHOLD = float(os.environ.get('REPORT_SPARSE_THRESHOLD', 0.5))
+
+figure_encoding = (CompactEncoding(REPORT_FLOAT_DTYPE, REPORT_SPARSE_THRESHOLD)
+                   if REPORT_ENCODING == 'compact' else None)
+
+# Line traces longer than REPORT_MAX_POINTS are downsampled ('lttb' or
+# 'minmax'; 0 disables); their full data goes to the series store and is
+# served per zoom window, at most SERIES_MAX_POINTS points per request
+REPORT_MAX_POINTS = int(os.environ.get('REPORT_MAX_POINTS', 2000))
+REPORT_DOWNSAMPLE = os.environ.get('REPORT_DOWNSAMPLE', 'lttb')
+SERIES_MAX_POINTS = int(os.environ.get('SERIES_MAX_POINTS', 20000))
+SERIES_STORE_DIR = os.environ.get(
+    'SERIES_STORE_DIR', os.path.join(tempfile.gettempdir(), 'linuxaio-series'))
+SERIES_STORE_MAX_BYTES = int(os.environ.get('SERIES_STORE_MAX_BYTES', 1024 * 1024 * 1024))
+SERIES_STORE_TTL = int(os.environ.get('SERIES_STORE_TTL', 7 * 24 * 3600))
+
+# Budget and window thinning only: series collected while a report is
+# built go to a Downsampler owned by each task (see collect_series)
+downsampler = (Downsampler(REPORT_MAX_POINTS, REPORT_DOWNSAMPLE)
+               if REPORT_MAX_POINTS > 0 else None)
+series_store = SeriesStore(SERIES_STORE_DIR, SERIES_STORE_MAX_BYTES,
+                           SERIES_STORE_TTL, logger=log)
+
+# Finished reports keyed by archive SHA-256 (REPORT_CACHE_MAX_BYTES=0 disables)
+REPORT_CACHE_DIR = os.environ.get(
+    'REPORT_CACHE_DIR', os.path.join(tempfile.gettempdir(), 'linuxaio-report-cache'))
+REPORT_CACHE_MAX_BYTES = int(os.environ.get('REPORT_CACHE_MAX_BYTES', 512 * 1024 * 1024))
+REPORT_CACHE_TTL = int(os.environ.get('REPORT_CACHE_TTL', 7 * 24 * 3600))
+
+report_cache = ReportCache(REPORT_CACHE_DIR, REPORT_CACHE_MAX_BYTES,
+                           REPORT_CACHE_TTL, logger=log)
+
+# Finished reports by report id, gzip-compressed, behind GET
+# /api/reports/<id> so report pages survive reloads and can be shared; the
+# reports of finished jobs are served from here too, so disabling it
+# (REPORT_STORE_MAX_BYTES=0) leaves the job API without results.
+# REPORT_STORE_TTL is the retention.
+REPORT_STORE_DIR = os.environ.get(
+    'REPORT_STORE_DIR', os.path.join(tempfile.gettempdir(), 'linuxaio-reports'))
+REPORT_STORE_MAX_BYTES = int(os.environ.get('REPORT_STORE_MAX_BYTES', 1024 * 1024 * 1024))
+REPORT_STORE_TTL = int(os.environ.get('REPORT_STORE_TTL', 7 * 24 * 3600))
+
+report_store = ReportStore(REPORT_STORE_DIR, REPORT_STORE_MAX_BYTES,
+                           REPORT_STORE_TTL, COMPRESS_LEVEL, logger=log)
+
+# Extracted captures by report id, kept once the report is built so
+# POST /api/reports/<id>/sections/<name> can recompute one section with
+# other parameters (CAPTURE_STORE_MAX_BYTES=0 disables)
+CAPTURE_STORE_DIR = os.environ.get(
+    'CAPTURE_STORE_DIR', os.path.join(tempfile.gettempdir(), 'linuxaio-captures'))
+CAPTURE_STORE_MAX_BYTES = int(os.environ.get('CAPTURE_STORE_MAX_BYTES', 2 * 1024 * 1024 * 1024))
+CAPTURE_STORE_TTL = int(os.environ.get('CAPTURE_STORE_TTL', 7 * 24 * 3600))
+
+capture_store = CaptureStore(CAPTURE_STORE_DIR, CAPTURE_STORE_MAX_BYTES,
+                             CAPTURE_STORE_TTL, logger=log)
+
+# Largest JSON body accepted by the section endpoint
+SECTION_PARAMS_MAX_BYTES = 64 * 1024
+# Seconds a section request waits for its recompute job; past that it gets
+# a 503 and the retry is answered from the report cache once the job is done
+SECTION_TIMEOUT = int(os.environ.get('SECTION_TIMEOUT', 300))
+
+# Parsed processor frames keyed by capture-file contents and processor
+# version, stored as memory-mapped columns so re-analysing a capture skips
+# parsing (PARSED_CACHE_MAX_BYTES=0 disables). Set at import so process-pool
+# workers pick it up too.
+PARSED_CACHE_DIR = os.environ.get(
+    'PARSED_CACHE_DIR', os.path.join(tempfile.gettempdir(), 'linuxaio-parsed'))
+PARSED_CACHE_MAX_BYTES = int(os.environ.get('PARSED_CACHE_MAX_BYTES', 1024 * 1024 * 1024))
+PARSED_CACHE_TTL = int(os.environ.get('PARSED_CACHE_TTL', 7 * 24 * 3600))
+
+BaseDataProcessor.data_cache = FrameCache(PARSED_CACHE_DIR, PARSED_CACHE_MAX_BYTES,
+                                          PARSED_CACHE_TTL, logger=log)
+
+# Background report builds behind POST /api/jobs
+JOB_WORKERS = int(os.environ.get('JOB_WORKERS', 2))
+JOB_QUEUE_SIZE = int(os.environ.get('JOB_QUEUE_SIZE', 16))
+JOB_RETENTION = int(os.environ.get('JOB_RETENTION', 3600))
+# Shared job status/results for multi-process servers (serve.py prefork mode)
+JOB_STATE_DIR = os.environ.get('JOB_STATE_DIR') or None
+
+jobs = JobManager(JOB_WORKERS, JOB_QUEUE_SIZE, JOB_RETENTION,
+                  state_dir=JOB_STATE_DIR, logger=log)
+
+# Capture files read by extract_metadata / extract_sysconfig
+SYSCONFIG_FILES = (
+    'info.txt', 'os-release', 'lscpu.txt', 'lshw.txt', 'dmidecode.txt',
+    'lsscsi.txt', 'lsblk-f.txt', 'df-h.txt', 'ls-l-dev-mapper.txt',
+    'pvs.txt', 'vgs.txt', 'lvs.txt', 'pvdisplay.txt', 'vgdisplay.txt',
+    'lvdisplay.txt', 'meminfo.txt', 'sysctl.txt', 'lsmod.txt',
+    'sestatus.txt', 'apparmor_status.txt',
+)
+
+# Capture files read by extract_process_activity / extract_process_details
+PROCESS_FILES = (
+    'pidstat.txt', 'pidstat-io.txt', 'pidstat-memory.txt', 'top.txt',
+    'iotop.txt',
+)
+
 
 # ── Helpers ──────────────────────────────────────────────────────────────────
 
@@ -50,31 +215,52 @@ def read_safe(path: str) -> str:
     return ''
 
 
-def fig_to_dict(fig) -> dict:
-    return json.loads(pio.to_json(fig))
+# Downsampler of the task running on this thread (see collect_series)
+_task_state = threading.local()
 
 
-def parse_cgi_multipart(handler):
-    """Parse multipart/form-data without cgi module (deprecated in 3.13)."""
-    import email
-    content_type = handler.headers.get('Content-Type', '')
-    content_length = int(handler.headers.get('Content-Length', 0))
-    body = handler.rfile.read(content_length)
+def new_downsampler() -> Downsampler | None:
+    """Downsampler with the report's point budget (None if disabled)."""
+    return (Downsampler(REPORT_MAX_POINTS, REPORT_DOWNSAMPLE)
+            if REPORT_MAX_POINTS > 0 else None)
 
-    # Build a message to let email library parse the multipart body
-    msg_bytes = f'Content-Type: {content_type}\r\n\r\n'.encode() + body
-    msg = email.message_from_bytes(msg_bytes)
 
-    parts = {}
-    for part in msg.walk():
-        cd = part.get('Content-Disposition', '')
-        if not cd:
-            continue
-        params = dict(p.strip().split('=', 1) for p in cd.split(';')[1:] if '=' in p)
-        name = params.get('name', '').strip('"')
-        if name:
-            parts[name] = part.get_payload(decode=True)
-    return parts
+def fig_to_dict(fig, sampler: Downsampler | None = None) -> dict:
+    sampler = sampler or getattr(_task_state, 'sampler', None) or downsampler
+    return figure_to_dict(fig, figure_encoding, sampler)
+
+
+def report_cache_key(archive_hash: str) -> str:
+    return (f'{archive_hash}-v{REPORT_FORMAT_VERSION}-{REPORT_ENCODING}'
+            f'-{REPORT_FLOAT_DTYPE}-{REPORT_DOWNSAMPLE}{REPORT_MAX_POINTS}')
+
+
+def section_cache_key(report_id: str, name: str, params: dict) -> str:
+    """Report cache key of a recomputed section: the report plus the
+    section and its parameters in canonical form."""
+    digest = hashlib.sha256(
+        f'{name}\0{json.dumps(params, sort_keys=True)}'.encode()).hexdigest()
+    return (f'{report_id}-section-{digest[:16]}-v{REPORT_FORMAT_VERSION}'
+            f'-{REPORT_ENCODING}-{REPORT_FLOAT_DTYPE}'
+            f'-{REPORT_DOWNSAMPLE}{REPORT_MAX_POINTS}')
+
+
+def capture_manifest() -> set:
+    """Capture file names that any processor or extractor reads."""
+    return (ProcessorFactory.get_capture_files()
+            | set(SYSCONFIG_FILES) | set(PROCESS_FILES))
+
+
+def parse_cgi_multipart(handler) -> dict:
+    """Stream-parse multipart/form-data into spooled parts (no cgi module).
+
+    Handles both Content-Length and chunked request bodies. File parts are
+    kept in memory up to UPLOAD_SPOOL_SIZE bytes and spill to a temporary
+    file beyond that, so large archives are never held in RAM.
+    """
+    body = open_request_body(handler.rfile, handler.headers)
+    return parse_multipart(body, handler.headers.get('Content-Type', ''),
+                           spool_max_size=UPLOAD_SPOOL_SIZE)
 
 
 # ── Metadata ─────────────────────────────────────────────────────────────────
@@ -153,12 +339,9 @@ def extract_sysconfig(work_dir: str) -> dict:
                     lvm_data[key] = f.read()
         # Structured topology for React diagram
         try:
-            orig = os.getcwd()
-            os.chdir(work_dir)
-            pvs = parse_pvs()   # [(pv_name, vg_name, pv_size, pv_free), ...]
-            vgs = parse_vgs()   # [(vg_name, vg_size, vg_free), ...]
-            lvs = parse_lvs()   # [(lv_name, vg_name, lv_size, lv_type, ...), ...]
-            os.chdir(orig)
+            pvs = parse_pvs(os.path.join(work_dir, 'pvs.txt'))   # [(pv_name, vg_name, pv_size, pv_free), ...]
+            vgs = parse_vgs(os.path.join(work_dir, 'vgs.txt'))   # [(vg_name, vg_size, vg_free), ...]
+            lvs = parse_lvs(lvs_path)                            # [(lv_name, vg_name, lv_size, lv_type, ...), ...]
             lvm_data['topology'] = {
                 'pvs': [{'name': p[0], 'vg': p[1], 'size': p[2], 'free': p[3]} for p in pvs],
                 'vgs': [{'name': v[0], 'size': v[1], 'free': v[2]} for v in vgs],
@@ -166,10 +349,6 @@ def extract_sysconfig(work_dir: str) -> dict:
             }
         except Exception as e:
             log.warning(f'LVM topology parse failed: {e}')
-            try:
-                os.chdir(orig)
-            except Exception:
-                pass
         if lvm_data:
             sc['lvm'] = lvm_data
 
@@ -195,54 +374,74 @@ def extract_sysconfig(work_dir: str) -> dict:
 
 # ── Performance (time-series charts) ─────────────────────────────────────────
 
-def extract_performance(work_dir: str) -> dict:
-    orig = os.getcwd()
-    os.chdir(work_dir)
-    perf = {}
+# (report path, processor type, capture file) for each performance chart set
+PERFORMANCE_SECTIONS = (
+    ('performance.cpu', 'cpu', 'mpstat.txt'),
+    ('performance.memory', 'memory', 'vmstat-data.out'),
+    ('performance.disk.per_device', 'diskiostat', 'iostat-data.out'),
+    ('performance.disk.per_metric', 'diskmetrics', 'iostat-data.out'),
+    ('performance.disk.highres', 'diskhighres', 'diskstats_log.txt'),
+    ('performance.network', 'network', 'sarnetwork.txt'),
+)
 
-    def run_processor(ptype: str, fname: str) -> list:
-        if not os.path.exists(fname):
-            return []
-        try:
-            proc = ProcessorFactory.create_processor(ptype, fname)
-            _, figs = proc.process()
-            return [fig_to_dict(f) for f in figs]
-        except Exception as e:
-            log.warning(f'{ptype} processor failed: {e}')
-            return []
-
-    cpu_figs = run_processor('cpu', 'mpstat.txt')
-    if cpu_figs:
-        perf['cpu'] = {'figures': cpu_figs}
-
-    mem_figs = run_processor('memory', 'vmstat-data.out')
-    if mem_figs:
-        perf['memory'] = {'figures': mem_figs}
-
-    disk = {}
-    pd_figs = run_processor('diskiostat', 'iostat-data.out')
-    pm_figs = run_processor('diskmetrics', 'iostat-data.out')
-    hr_figs = run_processor('diskhighres', 'diskstats_log.txt')
-    if pd_figs:
-        disk['per_device'] = {'figures': pd_figs}
-    if pm_figs:
-        disk['per_metric'] = {'figures': pm_figs}
-    if hr_figs:
-        disk['highres'] = {'figures': hr_figs}
-    if disk:
-        perf['disk'] = disk
-
-    net_figs = run_processor('network', 'sarnetwork.txt')
-    if net_figs:
-        perf['network'] = {'figures': net_figs}
-
-    os.chdir(orig)
-    return perf
+
+# Section key carrying a processor's precomputed tables from the worker to
+# the parent; collect_series removes it before the section is merged
+TABLES_KEY = '_tables'
+
+
+def run_processor(work_dir: str, ptype: str, fname: str, items=None,
+                  sampler: Downsampler | None = None) -> tuple:
+    """Run one processor; returns (figure dicts, its precomputed tables).
+
+    items narrows the figures to some devices, interfaces or CPUs; sampler
+    replaces the report's downsampler (and point budget).
+    """
+    path = os.path.join(work_dir, fname)
+    if not os.path.exists(path):
+        return [], {}
+    try:
+        proc = ProcessorFactory.create_processor(ptype, path)
+        if sampler is not None and hasattr(proc, 'max_points'):
+            # Processors with their own point budget follow the sampler's
+            proc.max_points = sampler.max_points
+        _, figs = proc.process(items)
+        return [fig_to_dict(f, sampler) for f in figs], proc.tables
+    except Exception as e:
+        log.warning(f'{ptype} processor failed: {e}')
+        return [], {}
+
+
+def extract_processor_section(work_dir: str, ptype: str, fname: str, items=None,
+                              sampler: Downsampler | None = None) -> dict:
+    figs, tables = run_processor(work_dir, ptype, fname, items, sampler)
+    if not figs:
+        return {}
+    section = {'figures': figs}
+    if tables:
+        section[TABLES_KEY] = tables
+    return section
+
+
+def performance_tasks(work_dir: str) -> list:
+    return [ScheduledTask(path, extract_processor_section, work_dir, ptype, fname)
+            for path, ptype, fname in PERFORMANCE_SECTIONS]
+
+
+def extract_performance(work_dir: str) -> dict:
+    report = run_report_tasks(performance_tasks(work_dir))
+    return report.get('performance', {})
 
 
 # ── Process Activity (top-N consumer charts) ──────────────────────────────────
 
-def _top_consumers_to_figs(data: dict, metric_keys: list[tuple[str, str]]) -> list:
+# Processes charted per metric (default and upper bound of top_n)
+TOP_N = 10
+MAX_TOP_N = 100
+
+
+def _top_consumers_to_figs(data: dict, metric_keys: list[tuple[str, str]],
+                           top_n: int = TOP_N, sampler: Downsampler | None = None) -> list:
     """Convert top-consumer dicts to Plotly figures."""
     import plotly.graph_objects as go
     figs = []
@@ -261,57 +460,82 @@ def _top_consumers_to_figs(data: dict, metric_keys: list[tuple[str, str]]) -> li
                 hovertemplate=f'<b>{cmd}</b><br>{metric_label}: %{{y:.1f}}<br>%{{x}}<extra></extra>',
             ))
         fig.update_layout(
-            title=f'Top 10 Processes — {metric_label}',
+            title=f'Top {top_n} Processes — {metric_label}',
             xaxis_title='Timestamp',
             yaxis_title=metric_label,
             height=420,
             template='seaborn',
         )
-        figs.append(fig_to_dict(fig))
+        figs.append(fig_to_dict(fig, sampler))
     return figs
 
 
-def extract_process_activity(work_dir: str) -> dict:
-    orig = os.getcwd()
-    os.chdir(work_dir)
-    activity = {}
+# key -> (top-consumer extractor, capture file, log label, [(data key, metric label), ...])
+ACTIVITY_SECTIONS = {
+    'cpu': (extract_top_cpu_consumers, 'pidstat.txt', 'CPU', [
+        ('top_usr', '%usr'), ('top_system', '%system'), ('top_wait', '%wait'),
+    ]),
+    'io': (extract_top_io_consumers, 'pidstat-io.txt', 'IO', [
+        ('top_read', 'kB_rd/s'), ('top_write', 'kB_wr/s'), ('top_iodelay', 'iodelay'),
+    ]),
+    'memory': (extract_top_mem_consumers, 'pidstat-memory.txt', 'Memory', [
+        ('top_mem_pct', '%MEM'), ('top_rss', 'RSS (MB)'), ('top_vsz', 'VSZ (MB)'),
+    ]),
+}
 
-    try:
-        cpu_data = extract_top_cpu_consumers('pidstat.txt')
-        figs = _top_consumers_to_figs(cpu_data, [
-            ('top_usr', '%usr'), ('top_system', '%system'), ('top_wait', '%wait'),
-        ])
-        if figs:
-            activity['cpu'] = {'figures': figs}
-    except Exception as e:
-        log.warning(f'process activity CPU failed: {e}')
 
+def extract_activity_section(work_dir: str, key: str, top_n: int = TOP_N,
+                             sampler: Downsampler | None = None) -> dict:
+    extractor, fname, label, metric_keys = ACTIVITY_SECTIONS[key]
     try:
-        io_data = extract_top_io_consumers('pidstat-io.txt')
-        figs = _top_consumers_to_figs(io_data, [
-            ('top_read', 'kB_rd/s'), ('top_write', 'kB_wr/s'), ('top_iodelay', 'iodelay'),
-        ])
+        data = extractor(os.path.join(work_dir, fname), top_n)
+        figs = _top_consumers_to_figs(data, metric_keys, top_n, sampler)
         if figs:
-            activity['io'] = {'figures': figs}
+            return {'figures': figs}
     except Exception as e:
-        log.warning(f'process activity IO failed: {e}')
+        log.warning(f'process activity {label} failed: {e}')
+    return {}
 
-    try:
-        mem_data = extract_top_mem_consumers('pidstat-memory.txt')
-        figs = _top_consumers_to_figs(mem_data, [
-            ('top_mem_pct', '%MEM'), ('top_rss', 'RSS (MB)'), ('top_vsz', 'VSZ (MB)'),
-        ])
-        if figs:
-            activity['memory'] = {'figures': figs}
-    except Exception as e:
-        log.warning(f'process activity Memory failed: {e}')
 
-    os.chdir(orig)
-    return activity
+def activity_tasks(work_dir: str) -> list:
+    return [ScheduledTask(f'process_activity.{key}', extract_activity_section, work_dir, key)
+            for key in ACTIVITY_SECTIONS]
+
+
+def extract_process_activity(work_dir: str) -> dict:
+    report = run_report_tasks(activity_tasks(work_dir))
+    return report.get('process_activity', {})
 
 
 # ── Process Details (timestamp-chunked snapshots) ─────────────────────────────
 
+# Highlight thresholds of the detail tables: detail key -> column -> levels
+DETAIL_THRESHOLDS = {
+    'pidstat_cpu': {
+        '%usr': {'warn': 50, 'crit': 80},
+        '%system': {'warn': 20, 'crit': 40},
+        '%wait': {'warn': 10, 'crit': 25},
+    },
+    'pidstat_memory': {
+        '%MEM': {'warn': 20, 'crit': 50},
+    },
+    'top': {
+        '%CPU': {'warn': 50, 'crit': 80},
+        '%MEM': {'warn': 20, 'crit': 50},
+    },
+}
+DETAIL_KEYS = ('pidstat_cpu', 'pidstat_io', 'pidstat_memory', 'top', 'iotop')
+THRESHOLD_LEVELS = ('warn', 'crit')
+
+
+def detail_thresholds(overrides: dict | None = None) -> dict:
+    """DETAIL_THRESHOLDS with per-column overrides applied."""
+    thresholds = {key: dict(columns) for key, columns in DETAIL_THRESHOLDS.items()}
+    for key, columns in (overrides or {}).items():
+        thresholds.setdefault(key, {}).update(columns)
+    return thresholds
+
+
 def _parse_chunk_text(header_line: str, chunk_text: str) -> dict:
     """Convert raw pidstat chunk text to {headers, rows}."""
     headers = header_line.split()
@@ -339,73 +563,72 @@ def _chunks_to_response(chunks: dict, header: str, thresholds: dict | None = Non
     return result
 
 
-def extract_process_details(work_dir: str) -> dict:
-    orig = os.getcwd()
-    os.chdir(work_dir)
+def extract_process_details(work_dir: str, thresholds: dict | None = None) -> dict:
     details = {}
+    thresholds = detail_thresholds(thresholds)
+    pidstat_path = os.path.join(work_dir, 'pidstat.txt')
+    pidstat_io_path = os.path.join(work_dir, 'pidstat-io.txt')
+    pidstat_mem_path = os.path.join(work_dir, 'pidstat-memory.txt')
+    top_path = os.path.join(work_dir, 'top.txt')
+    iotop_path = os.path.join(work_dir, 'iotop.txt')
 
     # pidstat CPU
-    if os.path.exists('pidstat.txt'):
+    if os.path.exists(pidstat_path):
         try:
-            header = pidstat_extract_header_line('pidstat.txt')
-            chunks, _, _ = generate_pidstat('pidstat.txt', header)
+            header = pidstat_extract_header_line(pidstat_path)
+            chunks, _, _ = generate_pidstat(pidstat_path, header)
             if chunks:
-                details['pidstat_cpu'] = _chunks_to_response(chunks, header, {
-                    '%usr': {'warn': 50, 'crit': 80},
-                    '%system': {'warn': 20, 'crit': 40},
-                    '%wait': {'warn': 10, 'crit': 25},
-                })
+                details['pidstat_cpu'] = _chunks_to_response(
+                    chunks, header, thresholds.get('pidstat_cpu'))
         except Exception as e:
             log.warning(f'pidstat CPU details failed: {e}')
 
     # pidstat IO
-    if os.path.exists('pidstat-io.txt'):
+    if os.path.exists(pidstat_io_path):
         try:
-            header = pidstatio_extract_header_line('pidstat-io.txt')
-            chunks, _, _ = generate_pidstatio('pidstat-io.txt', header)
+            header = pidstatio_extract_header_line(pidstat_io_path)
+            chunks, _, _ = generate_pidstatio(pidstat_io_path, header)
             if chunks:
-                details['pidstat_io'] = _chunks_to_response(chunks, header)
+                details['pidstat_io'] = _chunks_to_response(
+                    chunks, header, thresholds.get('pidstat_io'))
         except Exception as e:
             log.warning(f'pidstat IO details failed: {e}')
 
     # pidstat Memory
-    if os.path.exists('pidstat-memory.txt'):
+    if os.path.exists(pidstat_mem_path):
         try:
-            header = pidstatmem_extract_header_line('pidstat-memory.txt')
-            chunks, _, _ = generate_pidstatmem('pidstat-memory.txt', header)
+            header = pidstatmem_extract_header_line(pidstat_mem_path)
+            chunks, _, _ = generate_pidstatmem(pidstat_mem_path, header)
             if chunks:
-                details['pidstat_memory'] = _chunks_to_response(chunks, header, {
-                    '%MEM': {'warn': 20, 'crit': 50},
-                })
+                details['pidstat_memory'] = _chunks_to_response(
+                    chunks, header, thresholds.get('pidstat_memory'))
         except Exception as e:
             log.warning(f'pidstat Memory details failed: {e}')
 
     # top
-    if os.path.exists('top.txt'):
+    if os.path.exists(top_path):
         try:
-            chunks_js, timestamps = generate_top('top.txt')
+            chunks_js, timestamps = generate_top(top_path)
             # generate_top returns a JS object string; re-parse the raw file instead
-            chunks = _parse_top_file('top.txt')
+            chunks = _parse_top_file(top_path)
             if chunks:
                 header = 'Timestamp PID USER PR NI VIRT RES SHR S %CPU %MEM TIME+ COMMAND'
-                details['top'] = _chunks_to_response(chunks, header, {
-                    '%CPU': {'warn': 50, 'crit': 80},
-                    '%MEM': {'warn': 20, 'crit': 50},
-                })
+                details['top'] = _chunks_to_response(
+                    chunks, header, thresholds.get('top'))
         except Exception as e:
             log.warning(f'top details failed: {e}')
 
     # iotop
-    if os.path.exists('iotop.txt'):
+    if os.path.exists(iotop_path):
         try:
-            chunks = _parse_iotop_file('iotop.txt')
+            chunks = _parse_iotop_file(iotop_path)
             if chunks:
                 header = 'Timestamp TID PRIO USER DISK_READ DISK_WRITE SWAPIN IO% COMMAND'
-                details['iotop'] = _chunks_to_response(chunks, header)
+                details['iotop'] = _chunks_to_response(
+                    chunks, header, thresholds.get('iotop'))
         except Exception as e:
             log.warning(f'iotop details failed: {e}')
 
-    os.chdir(orig)
     return details
 
 
@@ -487,89 +710,889 @@ def _parse_iotop_file(path: str) -> dict:
     return chunks
 
 
+# ── Report assembly ──────────────────────────────────────────────────────────
+
+def report_tasks(work_dir: str) -> list:
+    """Independent tasks that together produce every report section."""
+    return [
+        ScheduledTask('metadata', extract_metadata, work_dir),
+        ScheduledTask('sysconfig', extract_sysconfig, work_dir),
+        *performance_tasks(work_dir),
+        *activity_tasks(work_dir),
+        ScheduledTask('process_details', extract_process_details, work_dir),
+    ]
+
+
+def merge_section(report: dict, path: str, value) -> None:
+    """Store a section result under its dotted path; empty sections are dropped."""
+    if path == 'metadata':
+        value = value or {}
+    elif not value:
+        return
+    keys = path.split('.')
+    node = report
+    for key in keys[:-1]:
+        node = node.setdefault(key, {})
+    node[keys[-1]] = value
+
+
+def section_value(report: dict, path: str):
+    """Look up a dotted section path in a built report (None if absent)."""
+    node = report
+    for key in path.split('.'):
+        if not isinstance(node, dict) or key not in node:
+            return None
+        node = node[key]
+    return node
+
+
+def collect_series(func, *args) -> tuple:
+    """Task wrapper: run a section extractor and return (section, the
+    full-resolution series it downsampled, the tables its processor
+    precomputed). Runs in the worker, so both travel back to the parent
+    with the section.
+
+    Each task gets its own Downsampler, so tasks of concurrent reports
+    never see each other's series, whichever thread or process runs them.
+    """
+    sampler = new_downsampler()
+    previous = getattr(_task_state, 'sampler', None)
+    _task_state.sampler = sampler
+    try:
+        value = func(*args)
+    finally:
+        _task_state.sampler = previous
+    tables = value.pop(TABLES_KEY, {}) if isinstance(value, dict) else {}
+    series = sampler.take_series() if sampler is not None else {}
+    return value, series, tables
+
+
+def with_series(tasks: list) -> list:
+    return [ScheduledTask(t.key, collect_series, t.func, *t.args) for t in tasks]
+
+
+def store_series(report_id: str | None, result):
+    """Unpack a collect_series result, storing its series and tables under
+    report_id."""
+    if result is None:
+        return None
+    value, series, tables = result
+    if report_id:
+        series_store.put(report_id, series)
+        series_store.put_tables(report_id, tables)
+    return value
+
+
+def new_shared_resources() -> SharedResources | None:
+    """Shared-resource table for one report (compact encoding only)."""
+    return SharedResources() if REPORT_ENCODING == 'compact' else None
+
+
+def merge_results(tasks: list, results: dict, report: dict | None = None,
+                  shared: SharedResources | None = None) -> dict:
+    """Merge task results into a report in declaration order, so the JSON
+    layout does not depend on which task finished first.
+
+    With a shared-resource table, repeated figure blocks are replaced by
+    references and the table is stored as report['shared'].
+    """
+    report = {} if report is None else report
+    for task in tasks:
+        value = results.get(task.key)
+        if shared is not None:
+            value = shared.share_section(value)
+        merge_section(report, task.key, value)
+    if shared is not None and shared.table:
+        report['shared'] = shared.table
+    return report
+
+
+def run_report_tasks(tasks: list, report: dict | None = None,
+                     progress=None) -> dict:
+    """Run tasks on the scheduler and merge results in declaration order.
+
+    progress, if given, is called with each task key as that task finishes.
+    """
+    report_id = (report or {}).get('report_id')
+    results = {}
+    for key, result in scheduler.run(with_series(tasks)):
+        results[key] = store_series(report_id, result)
+        if progress:
+            progress(key)
+    return merge_results(tasks, results, report, new_shared_resources())
+
+
+def build_report(work_dir: str, report_id: str, progress=None) -> dict:
+    return run_report_tasks(report_tasks(work_dir), {'report_id': report_id},
+                            progress)
+
+
+def report_id_for(archive_hash: str) -> str:
+    """Reports are content-addressed: the same archive always gets the same id."""
+    return archive_hash[:16]
+
+
+# Reports built by this process (scripts/serve.py recycles workers by it)
+reports_built = 0
+_reports_built_lock = threading.Lock()
+
+
+def save_report(report_id: str, cache_key: str, body: bytes) -> None:
+    """Keep a finished report for re-uploads (by content) and for
+    reloaded or shared report pages (by id)."""
+    global reports_built
+    report_cache.put(cache_key, body)
+    report_store.put(report_id, body)
+    with _reports_built_lock:
+        reports_built += 1
+
+
+def built_reports() -> int:
+    return reports_built
+
+
+def remember_report(report_id: str, body: bytes) -> None:
+    """Make sure a report served from the cache can also be fetched by id."""
+    if report_store.enabled and not report_store.contains(report_id):
+        report_store.put(report_id, body)
+
+
+def keep_capture(report_id: str, work_dir: str) -> None:
+    """Hand work_dir over to the capture store, or delete it if the store
+    does not take it (disabled, already holding the capture, or failed)."""
+    if not capture_store.put(report_id, work_dir):
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+def run_report_job(job: Job, work_dir: str, cache_key: str) -> str:
+    """Job body: build, cache and store the report, then hand work_dir to
+    the capture store (or drop it if the build fails). The job keeps only
+    the report id; GET /api/reports/<id> serves the report from the store."""
+    try:
+        report = build_report(work_dir, job.id, progress=job.complete_stage)
+        body = dumps_report(report)
+        save_report(job.id, cache_key, body)
+    except BaseException:
+        shutil.rmtree(work_dir, ignore_errors=True)
+        raise
+    keep_capture(job.id, work_dir)
+    return job.id
+
+
+# ── Section recomputation ────────────────────────────────────────────────────
+
+# Request parameter that narrows a processor's section to some of its
+# devices, interfaces or CPUs
+ITEM_FILTERS = {
+    'cpu': 'cpus',
+    'diskiostat': 'devices',
+    'diskmetrics': 'devices',
+    'diskhighres': 'devices',
+    'network': 'interfaces',
+}
+
+
+def _check_params(name: str, params: dict, allowed: set) -> None:
+    unknown = sorted(set(params) - allowed)
+    if unknown:
+        raise ValueError(f"Parameter(s) {', '.join(unknown)} do not apply "
+                         f"to section {name}")
+
+
+def _item_list(params: dict, key: str | None) -> list | None:
+    value = params.get(key) if key else None
+    if value is None:
+        return None
+    if (not isinstance(value, list)
+            or not all(isinstance(item, (str, int)) for item in value)):
+        raise ValueError(f'{key} must be a list of names')
+    return [str(item) for item in value]
+
+
+def _top_n(params: dict) -> int:
+    value = params.get('top_n', TOP_N)
+    if isinstance(value, bool) or not isinstance(value, int) or not 1 <= value <= MAX_TOP_N:
+        raise ValueError(f'top_n must be an integer between 1 and {MAX_TOP_N}')
+    return value
+
+
+def _thresholds(params: dict) -> dict:
+    value = params.get('thresholds', {})
+    if not isinstance(value, dict) or not set(value) <= set(DETAIL_KEYS):
+        raise ValueError(f"thresholds must map {', '.join(DETAIL_KEYS)} "
+                         f"to column thresholds")
+    for key, columns in value.items():
+        if not isinstance(columns, dict):
+            raise ValueError(f'thresholds.{key} must map columns to levels')
+        for column, levels in columns.items():
+            if (not isinstance(levels, dict) or not levels
+                    or not set(levels) <= set(THRESHOLD_LEVELS)
+                    or not all(isinstance(v, (int, float)) and not isinstance(v, bool)
+                               for v in levels.values())):
+                raise ValueError(f"thresholds.{key}.{column} must give numeric "
+                                 f"{' and/or '.join(THRESHOLD_LEVELS)} levels")
+    return value
+
+
+def section_resolution(params: dict) -> int | None:
+    """Requested point budget per trace, if any (ValueError if invalid)."""
+    value = params.get('resolution')
+    if value is None:
+        return None
+    if isinstance(value, bool) or not isinstance(value, int) or not 3 <= value <= SERIES_MAX_POINTS:
+        raise ValueError(f'resolution must be an integer between 3 and {SERIES_MAX_POINTS}')
+    return value
+
+
+def section_task(work_dir: str, name: str, params: dict,
+                 sampler: Downsampler | None = None) -> ScheduledTask:
+    """Task recomputing one report section from a stored capture.
+
+    Args:
+        work_dir: Directory holding the capture files
+        name: Section key as used in the report (e.g. 'performance.network')
+        params: Request parameters: thresholds (process_details), top_n
+            (process_activity.*), cpus/devices/interfaces (performance.*)
+            and resolution (any section with charts)
+        sampler: Downsampler for the section's figures (default: the report's)
+
+    Raises:
+        KeyError: If there is no such section
+        ValueError: If a parameter is invalid or does not apply to it
+    """
+    for path, ptype, fname in PERFORMANCE_SECTIONS:
+        if name == path:
+            item_param = ITEM_FILTERS.get(ptype)
+            _check_params(name, params, {'resolution', item_param})
+            return ScheduledTask(name, extract_processor_section, work_dir, ptype,
+                                 fname, _item_list(params, item_param), sampler)
+    group, _, key = name.partition('.')
+    if group == 'process_activity' and key in ACTIVITY_SECTIONS:
+        _check_params(name, params, {'resolution', 'top_n'})
+        return ScheduledTask(name, extract_activity_section, work_dir, key,
+                             _top_n(params), sampler)
+    if name == 'process_details':
+        _check_params(name, params, {'thresholds'})
+        return ScheduledTask(name, extract_process_details, work_dir,
+                             _thresholds(params))
+    for task in report_tasks(work_dir):
+        if task.key == name:
+            _check_params(name, params, set())
+            return task
+    raise KeyError(name)
+
+
+def run_section_job(job: Job, report_id: str, name: str, params: dict,
+                    task: ScheduledTask, sampler: Downsampler | None,
+                    cache_key: str) -> bytes:
+    """Job body: recompute one section, keep its series and tables for the
+    series and pyramid endpoints, and cache the serialized response."""
+    value = task()
+    tables = value.pop(TABLES_KEY, {}) if isinstance(value, dict) else {}
+    if sampler is not None:
+        series_store.put(report_id, sampler.take_series())
+    if not any(params.get(key) for key in set(ITEM_FILTERS.values())):
+        # Tables of a filtered section only hold some devices; the
+        # stored ones keep serving every figure
+        series_store.put_tables(report_id, tables)
+
+    response = {'report_id': report_id, 'section': name, 'params': params}
+    shared = new_shared_resources()
+    if shared is not None:
+        value = shared.share_section(value)
+        if shared.table:
+            response['shared'] = shared.table
+    response['data'] = value or {}
+    body = dumps_report(response)
+    report_cache.put(cache_key, body)
+    return body
+
+
+class RequestError(Exception):
+    """Client error carrying the HTTP status to respond with."""
+    def __init__(self, status: int, message: str, headers=None):
+        super().__init__(message)
+        self.status = status
+        self.headers = headers
+
+
 # ── Vercel handler ────────────────────────────────────────────────────────────
 
 class handler(BaseHTTPRequestHandler):
+    # Persistent connections: every response is framed by Content-Length,
+    # chunked transfer coding or (for HTTP/1.0 streams) connection close
+    protocol_version = 'HTTP/1.1'
+
     def log_message(self, format, *args):
         pass
 
-    def _send_json(self, data, status=200):
-        body = json.dumps(data).encode('utf-8')
+    # ── Connection management ────────────────────────────────────────────────
+
+    def setup(self):
+        super().setup()
+        self.requests_served = 0
+        self._status = None
+        self._connection_header = False
+
+    def handle_one_request(self):
+        # Between requests the connection is idle: wait HTTP_KEEPALIVE_TIMEOUT
+        # for the next request line and let a draining server close it
+        idle = self.requests_served > 0
+        self.connection.settimeout(HTTP_KEEPALIVE_TIMEOUT if idle else HTTP_IO_TIMEOUT)
+        connection_idle = getattr(self.server, 'connection_idle', None)
+        if idle and connection_idle and not connection_idle(self.connection):
+            self.close_connection = True
+            return
+        try:
+            super().handle_one_request()
+        finally:
+            self._connection_busy()
+
+    def _connection_busy(self):
+        connection_busy = getattr(self.server, 'connection_busy', None)
+        if connection_busy:
+            connection_busy(self.connection)
+
+    def parse_request(self):
+        # The request line is in: from here on, stalls use HTTP_IO_TIMEOUT
+        self._connection_busy()
+        self.connection.settimeout(HTTP_IO_TIMEOUT)
+        if not super().parse_request():
+            return False
+        self.requests_served += 1
+        if HTTP_MAX_KEEPALIVE_REQUESTS and self.requests_served >= HTTP_MAX_KEEPALIVE_REQUESTS:
+            self.close_connection = True
+        return True
+
+    def send_response_only(self, code, message=None):
+        self._status = code
+        self._connection_header = False
+        super().send_response_only(code, message)
+
+    def send_header(self, keyword, value):
+        if keyword.lower() == 'connection':
+            self._connection_header = True
+        super().send_header(keyword, value)
+
+    def end_headers(self):
+        if self._status is not None and self._status >= 200 and not self._connection_header:
+            # A failed POST may have left part of its body unread
+            if self.command == 'POST' and self._status >= 400:
+                self.close_connection = True
+            if getattr(self.server, 'draining', False):
+                self.close_connection = True
+            if self.close_connection:
+                self.send_header('Connection', 'close')
+            else:
+                if self.request_version == 'HTTP/1.0':
+                    self.send_header('Connection', 'keep-alive')
+                self.send_header('Keep-Alive', f'timeout={HTTP_KEEPALIVE_TIMEOUT}')
+        super().end_headers()
+
+    def _send_json(self, data, status=200, headers=None):
+        self._send_json_bytes(dumps_report(data), status, headers)
+
+    def _response_encoding(self, size=None):
+        """Negotiated content coding, or None to send the body as-is."""
+        if size is not None and size < COMPRESS_MIN_SIZE:
+            return None
+        return choose_encoding(self.headers.get('Accept-Encoding'))
+
+    def _send_json_bytes(self, body: bytes, status=200, headers=None):
+        encoding = self._response_encoding(len(body))
+        if encoding:
+            body = compress(body, encoding, COMPRESS_LEVEL, BROTLI_QUALITY)
         self.send_response(status)
         self.send_header('Content-Type', 'application/json')
         self.send_header('Content-Length', str(len(body)))
+        if encoding:
+            self.send_header('Content-Encoding', encoding)
+        self.send_header('Vary', 'Accept-Encoding')
         self.send_header('Access-Control-Allow-Origin', '*')
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
         self.end_headers()
         self.wfile.write(body)
 
+    def _send_stored_report(self, compressed: bytes):
+        """Send a gzip-compressed report as-is, or decompressed to clients
+        that do not accept gzip."""
+        if choose_encoding(self.headers.get('Accept-Encoding'), ['gzip']) != 'gzip':
+            self._send_json_bytes(gzip.decompress(compressed))
+            return
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(compressed)))
+        self.send_header('Content-Encoding', 'gzip')
+        self.send_header('Vary', 'Accept-Encoding')
+        self.send_header('Access-Control-Allow-Origin', '*')
+        self.end_headers()
+        self.wfile.write(compressed)
+
     def do_OPTIONS(self):
         self.send_response(200)
         self.send_header('Access-Control-Allow-Origin', '*')
-        self.send_header('Access-Control-Allow-Methods', 'POST, OPTIONS')
+        self.send_header('Access-Control-Allow-Methods', 'GET, POST, OPTIONS')
         self.send_header('Access-Control-Allow-Headers', 'Content-Type')
+        self.send_header('Access-Control-Max-Age', str(CORS_MAX_AGE))
         self.send_header('Content-Length', '0')
         self.end_headers()
 
-    def do_POST(self):
-        work_dir = None
-        try:
-            parts = parse_cgi_multipart(self)
-            file_data = parts.get('file')
-            if not file_data:
-                self._send_json({'error': 'No file field in form data'}, 400)
-                return
-
-            hex_id = secrets.token_hex(8)
-            work_dir = os.path.join('/tmp', hex_id)
-            os.makedirs(work_dir, exist_ok=True)
+    def _wants_stream(self) -> bool:
+        """Streaming is opt-in: ?stream=1 or Accept: application/x-ndjson."""
+        query = parse_qs(urlsplit(self.path).query)
+        if query.get('stream', ['0'])[0] not in ('', '0', 'false'):
+            return True
+        return 'application/x-ndjson' in self.headers.get('Accept', '')
+
+    def _start_ndjson(self):
+        # No Content-Length: the body is sent in chunks, or delimited by
+        # closing the connection for HTTP/1.0 clients
+        encoding = self._response_encoding()
+        self._chunked = self.request_version == 'HTTP/1.1'
+        self._ndjson_started = True
+        self._stream_compressor = (
+            StreamCompressor(encoding, COMPRESS_LEVEL, BROTLI_QUALITY)
+            if encoding else None)
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/x-ndjson')
+        if encoding:
+            self.send_header('Content-Encoding', encoding)
+        self.send_header('Vary', 'Accept-Encoding')
+        self.send_header('Cache-Control', 'no-cache')
+        self.send_header('X-Accel-Buffering', 'no')
+        self.send_header('Access-Control-Allow-Origin', '*')
+        if self._chunked:
+            self.send_header('Transfer-Encoding', 'chunked')
+        else:
+            self.close_connection = True
+        self.end_headers()
 
+    def _write_stream(self, data: bytes):
+        if not data:
+            # An empty chunk would end the body
+            return
+        if self._chunked:
+            self.wfile.write(b'%x\r\n%s\r\n' % (len(data), data))
+        else:
+            self.wfile.write(data)
+
+    def _send_record(self, record: dict):
+        data = dumps_report(record) + b'\n'
+        if self._stream_compressor:
+            data = self._stream_compressor.compress(data)
+        self._write_stream(data)
+        self.wfile.flush()
+
+    def _end_ndjson(self):
+        if self._stream_compressor:
+            self._write_stream(self._stream_compressor.finish())
+        if self._chunked:
+            self.wfile.write(b'0\r\n\r\n')
+        self.wfile.flush()
+
+    def _stream_cached(self, body: bytes):
+        report = json.loads(body)
+        self._start_ndjson()
+        self._send_record({'section': 'report_id', 'data': report.get('report_id')})
+        for ref_id, value in report.get('shared', {}).items():
+            self._send_record({'section': f'shared.{ref_id}', 'data': value})
+        for task in report_tasks(''):
+            value = section_value(report, task.key)
+            if value is not None:
+                self._send_record({'section': task.key, 'data': value})
+        self._send_record({'done': True})
+        self._end_ndjson()
+
+    def _stream_report(self, work_dir: str, report_id: str, cache_key: str) -> bool:
+        """Send each section as an NDJSON record the moment it is computed.
+
+        Records are {"section": <dotted path>, "data": ...}, followed by
+        {"done": true}, or {"error": ...} if the build fails midway. Shared
+        resources are sent as "shared.<id>" records before the first
+        section that references them.
+
+        Returns True once work_dir has been handed to the capture store;
+        on False it is still the caller's to delete. If the client goes
+        away the build stops; no task is left reading work_dir either way.
+        """
+        self._start_ndjson()
+        tasks = report_tasks(work_dir)
+        shared = new_shared_resources()
+        results = {}
+        try:
+            self._send_record({'section': 'report_id', 'data': report_id})
+            with closing(scheduler.run(with_series(tasks))) as sections:
+                for key, result in sections:
+                    result = store_series(report_id, result)
+                    if shared is not None:
+                        result = shared.share_section(result)
+                        for ref_id in shared.take_new():
+                            self._send_record({'section': f'shared.{ref_id}',
+                                               'data': shared.table[ref_id]})
+                    results[key] = result
+                    if key == 'metadata' or result:
+                        self._send_record({'section': key, 'data': result or {}})
+        except (BrokenPipeError, ConnectionResetError):
+            log.info(f'client left the report stream of {report_id}')
+            self.close_connection = True
+            return False
+        except Exception as e:
+            log.error(f'report stream failed: {e}')
+            try:
+                self._send_record({'error': f'Processing failed: {e}'})
+                self._end_ndjson()
+            except (BrokenPipeError, ConnectionResetError):
+                self.close_connection = True
+            return False
+        report = merge_results(tasks, results, {'report_id': report_id})
+        if shared is not None and shared.table:
+            report['shared'] = shared.table
+        save_report(report_id, cache_key, dumps_report(report))
+        keep_capture(report_id, work_dir)
+        self._send_record({'done': True})
+        self._end_ndjson()
+        return True
+
+    def _read_upload(self, parts: dict):
+        """Parse the form into parts (filled in place) and return the file part."""
+        try:
+            parts.update(parse_cgi_multipart(self))
+        except MultipartError as e:
+            raise RequestError(400, f'Invalid form data: {e}')
+        file_part = parts.get('file')
+        if not file_part or not file_part.size:
+            raise RequestError(400, 'No file field in form data')
+        return file_part
+
+    def _extract_upload(self, file_part) -> str:
+        """Extract the capture into a fresh work dir and return its path."""
+        work_dir = tempfile.mkdtemp(prefix='linuxaio-')
+        try:
+            extract_capture(file_part.file, work_dir, capture_manifest(),
+                            file_part.sha256)
+        except (tarfile.TarError, EOFError) as e:
+            shutil.rmtree(work_dir, ignore_errors=True)
+            raise RequestError(400, f'Invalid tar.gz file: {e}')
+        except BaseException:
+            shutil.rmtree(work_dir, ignore_errors=True)
+            raise
+        return work_dir
+
+    def _store_capture(self, report_id: str, file_part):
+        """Keep the capture of an upload answered from the report cache
+        if it is no longer stored, so its sections can be recomputed."""
+        if not capture_store.enabled or capture_store.contains(report_id):
+            return
+        file_part.file.seek(0)
+        try:
+            work_dir = self._extract_upload(file_part)
+        except RequestError as e:
+            log.warning(f'capture store extraction failed: {e}')
+            return
+        keep_capture(report_id, work_dir)
+
+    def _job_status(self, job: Job) -> dict:
+        status = job.to_dict()
+        status['status_url'] = f'/api/jobs/{job.id}'
+        if job.status == QUEUED:
+            status['queue_position'] = jobs.position(job)
+        if job.status == DONE:
+            status['report_url'] = f'/api/reports/{job.id}'
+        return status
+
+    def _get_series(self, report_id: str):
+        """GET /api/reports/<id>/series: one downsampled trace at full
+        resolution (or thinned to max_points) between from and to."""
+        query = parse_qs(urlsplit(self.path).query)
+
+        def param(name):
+            return query.get(name, [None])[0] or None
+
+        trace = param('trace')
+        if not trace or not re.fullmatch(r'[0-9a-f]+', trace):
+            raise RequestError(400, 'Missing or invalid trace parameter')
+        try:
+            max_points = min(int(param('max_points') or SERIES_MAX_POINTS),
+                             SERIES_MAX_POINTS)
+        except ValueError:
+            raise RequestError(400, 'Invalid max_points parameter')
+        series = series_store.load(report_id, trace)
+        if series is None:
+            raise RequestError(404, f'Unknown series {trace} for report {report_id}')
+        try:
+            x, y = (downsampler or Downsampler()).window(
+                *series, param('from'), param('to'), max(max_points, 3))
+        except ValueError as e:
+            raise RequestError(400, f'Invalid range: {e}')
+        self._send_json({
+            'report_id': report_id,
+            'trace': trace,
+            'total': int(len(series[1])),
+            'data': trace_to_dict({'x': x, 'y': y}, figure_encoding),
+        })
+
+    def _get_pyramid(self, report_id: str):
+        """GET /api/reports/<id>/pyramid: one series of a resolution
+        pyramid between from and to, at the finest level that fits in
+        max_points. 'stat' in the response is the statistic actually
+        served, which differs from the requested one at the raw level."""
+        query = parse_qs(urlsplit(self.path).query)
+
+        def param(name):
+            return query.get(name, [None])[0] or None
+
+        table, series = param('table'), param('series')
+        stat = param('stat') or 'mean'
+        if not table or not re.fullmatch(r'[A-Za-z0-9_-]+', table):
+            raise RequestError(400, 'Missing or invalid table parameter')
+        if not series or stat not in STATS:
+            raise RequestError(400, 'Missing series or invalid stat parameter')
+        try:
+            max_points = min(int(param('max_points') or SERIES_MAX_POINTS),
+                             SERIES_MAX_POINTS)
+        except ValueError:
+            raise RequestError(400, 'Invalid max_points parameter')
+
+        for level in LEVELS:
+            columns = series_store.load_columns(
+                report_id, f'{table}.{level}', [X_COLUMN])
+            if columns is None:
+                raise RequestError(404, f'Unknown table {table} for report {report_id}')
             try:
-                with tarfile.open(fileobj=io.BytesIO(file_data), mode='r:gz') as tar:
-                    safe_members = []
-                    for m in tar.getmembers():
-                        m.name = re.sub(r'^(/|\.\./?)+', '', m.name)
-                        if m.name:
-                            safe_members.append(m)
-                    tar.extractall(path=work_dir, members=safe_members, filter='data')
-            except tarfile.TarError as e:
-                self._send_json({'error': f'Invalid tar.gz file: {e}'}, 400)
+                window = window_slice(columns[X_COLUMN], param('from'), param('to'))
+            except ValueError as e:
+                raise RequestError(400, f'Invalid range: {e}')
+            if window.stop - window.start <= max_points:
+                break
+        # The raw level stores each sample once, as 'mean' (a bucket of one
+        # sample has the same mean, max and p99); report what was served
+        served = stat if stat in level_stats(level) else 'mean'
+        name = column_name(series, served)
+        values = series_store.load_columns(report_id, f'{table}.{level}', [name])
+        if values is None:
+            raise RequestError(404, f'Unknown series {series} in table {table}')
+        self._send_json({
+            'report_id': report_id,
+            'series': series,
+            'stat': served,
+            'requested_stat': stat,
+            'level': level,
+            'data': trace_to_dict({'x': columns[X_COLUMN][window],
+                                   'y': values[name][window]}, figure_encoding),
+        })
+
+    def _read_json_params(self) -> dict:
+        """Parse a JSON object request body (an empty body is {})."""
+        try:
+            body = open_request_body(self.rfile, self.headers).read(
+                SECTION_PARAMS_MAX_BYTES + 1)
+        except MultipartError as e:
+            raise RequestError(400, str(e))
+        if len(body) > SECTION_PARAMS_MAX_BYTES:
+            raise RequestError(413, 'Request body too large')
+        if not body.strip():
+            return {}
+        try:
+            params = json.loads(body)
+        except ValueError as e:
+            raise RequestError(400, f'Invalid JSON body: {e}')
+        if not isinstance(params, dict):
+            raise RequestError(400, 'JSON body must be an object')
+        return params
+
+    def _post_section(self, report_id: str, name: str):
+        """POST /api/reports/<id>/sections/<name>: recompute one report
+        section from the stored capture with the parameters in the JSON
+        body, without touching the stored report.
+
+        The recompute runs as a job, so it shares the report builds' workers
+        and queue limit; identical requests share one job, and repeats are
+        answered from the report cache."""
+        params = self._read_json_params()
+        cache_key = section_cache_key(report_id, name, params)
+        cached = report_cache.get(cache_key)
+        if cached is not None:
+            self._send_json_bytes(cached, headers={'X-Report-Cache': 'hit'})
+            return
+        capture_dir = capture_store.path(report_id)
+        if capture_dir is None:
+            raise RequestError(404, f'No stored capture for report {report_id}; '
+                                    f'upload the archive again')
+        try:
+            resolution = section_resolution(params)
+            sampler = (Downsampler(resolution, REPORT_DOWNSAMPLE) if resolution
+                       else new_downsampler())
+            task = section_task(capture_dir, name, params, sampler)
+        except KeyError:
+            raise RequestError(404, f'Unknown section {name}')
+        except ValueError as e:
+            raise RequestError(400, str(e))
+
+        started = time.perf_counter()
+        try:
+            job, _ = jobs.get_or_submit(cache_key, run_section_job, report_id,
+                                        name, params, task, sampler, cache_key)
+        except JobQueueFull as e:
+            raise RequestError(503, str(e), {'Retry-After': '30'})
+        if not jobs.wait(job, SECTION_TIMEOUT):
+            raise RequestError(503, f'Section {name} is still being computed',
+                               {'Retry-After': '30'})
+        jobs.forget(job)
+        if job.status == FAILED:
+            raise RequestError(500, f'Processing failed: {job.error}')
+        elapsed = (time.perf_counter() - started) * 1000
+        self._send_json_bytes(job.result, headers={
+            'X-Report-Cache': 'miss',
+            'Server-Timing': f'section;dur={elapsed:.1f}'})
+
+    def do_GET(self):
+        path = self.path.split('?')[0].rstrip('/')
+        m = re.fullmatch(r'/api/reports/([0-9a-f]+)/(series|pyramid)', path)
+        if m:
+            report_id, kind = m.groups()
+            try:
+                if kind == 'series':
+                    self._get_series(report_id)
+                else:
+                    self._get_pyramid(report_id)
+            except RequestError as e:
+                self._send_json({'error': str(e)}, e.status, e.headers)
+            return
+        if path == '/api/jobs':
+            # Capability probe: clients use the job API only where it exists
+            self._send_json({'jobs': True, 'max_queue': jobs.max_queue})
+            return
+        m = re.fullmatch(r'/api/(jobs|reports)/([0-9a-f]+)', path)
+        if not m:
+            self._send_json({'error': 'Not found'}, 404)
+            return
+        kind, job_id = m.groups()
+        job = jobs.get(job_id)
+        if kind == 'reports' and (job is None or job.status == DONE):
+            stored = report_store.get_compressed(job_id)
+            if stored is not None:
+                self._send_stored_report(stored)
                 return
+        if job is None:
+            self._send_json({'error': f'Unknown {kind[:-1]} {job_id}'}, 404)
+        elif kind == 'jobs':
+            self._send_json(self._job_status(job))
+        elif job.status == DONE:
+            self._send_json({'error': f'Report {job_id} is no longer stored; '
+                                      f'upload the archive again'}, 410)
+        elif job.status == FAILED:
+            self._send_json({'error': f'Processing failed: {job.error}'}, 500)
+        else:
+            self._send_json({'error': 'Report is not ready yet',
+                             'status_url': f'/api/jobs/{job_id}'}, 409)
 
-            # Flatten single-subdir archives
-            entries = os.listdir(work_dir)
-            if len(entries) == 1 and os.path.isdir(sub := os.path.join(work_dir, entries[0])):
-                for item in os.listdir(sub):
-                    src = os.path.join(sub, item)
-                    dst = os.path.join(work_dir, item)
-                    if not os.path.exists(dst):
-                        shutil.move(src, dst)
-                shutil.rmtree(sub, ignore_errors=True)
-
-            report: dict = {'report_id': hex_id}
-            report['metadata'] = extract_metadata(work_dir)
-
-            sc = extract_sysconfig(work_dir)
-            if sc:
-                report['sysconfig'] = sc
-
-            perf = extract_performance(work_dir)
-            if perf:
-                report['performance'] = perf
-
-            activity = extract_process_activity(work_dir)
-            if activity:
-                report['process_activity'] = activity
-
-            details = extract_process_details(work_dir)
-            if details:
-                report['process_details'] = details
+    def do_POST(self):
+        path = self.path.split('?')[0].rstrip('/')
+        m = re.fullmatch(r'/api/reports/([0-9a-f]+)/sections/([A-Za-z0-9_.]+)', path)
+        if m:
+            try:
+                self._post_section(*m.groups())
+            except RequestError as e:
+                self._send_json({'error': str(e)}, e.status, e.headers)
+            except Exception as e:
+                import traceback
+                log.error(traceback.format_exc())
+                self._send_json({'error': f'Processing failed: {e}'}, 500)
+        elif path == '/api/jobs':
+            self._post_job()
+        else:
+            self._post_upload()
+
+    def _post_job(self):
+        """POST /api/jobs: accept the capture and build the report in the background."""
+        parts = {}
+        try:
+            file_part = self._read_upload(parts)
+            report_id = report_id_for(file_part.sha256)
+            cache_key = report_cache_key(file_part.sha256)
+
+            job = jobs.get(report_id)
+            if job is None or job.status == FAILED:
+                cached = report_cache.get(cache_key)
+                if cached is not None:
+                    remember_report(report_id, cached)
+                    self._store_capture(report_id, file_part)
+                    job = jobs.add_finished(report_id, report_id)
+                else:
+                    work_dir = self._extract_upload(file_part)
+                    try:
+                        job, submitted = jobs.get_or_submit(
+                            report_id, run_report_job, work_dir, cache_key,
+                            stages=[t.key for t in report_tasks(work_dir)])
+                    except JobQueueFull as e:
+                        shutil.rmtree(work_dir, ignore_errors=True)
+                        raise RequestError(503, str(e), {'Retry-After': '30'})
+                    if not submitted:
+                        # A concurrent upload of the same archive got there first
+                        shutil.rmtree(work_dir, ignore_errors=True)
+            self._send_json(self._job_status(job), 202)
+
+        except RequestError as e:
+            self._send_json({'error': str(e)}, e.status, e.headers)
+        except Exception as e:
+            import traceback
+            log.error(traceback.format_exc())
+            self._send_json({'error': f'Processing failed: {e}'}, 500)
+        finally:
+            for part in parts.values():
+                part.close()
 
-            self._send_json(report)
+    def _post_upload(self):
+        """POST /api/upload: build the report within the request."""
+        work_dir = None
+        parts = {}
+        # Once a stream has begun, errors can no longer change the status
+        self._ndjson_started = False
+        try:
+            file_part = self._read_upload(parts)
+
+            # Same archive bytes -> same report; skip extraction entirely
+            report_id = report_id_for(file_part.sha256)
+            cache_key = report_cache_key(file_part.sha256)
+            cached = report_cache.get(cache_key)
+            if cached is not None:
+                remember_report(report_id, cached)
+                if self._wants_stream():
+                    self._stream_cached(cached)
+                else:
+                    self._send_json_bytes(cached, headers={'X-Report-Cache': 'hit'})
+                self._store_capture(report_id, file_part)
+                return
 
+            work_dir = self._extract_upload(file_part)
+            if self._wants_stream():
+                if self._stream_report(work_dir, report_id, cache_key):
+                    work_dir = None
+                return
+            report = build_report(work_dir, report_id)
+            body = dumps_report(report)
+            save_report(report_id, cache_key, body)
+            keep_capture(report_id, work_dir)
+            work_dir = None
+            self._send_json_bytes(body, headers={'X-Report-Cache': 'miss'})
+
+        except (BrokenPipeError, ConnectionResetError):
+            log.info('client disconnected before the report was sent')
+            self.close_connection = True
+        except RequestError as e:
+            self._send_json({'error': str(e)}, e.status, e.headers)
         except Exception as e:
             import traceback
             log.error(traceback.format_exc())
-            self._send_json({'error': f'Processing failed: {e}'}, 500)
+            if self._ndjson_started:
+                # The 200 and part of the body are already on the wire
+                self.close_connection = True
+            else:
+                self._send_json({'error': f'Processing failed: {e}'}, 500)
         finally:
-            if work_dir and os.path.exists(work_dir):
+            for part in parts.values():
+                part.close()
+            # Still ours unless it was handed to the capture store
+            if work_dir:
                 shutil.rmtree(work_dir, ignore_errors=True)
@@ -10,6 +10,7 @@ export default function App() {
       <Routes>
         <Route path="/" element={<Upload />} />
         <Route path="/report" element={<Report />} />
+        <Route path="/report/:reportId" element={<Report />} />
       </Routes>
     </BrowserRouter>
   );
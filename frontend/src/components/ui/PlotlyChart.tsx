@@ -1,12 +1,116 @@
 import { useEffect, useRef } from 'react';
 import Plotly from 'plotly.js-dist-min';
 import type { PlotlyFigure } from '../../types/report';
+import { getReportData } from '../../store/reportStore';
 
 interface Props {
   figure: PlotlyFigure;
   className?: string;
 }
 
+// ── Compact array decoding ────────────────────────────────────────────────
+// The API sends numeric arrays as plotly.js typed-array specs ({dtype, bdata}),
+// which Plotly reads natively, and mostly-zero series as
+// {sparse: {length, index, values}}, which are expanded here.
+
+type TypedSpec = { dtype: string; bdata: string };
+type SparseSpec = { sparse: { length: number; index: TypedSpec | number[]; values: TypedSpec | number[] } };
+
+const TYPED_ARRAYS: Record<string, { new (buffer: ArrayBuffer): ArrayLike<number> }> = {
+  i1: Int8Array, u1: Uint8Array, i2: Int16Array, u2: Uint16Array,
+  i4: Int32Array, u4: Uint32Array, f4: Float32Array, f8: Float64Array,
+};
+
+function decodeTyped(value: TypedSpec | number[]): ArrayLike<number> {
+  if (Array.isArray(value)) return value;
+  const raw = atob(value.bdata);
+  const bytes = new Uint8Array(raw.length);
+  for (let i = 0; i < raw.length; i++) bytes[i] = raw.charCodeAt(i);
+  return new TYPED_ARRAYS[value.dtype](bytes.buffer);
+}
+
+function isSparse(value: unknown): value is SparseSpec {
+  return typeof value === 'object' && value !== null && 'sparse' in value;
+}
+
+function expandSparse({ sparse }: SparseSpec): Float64Array {
+  const out = new Float64Array(sparse.length);
+  const index = decodeTyped(sparse.index);
+  const values = decodeTyped(sparse.values);
+  for (let i = 0; i < index.length; i++) out[index[i]] = values[i];
+  return out;
+}
+
+function decodeTraces(data: object[]): Plotly.Data[] {
+  return data.map(trace => {
+    const t = trace as Record<string, unknown>;
+    if (!isSparse(t.x) && !isSparse(t.y)) return trace as Plotly.Data;
+    return {
+      ...t,
+      ...(isSparse(t.x) ? { x: expandSparse(t.x) } : {}),
+      ...(isSparse(t.y) ? { y: expandSparse(t.y) } : {}),
+    } as Plotly.Data;
+  });
+}
+
+// ── Zoom to full resolution ───────────────────────────────────────────────
+// Long traces arrive downsampled (meta.downsampled = {id, total}) or as one
+// level of a resolution pyramid (meta.pyramid = {table, series, stat}); when
+// the x range is zoomed, the visible window is fetched from
+// /api/reports/<id>/series or /pyramid at up to SERIES_POINTS points and
+// restyled in.
+
+const SERIES_POINTS = 5000;
+
+type Downsampled = { id: string; total: number; method: string };
+type PyramidInfo = { table: string; series: string; stat: string; level: string };
+type XY = { x: ArrayLike<unknown>; y: ArrayLike<unknown> };
+
+// Endpoint and query of a trace's full-resolution source, if it has one
+function zoomSource(trace: object): [string, Record<string, string>] | undefined {
+  const meta = (trace as { meta?: { downsampled?: Downsampled; pyramid?: PyramidInfo } }).meta;
+  if (meta?.downsampled) return ['series', { trace: meta.downsampled.id }];
+  if (meta?.pyramid) {
+    const { table, series, stat } = meta.pyramid;
+    return ['pyramid', { table, series, stat }];
+  }
+  return undefined;
+}
+
+function decodeArray(value: unknown): ArrayLike<unknown> {
+  if (isSparse(value)) return expandSparse(value);
+  if (typeof value === 'object' && value !== null && 'bdata' in value) return decodeTyped(value as TypedSpec);
+  return (value ?? []) as ArrayLike<unknown>;
+}
+
+// Explicit x/y arrays of a trace (x0/dx expanded), as Plotly.restyle needs
+function traceArrays(trace: Record<string, unknown>): XY {
+  const y = decodeArray(trace.y);
+  if (trace.x !== undefined) return { x: decodeArray(trace.x), y };
+  const x0 = Date.parse(`${trace.x0}Z`);
+  const dx = Number(trace.dx);
+  return { x: Float64Array.from({ length: y.length }, (_, i) => x0 + i * dx), y };
+}
+
+async function fetchWindow(
+  reportId: string, [endpoint, query]: [string, Record<string, string>], from: unknown, to: unknown,
+): Promise<XY> {
+  const params = new URLSearchParams({
+    ...query, from: String(from), to: String(to), max_points: String(SERIES_POINTS),
+  });
+  const res = await fetch(`/api/reports/${reportId}/${endpoint}?${params}`);
+  if (!res.ok) throw new Error(`${endpoint} ${params}: HTTP ${res.status}`);
+  const body = await res.json() as { data: Record<string, unknown> };
+  return traceArrays(body.data);
+}
+
+function xRange(event: Record<string, unknown>): [unknown, unknown] | null | undefined {
+  if (event['xaxis.autorange']) return null;
+  if ('xaxis.range[0]' in event) return [event['xaxis.range[0]'], event['xaxis.range[1]']];
+  const range = event['xaxis.range'];
+  return Array.isArray(range) ? [range[0], range[1]] : undefined;
+}
+
 function getCSSVar(name: string): string {
   return getComputedStyle(document.documentElement).getPropertyValue(name).trim();
 }
@@ -66,7 +170,32 @@ export default function PlotlyChart({ figure, className }: Props) {
   // Re-render when figure changes OR when theme changes (listen for data-theme mutations)
   useEffect(() => {
     if (!ref.current) return;
-    Plotly.newPlot(ref.current, figure.data as Plotly.Data[], buildLayout(figure), CONFIG);
+    const data = decodeTraces(figure.data);
+    Plotly.newPlot(ref.current, data, buildLayout(figure), CONFIG);
+
+    const plot = ref.current as Plotly.PlotlyHTMLElement;
+    const reportId = getReportData()?.report_id;
+    const zoomable = data.flatMap((trace, i) => {
+      const source = zoomSource(trace);
+      return source ? [{ index: i, source, initial: traceArrays(trace as Record<string, unknown>) }] : [];
+    });
+    let zoomRequest = 0;
+    if (reportId && zoomable.length) {
+      plot.on('plotly_relayout', event => {
+        const range = xRange(event as Record<string, unknown>);
+        if (range === undefined) return;
+        const request = ++zoomRequest;
+        const windows = range === null
+          ? Promise.resolve(zoomable.map(z => z.initial))
+          : Promise.all(zoomable.map(z => fetchWindow(reportId, z.source, range[0], range[1])));
+        windows.then(xy => {
+          if (request !== zoomRequest || !ref.current) return;
+          Plotly.restyle(ref.current, {
+            x: xy.map(w => w.x), y: xy.map(w => w.y),
+          } as unknown as Plotly.Data, zoomable.map(z => z.index));
+        }).catch(err => console.warn('Full-resolution zoom unavailable:', err));
+      });
+    }
 
     const resizeObs = new ResizeObserver(() => {
       if (ref.current) Plotly.Plots.resize(ref.current);
@@ -76,13 +205,14 @@ export default function PlotlyChart({ figure, className }: Props) {
     // Redraw when theme toggle changes data-theme on <html>
     const themeObs = new MutationObserver(() => {
       if (ref.current)
-        Plotly.react(ref.current, figure.data as Plotly.Data[], buildLayout(figure), CONFIG);
+        Plotly.react(ref.current, data, buildLayout(figure), CONFIG);
     });
     themeObs.observe(document.documentElement, { attributes: true, attributeFilter: ['data-theme'] });
 
     return () => {
       resizeObs.disconnect();
       themeObs.disconnect();
+      zoomRequest++;
       if (ref.current) Plotly.purge(ref.current);
     };
   }, [figure]);
@@ -1,28 +1,95 @@
 import { useState } from 'react';
-import type { ReportData } from '../types/report';
+import type { JobStatus, ReportData } from '../types/report';
 
 type UploadState =
   | { status: 'idle' }
-  | { status: 'uploading'; progress: number }
+  | { status: 'uploading'; progress: number; label?: string }
   | { status: 'done'; data: ReportData }
   | { status: 'error'; message: string };
 
+const POLL_INTERVAL_MS = 1000;
+
+function sleep(ms: number) {
+  return new Promise(resolve => setTimeout(resolve, ms));
+}
+
+// Whether the server has the background job API, probed once per page
+// load: serverless deployments only have the blocking upload endpoint, and
+// the archive should be sent once, to the endpoint that exists
+let jobsSupported: Promise<boolean> | null = null;
+
+function hasJobApi(): Promise<boolean> {
+  if (!jobsSupported) {
+    jobsSupported = fetch('/api/jobs', { method: 'GET' })
+      .then(res => res.ok)
+      .catch(() => false);
+  }
+  return jobsSupported;
+}
+
+function jobLabel(job: JobStatus): string {
+  if (job.status === 'queued') {
+    return job.queue_position
+      ? `Queued — position ${job.queue_position}...`
+      : 'Queued...';
+  }
+  const { completed, total } = job.progress;
+  return `Processing archive — ${completed}/${total} sections done...`;
+}
+
 export function useUpload() {
   const [state, setState] = useState<UploadState>({ status: 'idle' });
 
+  async function fetchReport(url: string, init?: RequestInit) {
+    const res = await fetch(url, init);
+    const json = await res.json();
+    if (!res.ok || json.error) {
+      setState({ status: 'error', message: json.error ?? `HTTP ${res.status}` });
+      return;
+    }
+    setState({ status: 'done', data: json });
+  }
+
   async function upload(file: File) {
     setState({ status: 'uploading', progress: 0 });
     const form = new FormData();
     form.append('file', file);
 
     try {
-      const res = await fetch('/api/upload', { method: 'POST', body: form });
-      const json = await res.json();
-      if (!res.ok || json.error) {
-        setState({ status: 'error', message: json.error ?? `HTTP ${res.status}` });
+      // Background job API (long-running server); deployments without it
+      // (serverless) use the blocking upload endpoint.
+      if (!(await hasJobApi())) {
+        await fetchReport('/api/upload', { method: 'POST', body: form });
+        return;
+      }
+      const res = await fetch('/api/jobs', { method: 'POST', body: form });
+      let job: JobStatus = await res.json();
+      if (!res.ok) {
+        setState({ status: 'error', message: job.error ?? `HTTP ${res.status}` });
+        return;
+      }
+
+      while (job.status === 'queued' || job.status === 'running') {
+        const { completed, total } = job.progress;
+        setState({
+          status: 'uploading',
+          progress: total ? completed / total : 0,
+          label: jobLabel(job),
+        });
+        await sleep(POLL_INTERVAL_MS);
+        const poll = await fetch(job.status_url);
+        job = await poll.json();
+        if (!poll.ok) {
+          setState({ status: 'error', message: job.error ?? `HTTP ${poll.status}` });
+          return;
+        }
+      }
+
+      if (job.status === 'failed' || !job.report_url) {
+        setState({ status: 'error', message: job.error ?? 'Processing failed' });
         return;
       }
-      setState({ status: 'done', data: json });
+      await fetchReport(job.report_url);
     } catch (e) {
       setState({ status: 'error', message: (e as Error).message });
     }
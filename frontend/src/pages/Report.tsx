@@ -1,9 +1,10 @@
-import { useState } from 'react';
-import { Navigate } from 'react-router-dom';
+import { useEffect, useState } from 'react';
+import { Navigate, useParams } from 'react-router-dom';
 import type { ReportData } from '../types/report';
-import { getReportData } from '../store/reportStore';
+import { getReportData, loadReport } from '../store/reportStore';
 import Header from '../components/layout/Header';
 import Footer from '../components/layout/Footer';
+import Spinner from '../components/ui/Spinner';
 import SysConfigTab from '../components/report/sysconfig/SysConfigTab';
 import PerformanceTab from '../components/report/performance/PerformanceTab';
 import ProcessActivityTab from '../components/report/process_activity/ProcessActivityTab';
@@ -19,10 +20,37 @@ const MAIN_TABS = [
 ];
 
 export default function Report() {
-  const data = getReportData() as ReportData | null;
+  const { reportId } = useParams();
+  const [data, setData] = useState<ReportData | null>(() => {
+    const current = getReportData();
+    return current && (!reportId || current.report_id === reportId) ? current : null;
+  });
+  const [loadError, setLoadError] = useState<string | null>(null);
   const [activeTab, setActiveTab] = useState('sysconfig');
 
-  if (!data) return <Navigate to="/" replace />;
+  // Reloaded page or shared link: fetch the report from the server
+  useEffect(() => {
+    if (data || !reportId) return;
+    let cancelled = false;
+    loadReport(reportId).then(
+      report => { if (!cancelled) setData(report); },
+      err => { if (!cancelled) setLoadError((err as Error).message); },
+    );
+    return () => { cancelled = true; };
+  }, [data, reportId]);
+
+  if (!data && (!reportId || loadError)) return <Navigate to="/" replace />;
+  if (!data) {
+    return (
+      <div className="min-h-screen flex flex-col" style={{ background: 'var(--bg-base)' }}>
+        <Header />
+        <main className="flex-1 flex items-center justify-center">
+          <Spinner label="Loading report..." />
+        </main>
+        <Footer />
+      </div>
+    );
+  }
 
   const tabs = MAIN_TABS.map(t => ({
     ...t,
@@ -24,7 +24,7 @@ export default function Upload() {
   useEffect(() => {
     if (state.status === 'done') {
       setReportData(state.data);   // store in memory — no size limit
-      navigate('/report');
+      navigate(state.data.report_id ? `/report/${state.data.report_id}` : '/report');
     }
   }, [state, navigate]);
 
@@ -73,7 +73,7 @@ export default function Upload() {
               className="upload-panel rounded-2xl p-12"
               style={{ background: 'var(--bg-surface)', border: '1px solid var(--border)' }}
             >
-              <Spinner label="Processing archive — this may take up to 60 seconds..." />
+              <Spinner label={state.label ?? 'Processing archive — this may take up to 60 seconds...'} />
             </div>
           ) : (
             <div
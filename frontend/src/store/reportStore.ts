@@ -1,9 +1,77 @@
 import type { ReportData } from '../types/report';
 
 // Module-level store — no size limit, no serialization.
-// Data lives for the browser session; cleared on page reload (user must re-upload).
+// Data lives for the browser session; after a reload (or when a shared
+// /report/<id> link is opened) it is fetched again from the server's report
+// store with loadReport().
 let _data: ReportData | null = null;
 
-export function setReportData(data: ReportData) { _data = data; }
+// Repeated figure blocks (templates, common layouts, x arrays) arrive once in
+// report.shared and are referenced from figures as {"$ref": id}. Each
+// reference gets its own copy because Plotly writes into layout objects.
+function resolveShared(value: unknown, shared: Record<string, unknown>): unknown {
+  if (Array.isArray(value)) return value.map(v => resolveShared(v, shared));
+  if (typeof value !== 'object' || value === null) return value;
+  const obj = value as Record<string, unknown>;
+  const ref = obj.$ref;
+  if (typeof ref === 'string' && Object.keys(obj).length === 1 && ref in shared) {
+    return structuredClone(shared[ref]);
+  }
+  const out: Record<string, unknown> = {};
+  for (const [k, v] of Object.entries(obj)) out[k] = resolveShared(v, shared);
+  return out;
+}
+
+export function setReportData(data: ReportData) {
+  if (data.shared) {
+    const { shared, ...rest } = data;
+    _data = resolveShared(rest, shared) as ReportData;
+  } else {
+    _data = data;
+  }
+}
 export function getReportData(): ReportData | null { return _data; }
 export function clearReportData() { _data = null; }
+
+// Fetch a stored report by id (GET /api/reports/<id>) into the store
+export async function loadReport(reportId: string): Promise<ReportData> {
+  if (_data?.report_id === reportId) return _data;
+  const res = await fetch(`/api/reports/${encodeURIComponent(reportId)}`);
+  const json = await res.json() as ReportData;
+  if (!res.ok || json.error) throw new Error(json.error ?? `HTTP ${res.status}`);
+  setReportData(json);
+  return _data as ReportData;
+}
+
+export interface SectionParams {
+  thresholds?: Record<string, Record<string, { warn?: number; crit?: number }>>;
+  top_n?: number;
+  resolution?: number;
+  cpus?: string[];
+  devices?: string[];
+  interfaces?: string[];
+}
+
+// Recompute one section (dotted path, e.g. "process_activity.cpu") from the
+// capture the server kept, and swap it into the loaded report
+export async function recomputeSection(
+  reportId: string, section: string, params: SectionParams = {},
+): Promise<unknown> {
+  const res = await fetch(
+    `/api/reports/${encodeURIComponent(reportId)}/sections/${encodeURIComponent(section)}`,
+    { method: 'POST', headers: { 'Content-Type': 'application/json' }, body: JSON.stringify(params) },
+  );
+  const json = await res.json() as { data?: unknown; shared?: Record<string, unknown>; error?: string };
+  if (!res.ok || json.error) throw new Error(json.error ?? `HTTP ${res.status}`);
+  const value = json.shared ? resolveShared(json.data, json.shared) : json.data;
+  if (_data?.report_id === reportId) {
+    const keys = section.split('.');
+    let node = _data as unknown as Record<string, unknown>;
+    for (const key of keys.slice(0, -1)) {
+      node[key] = (node[key] as Record<string, unknown> | undefined) ?? {};
+      node = node[key] as Record<string, unknown>;
+    }
+    node[keys[keys.length - 1]] = value;
+  }
+  return value;
+}
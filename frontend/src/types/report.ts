@@ -73,5 +73,17 @@ export interface ReportData {
   performance?: PerformanceData;
   process_activity?: ProcessActivityData;
   process_details?: ProcessDetailsData;
+  shared?: Record<string, unknown>;
   error?: string;
 }
+
+export interface JobStatus {
+  job_id: string;
+  status: 'queued' | 'running' | 'done' | 'failed';
+  progress: { completed: number; total: number };
+  stages: { name: string; status: 'pending' | 'done' }[];
+  error: string | null;
+  status_url: string;
+  queue_position?: number;
+  report_url?: string;
+}
@@ -6,13 +6,14 @@ Then: cd frontend && npm run dev
 """
 import sys
 import os
-from http.server import HTTPServer
+from http.server import ThreadingHTTPServer
 
 # Add api/ to path so we can import the handler
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'api'))
 from upload import handler
 
-PORT = 8787
-print(f'Dev API server running on http://localhost:{PORT}')
-print('Frontend Vite proxy: /api → http://localhost:8787')
-HTTPServer(('', PORT), handler).serve_forever()
+if __name__ == '__main__':
+    PORT = 8787
+    print(f'Dev API server running on http://localhost:{PORT}')
+    print('Frontend Vite proxy: /api → http://localhost:8787')
+    ThreadingHTTPServer(('', PORT), handler).serve_forever()
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Cold-start import benchmark.
+
+Imports a module in fresh interpreters under `python -X importtime` and
+reports what the import costs: the total, the slowest modules by
+cumulative time and the heaviest top-level packages by self time.
+Usage: python scripts/import_time.py [module] [--runs N] [--top N]
+
+The default target is the API entry point (api/upload.py), the module
+Vercel and serve.py load before they can answer a request.
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+from collections import defaultdict
+from statistics import median
+
+ROOT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+SEARCH_PATH = [os.path.join(ROOT_DIR, 'api'), os.path.join(ROOT_DIR, 'webapp')]
+
+
+def measure(module):
+    """
+    Import a module once in a fresh interpreter.
+
+    Args:
+        module: Dotted module name
+
+    Returns:
+        Dictionary mapping each imported module to (self_us, cumulative_us),
+        in import order
+    """
+    env = dict(os.environ)
+    env['PYTHONPATH'] = os.pathsep.join(SEARCH_PATH + [env.get('PYTHONPATH', '')])
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        env=env, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(f'import {module} failed:\n{result.stderr.strip()}')
+
+    timings = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        timings[name.strip()] = (int(self_us), int(cumulative_us))
+    return timings
+
+
+def report(module, runs, top):
+    """Print the median import cost of a module over several runs."""
+    samples = [measure(module) for _ in range(runs)]
+    modules = {name: (median(s[name][0] for s in samples if name in s),
+                      median(s[name][1] for s in samples if name in s))
+               for name in samples[0]}
+
+    total = modules[module][1] if module in modules else 0
+    print(f'import {module}: {total / 1000:.1f} ms '
+          f'(median of {runs} run(s), {len(modules)} modules)')
+
+    print('\nSlowest modules (cumulative ms, self ms):')
+    by_cumulative = sorted(modules.items(), key=lambda m: m[1][1], reverse=True)
+    for name, (self_us, cumulative_us) in by_cumulative[:top]:
+        print(f'  {cumulative_us / 1000:8.1f} {self_us / 1000:8.1f}  {name}')
+
+    packages = defaultdict(float)
+    for name, (self_us, _) in modules.items():
+        packages[name.split('.')[0]] += self_us
+    print('\nHeaviest packages (self ms):')
+    for name, self_us in sorted(packages.items(), key=lambda p: p[1],
+                                reverse=True)[:top]:
+        print(f'  {self_us / 1000:8.1f}  {name}')
+
+
+def main():
+    """Main function."""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('module', nargs='?', default='upload',
+                        help='module to import (default: upload)')
+    parser.add_argument('--runs', type=int, default=5,
+                        help='fresh interpreters to time (default: 5)')
+    parser.add_argument('--top', type=int, default=15,
+                        help='rows per table (default: 15)')
+    args = parser.parse_args()
+    try:
+        report(args.module, max(args.runs, 1), args.top)
+    except RuntimeError as e:
+        print(f'Error: {e}')
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
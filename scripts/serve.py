@@ -3,71 +3,183 @@
 Production-style combined server for Docker.
 Serves the built React frontend (static files) + /api/upload endpoint on one port.
 Usage: python scripts/serve.py
+
+SERVER_WORKERS > 1 switches to a pre-forked server: the processor stack is
+imported once here and shared copy-on-write by SERVER_WORKERS worker
+processes, each recycled after building SERVER_MAX_JOBS reports.
 """
 import sys
 import os
-from http.server import HTTPServer, SimpleHTTPRequestHandler
+import tempfile
+import threading
+from http.server import ThreadingHTTPServer
 
 ROOT_DIR = os.path.join(os.path.dirname(__file__), '..')
 STATIC_DIR = os.path.join(ROOT_DIR, 'frontend', 'dist')
 
+# Worker processes (1 = a single threaded server), listen backlog, reports
+# a worker builds before it is replaced (0 = never), seconds workers get to
+# finish in-flight requests on shutdown, and seconds a stopping or recycled
+# worker waits for its queued and running report jobs
+SERVER_WORKERS = int(os.environ.get('SERVER_WORKERS', 1))
+SERVER_BACKLOG = int(os.environ.get('SERVER_BACKLOG', 64))
+SERVER_MAX_JOBS = int(os.environ.get('SERVER_MAX_JOBS', 100))
+SERVER_GRACEFUL_TIMEOUT = int(os.environ.get('SERVER_GRACEFUL_TIMEOUT', 30))
+SERVER_JOB_TIMEOUT = int(os.environ.get('SERVER_JOB_TIMEOUT', 600))
+
+if SERVER_WORKERS > 1:
+    # Job status must be visible to whichever worker a poll lands on
+    os.environ.setdefault('JOB_STATE_DIR',
+                          os.path.join(tempfile.gettempdir(), 'linuxaio-jobs'))
+
 sys.path.insert(0, os.path.join(ROOT_DIR, 'api'))
-from upload import handler as api_handler
+from upload import handler as api_handler, built_reports, jobs, log
+from domains.factory import ProcessorFactory
+from core.compression import SUPPORTED_ENCODINGS, choose_encoding, precompress_tree
+from core.prefork import PreforkServer
+from core.static_files import StaticAssets, parse_range
+
+# Text assets that get .gz/.br sidecars at startup
+COMPRESSIBLE_EXTENSIONS = ('.html', '.js', '.css', '.svg', '.json', '.ico',
+                           '.txt', '.map', '.ttf')
+
+# Static files up to STATIC_MEMORY_MAX_FILE bytes are held in memory, up to
+# STATIC_MEMORY_MAX_BYTES in total; larger ones are sent with os.sendfile()
+STATIC_MEMORY_MAX_FILE = int(os.environ.get('STATIC_MEMORY_MAX_FILE', 256 * 1024))
+STATIC_MEMORY_MAX_BYTES = int(os.environ.get('STATIC_MEMORY_MAX_BYTES', 64 * 1024 * 1024))
+
+# Indexed once at startup (before forking, so workers share it)
+static_assets = StaticAssets(STATIC_DIR, STATIC_MEMORY_MAX_FILE,
+                             STATIC_MEMORY_MAX_BYTES, logger=log)
 
 
 class CombinedHandler(api_handler):
     """Routes /api/* to the upload handler, everything else serves static files."""
 
     def do_GET(self):
-        # Serve static frontend files
         path = self.path.split('?')[0]
+        if path.startswith('/api/'):
+            # /api/jobs/<id>, /api/reports/<id>
+            super().do_GET()
+            return
+        self._serve_static(path)
+
+    def do_HEAD(self):
+        path = self.path.split('?')[0]
+        if path.startswith('/api/'):
+            self.send_error(405, 'HEAD is not supported on /api/')
+            return
+        self._serve_static(path, head_only=True)
 
-        # Resolve file path
-        if path == '/' or not os.path.exists(os.path.join(STATIC_DIR, path.lstrip('/'))):
-            # SPA fallback: serve index.html for unknown paths
-            file_path = os.path.join(STATIC_DIR, 'index.html')
-        else:
-            file_path = os.path.join(STATIC_DIR, path.lstrip('/'))
+    def _serve_static(self, path, head_only=False):
+        # SPA fallback: serve index.html for unknown paths
+        asset = static_assets.lookup(path) or static_assets.lookup('/index.html')
+        if asset is None:
+            self.send_error(404, 'Frontend not built')
+            return
 
-        if not os.path.isfile(file_path):
-            file_path = os.path.join(STATIC_DIR, 'index.html')
+        # Serve a precompressed sidecar when the client accepts it; ranges
+        # are only served from the identity representation
+        byte_range = None
+        encoding = None
+        range_header = self.headers.get('Range')
+        if_range = self.headers.get('If-Range')
+        if range_header and (not if_range or if_range == asset.identity.etag):
+            try:
+                byte_range = parse_range(range_header, asset.identity.size)
+            except ValueError:
+                self.send_response(416)
+                self.send_header('Content-Range', f'bytes */{asset.identity.size}')
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+                return
+        if byte_range is None:
+            encoding = choose_encoding(self.headers.get('Accept-Encoding'),
+                                       list(asset.encoded))
+        rep = asset.representation(encoding)
 
+        if_none_match = self.headers.get('If-None-Match')
+        if if_none_match and byte_range is None:
+            tags = {tag.strip().removeprefix('W/') for tag in if_none_match.split(',')}
+            if '*' in tags or rep.etag in tags:
+                self.send_response(304)
+                self._send_cache_headers(asset, rep)
+                self.end_headers()
+                return
+
+        start, end = byte_range or (0, rep.size - 1)
+        length = end - start + 1 if rep.size else 0
+        self.send_response(206 if byte_range else 200)
+        self.send_header('Content-Type', asset.content_type)
+        self.send_header('Content-Length', str(length))
+        if byte_range:
+            self.send_header('Content-Range', f'bytes {start}-{end}/{rep.size}')
+        if encoding:
+            self.send_header('Content-Encoding', encoding)
+        self._send_cache_headers(asset, rep)
+        self.end_headers()
+        if head_only or not length:
+            return
         try:
-            with open(file_path, 'rb') as f:
-                content = f.read()
-            self.send_response(200)
-            self.send_header('Content-Type', self._guess_type(file_path))
-            self.send_header('Content-Length', str(len(content)))
-            self.end_headers()
-            self.wfile.write(content)
-        except Exception as e:
-            self.send_error(500, str(e))
-
-    def _guess_type(self, path):
-        ext = os.path.splitext(path)[1].lower()
-        types = {
-            '.html': 'text/html; charset=utf-8',
-            '.js': 'application/javascript',
-            '.css': 'text/css',
-            '.png': 'image/png',
-            '.ico': 'image/x-icon',
-            '.svg': 'image/svg+xml',
-            '.json': 'application/json',
-            '.woff2': 'font/woff2',
-            '.woff': 'font/woff',
-            '.ttf': 'font/ttf',
-        }
-        return types.get(ext, 'application/octet-stream')
+            self._send_body(rep, start, length)
+        except (BrokenPipeError, ConnectionResetError):
+            self.close_connection = True
+
+    def _send_cache_headers(self, asset, rep):
+        self.send_header('ETag', rep.etag)
+        self.send_header('Cache-Control', asset.cache_control)
+        self.send_header('Accept-Ranges', 'bytes')
+        if asset.encoded:
+            self.send_header('Vary', 'Accept-Encoding')
+
+    def _send_body(self, rep, offset, count):
+        """Write count bytes of a representation from memory or the file."""
+        if rep.body is not None:
+            self.wfile.write(memoryview(rep.body)[offset:offset + count])
+            return
+        self.wfile.flush()
+        with open(rep.path, 'rb') as f:
+            # os.sendfile() from the page cache to the socket where the
+            # platform has it (socket.sendfile copies in user space otherwise)
+            self.connection.sendfile(f, offset, count)
 
     def do_POST(self):
-        # Delegate all POST (i.e. /api/upload) to the API handler
+        # Delegate all POST (/api/upload, /api/jobs) to the API handler
         super().do_POST()
 
     def log_message(self, fmt, *args):
         print(f'[serve] {self.address_string()} - {fmt % args}')
 
 
-PORT = int(os.environ.get('PORT', 8000))
-print(f'LinuxAIO Performance server running on http://0.0.0.0:{PORT}')
-print(f'Serving static files from: {STATIC_DIR}')
-HTTPServer(('', PORT), CombinedHandler).serve_forever()
+class CombinedServer(ThreadingHTTPServer):
+    request_queue_size = SERVER_BACKLOG
+
+
+def finish_jobs():
+    """Let a stopping worker finish its queued and running report jobs."""
+    if not jobs.wait_idle(SERVER_JOB_TIMEOUT):
+        log.warning('worker stopped with report jobs still running')
+
+
+if __name__ == '__main__':
+    # Guarded so process-pool workers (API_WORKERS > 1) can import this module
+    PORT = int(os.environ.get('PORT', 8000))
+    print(f'LinuxAIO Performance server running on http://0.0.0.0:{PORT}')
+    print(f'Serving static files from: {STATIC_DIR}')
+    written = precompress_tree(STATIC_DIR, COMPRESSIBLE_EXTENSIONS)
+    print(f'Precompressed {written} static file variant(s) ({", ".join(SUPPORTED_ENCODINGS)})')
+    indexed = static_assets.load()
+    print(f'Indexed {indexed} static file(s), {static_assets.memory} bytes held in memory')
+    if SERVER_WORKERS > 1:
+        # Import pandas, plotly and every processor once, before forking
+        ProcessorFactory.preload()
+        print(f'Pre-forking {SERVER_WORKERS} workers (backlog {SERVER_BACKLOG}, '
+              f'recycled after {SERVER_MAX_JOBS or "unlimited"} reports)')
+        PreforkServer(('', PORT), CombinedHandler, SERVER_WORKERS, SERVER_BACKLOG,
+                      SERVER_MAX_JOBS, SERVER_GRACEFUL_TIMEOUT,
+                      jobs_done=built_reports, on_worker_exit=finish_jobs,
+                      exit_timeout=SERVER_JOB_TIMEOUT, logger=log).serve_forever()
+    else:
+        # Start answering right away; processors finish importing meanwhile
+        threading.Thread(target=ProcessorFactory.preload, daemon=True).start()
+        CombinedServer(('', PORT), CombinedHandler).serve_forever()
@@ -5,23 +5,98 @@ from flask import (
     redirect,
     url_for,
     send_file,
+    jsonify,
     send_from_directory
 )
 
 import os
+import re
 import threading
+import math
 import time
 import datetime
-import subprocess
+import fcntl
+import shutil
 
+from domains.jobs import DONE, FAILED, JobManager, JobQueueFull
+from domains.storage import RetentionJanitor
 from domains.webapp.fileprocessing import FileManager
-from domains.webapp.execution import ScriptExecutor
+from domains.webapp.execution import ReportWorkerPool, ScriptExecutor
+from domains.webapp.execution.linuxaioperf import setup_logging
 
 app = Flask(__name__)
 
 UPLOAD_FOLDER = os.environ.get('UPLOAD_FOLDER', '/linuxaio/digest/')
-SCRIPT_PATH = 'linuxaioperf.py'
-unique_id = None
+
+# Upload directories (capture and generated report) are kept for
+# REPORT_RETENTION seconds (10 minutes unless a deployment opts in to
+# longer retention) and REPORT_STORE_MAX_BYTES in total, least recently
+# viewed first; the folder is swept every CLEANUP_INTERVAL seconds,
+# and early (evicting until the watermark is met) whenever the free space
+# of its filesystem, checked every CLEANUP_CHECK_INTERVAL seconds and after
+# each upload, drops below UPLOAD_MIN_FREE_BYTES (0 = no watermark)
+REPORT_RETENTION = int(os.environ.get('REPORT_RETENTION', 600))
+REPORT_STORE_MAX_BYTES = int(os.environ.get('REPORT_STORE_MAX_BYTES', 2 * 1024 * 1024 * 1024))
+CLEANUP_INTERVAL = int(os.environ.get('CLEANUP_INTERVAL', 600))
+CLEANUP_CHECK_INTERVAL = int(os.environ.get('CLEANUP_CHECK_INTERVAL', 10))
+UPLOAD_MIN_FREE_BYTES = int(os.environ.get('UPLOAD_MIN_FREE_BYTES', 1024 * 1024 * 1024))
+
+# Reports are generated by REPORT_WORKERS preloaded worker processes per
+# web server process (REPORT_EXECUTION=pool), each job killed after
+# REPORT_TIMEOUT seconds and each worker replaced after
+# REPORT_WORKER_MAX_JOBS jobs;
+# REPORT_EXECUTION=subprocess launches the generator as a python3 process
+# per upload
+REPORT_EXECUTION = os.environ.get('REPORT_EXECUTION', 'pool')
+REPORT_WORKERS = int(os.environ.get('REPORT_WORKERS', 1))
+REPORT_TIMEOUT = int(os.environ.get('REPORT_TIMEOUT', 270))
+REPORT_WORKER_MAX_JOBS = int(os.environ.get('REPORT_WORKER_MAX_JOBS', 100))
+
+# Admission control: at most REPORT_MAX_CONCURRENCY report jobs run at once
+# and REPORT_MAX_QUEUE more wait (uploads beyond that get 503 with
+# Retry-After). The queue lives in one web server process per UPLOAD_FOLDER
+# (run gunicorn with WORKERS=1 and THREADS for concurrent requests): that
+# process holds REPORT_QUEUE_LOCK, and any other process serving the same
+# folder fails to start rather than multiply the limits.
+REPORT_MAX_CONCURRENCY = int(os.environ.get('REPORT_MAX_CONCURRENCY', REPORT_WORKERS))
+REPORT_MAX_QUEUE = int(os.environ.get('REPORT_MAX_QUEUE', 8))
+REPORT_QUEUE_LOCK = os.path.join(UPLOAD_FOLDER, '.report-queue.lock')
+REPORT_STATUS_REFRESH = int(os.environ.get('REPORT_STATUS_REFRESH', 3))
+
+report_pool = (ReportWorkerPool(REPORT_WORKERS, REPORT_TIMEOUT,
+                                REPORT_WORKER_MAX_JOBS, logger=setup_logging())
+               if REPORT_EXECUTION == 'pool' else None)
+
+script_executor = ScriptExecutor(pool=report_pool)
+report_jobs = JobManager(REPORT_MAX_CONCURRENCY, REPORT_MAX_QUEUE)
+report_queue_lock = None
+
+# Upload directory names (FileManager.create_unique_directory)
+UNIQUE_ID_RE = re.compile(r'[0-9a-f]+')
+background_services_started = False
+background_services_lock = threading.Lock()
+
+# Seconds a report job took, smoothed; used for Retry-After estimates
+report_job_seconds = 30.0
+
+# Directories that may still be waiting for or running their report job
+# are never evicted for space, and those of queued or running jobs are not
+# removed by the retention period either
+REPORT_MAX_WAIT = REPORT_TIMEOUT * (
+    1 + math.ceil(REPORT_MAX_QUEUE / max(REPORT_MAX_CONCURRENCY, 1)))
+
+
+def active_report_dirs():
+    return [os.path.join(UPLOAD_FOLDER, job_id)
+            for job_id in report_jobs.active_ids()]
+
+
+janitor = RetentionJanitor(UPLOAD_FOLDER, REPORT_STORE_MAX_BYTES,
+                           REPORT_RETENTION, CLEANUP_INTERVAL,
+                           UPLOAD_MIN_FREE_BYTES, CLEANUP_CHECK_INTERVAL,
+                           min_age=REPORT_MAX_WAIT,
+                           in_use=active_report_dirs,
+                           logger=setup_logging())
 
 
 def log_message(message, log_level='Info'):
@@ -40,41 +115,57 @@ def index():
 # create_unique_dir function moved to domains.webapp.fileprocessing.FileManager
 
 
-def delete_contents():
-    find_command = (
-        f"find {UPLOAD_FOLDER} -mindepth 1 "
-        f"-maxdepth 1 -type d -mmin +10"
-    )
-
-    find_process = subprocess.Popen(
-        find_command,
-        shell=True,
-        stdout=subprocess.PIPE,
-        stderr=subprocess.PIPE
-    )
-
-    stdout, stderr = find_process.communicate()
-
-    if find_process.returncode == 0:
-        dirs_to_delete = stdout.decode().split('\n')[:-1]
-        for dir_to_delete in dirs_to_delete:
-            try:
-                subprocess.run(["rm", "-rf", dir_to_delete])
-                log_message("Deleted directory: " + dir_to_delete)
-            except Exception as e:
-                error_message = (
-                    "Failed to delete directory: " + dir_to_delete +
-                    " Error: " + str(e)
-                )
-                log_message(error_message)
+def acquire_report_queue():
+    """Take the report queue of UPLOAD_FOLDER for this process (kept for
+    the life of the process).
 
-
-def delete_contents_periodically(interval_seconds):
-    log_message("Deleting contents periodically")
-    while True:
-        log_message("Deleting contents periodically")
-        time.sleep(interval_seconds)
-        delete_contents()
+    Raises:
+        RuntimeError: If another server process already owns it
+    """
+    global report_queue_lock
+    if report_queue_lock is not None:
+        return
+    lock_file = None
+    try:
+        os.makedirs(UPLOAD_FOLDER, exist_ok=True)
+        lock_file = open(REPORT_QUEUE_LOCK, 'a')
+        fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError as e:
+        if lock_file is not None:
+            lock_file.close()
+        message = (f"The report queue of {UPLOAD_FOLDER} is owned by another "
+                   f"server process ({e}); run a single worker (WORKERS=1)")
+        log_message(message, "Error")
+        raise RuntimeError(message) from e
+    report_queue_lock = lock_file
+
+
+def retry_after() -> int:
+    """Seconds a rejected client should wait before uploading again."""
+    backlog = REPORT_MAX_QUEUE / max(REPORT_MAX_CONCURRENCY, 1) + 1
+    return min(max(int(backlog * report_job_seconds), 5), 600)
+
+
+def server_busy():
+    """503 response for uploads refused by admission control."""
+    seconds = retry_after()
+    response = app.make_response(
+        (render_template('server_busy.html', retry_after=seconds), 503))
+    response.headers['Retry-After'] = str(seconds)
+    return response
+
+
+def run_report_job(job, unique_dir):
+    """Job function: generate the report for an extracted upload."""
+    global report_job_seconds
+    started = time.monotonic()
+    exit_code = script_executor.execute_linuxaioperf(unique_dir)
+    report_job_seconds = (0.8 * report_job_seconds +
+                          0.2 * (time.monotonic() - started))
+    if exit_code != 0:
+        raise RuntimeError(
+            f"Script execution failed with exit code: {exit_code}")
+    return None
 
 
 @app.route('/upload', methods=['POST'])
@@ -82,41 +173,39 @@ def upload_file():
     try:
         uploaded_file = request.files['file']
         if uploaded_file.filename != '':
+            # Refuse before extracting when no job slot can take the upload
+            if report_jobs.queue_full():
+                log_message("Report queue is full, refusing upload", "Warning")
+                return server_busy()
+
             # Initialize domain services
             file_manager = FileManager()
-            script_executor = ScriptExecutor()
 
             # Process the uploaded file
             try:
                 unique_id, unique_dir = file_manager.process_upload(
                     uploaded_file,
-                    UPLOAD_FOLDER,
-                    os.path.dirname(__file__)
+                    UPLOAD_FOLDER
                 )
                 log_message(
                     f"File processed successfully. Report ID: {unique_id}")
+                janitor.poke()
             except Exception as e:
                 log_message(f"File processing failed: {e}", "Error")
                 return render_template('bad_gzip_file.html'), 400
 
-            # Execute the performance analysis script
-            log_message("Executing performance analysis script")
-            exit_code = script_executor.execute_linuxaioperf(unique_dir)
-
-            if exit_code != 0:
-                log_message(
-                    f"Script execution failed with exit code: {exit_code}",
-                    "Error")
-                return render_template('generic_error.html',
-                                       reportid=unique_id), 500
-
-            # Construct the URL for the report page
-            log_message("Constructing report URL")
-            report_url = url_for('view_report', dir=unique_dir, _external=True)
-            log_message(f"Report ID: {unique_id}")
+            # Queue the performance analysis script
+            try:
+                report_jobs.submit(unique_id, run_report_job, unique_dir)
+            except JobQueueFull:
+                log_message("Report queue is full, refusing upload", "Warning")
+                shutil.rmtree(unique_dir, ignore_errors=True)
+                return server_busy()
+            log_message(f"Queued performance analysis. Report ID: {unique_id}")
 
-            # Redirect the user to the report page
-            return redirect(report_url)
+            # Send the user to the waiting page, which loads the report
+            # once the job is done
+            return redirect(url_for('report_status', id=unique_id))
 
         return 'No file uploaded.'
 
@@ -127,6 +216,32 @@ def upload_file():
         return render_template('generic_error.html', reportid=reportid), 500
 
 
+@app.route('/report_status')
+def report_status():
+    unique_id = request.args.get('id', '')
+    if not UNIQUE_ID_RE.fullmatch(unique_id):
+        return render_template('generic_error.html', reportid='unknown'), 404
+    unique_dir = os.path.join(UPLOAD_FOLDER, unique_id)
+    report_url = url_for('view_report', dir=unique_dir, _external=True)
+
+    job = report_jobs.get(unique_id)
+    if job is None:
+        # Job state expired, but the report may still be there
+        if os.path.exists(os.path.join(unique_dir,
+                                       'linuxaioperf_report.html')):
+            return redirect(report_url)
+        return render_template('generic_error.html', reportid=unique_id), 404
+    if job.status == DONE:
+        log_message(f"Report ID: {unique_id}")
+        return redirect(report_url)
+    if job.status == FAILED:
+        log_message(f"Report {unique_id} failed: {job.error}", "Error")
+        return render_template('generic_error.html', reportid=unique_id), 500
+    return render_template('report_status.html', reportid=unique_id,
+                           position=report_jobs.position(job),
+                           refresh=REPORT_STATUS_REFRESH)
+
+
 @app.route('/get_text', methods=['GET'])
 def get_text():
     try:
@@ -138,28 +253,70 @@ def get_text():
         return 'File not found', 404
 
 
+def upload_dir(path):
+    """Resolve a client-supplied upload directory path, or None unless it
+    names a generated directory directly inside UPLOAD_FOLDER."""
+    if not path:
+        return None
+    resolved = os.path.realpath(path)
+    if (os.path.dirname(resolved) != os.path.realpath(UPLOAD_FOLDER)
+            or not UNIQUE_ID_RE.fullmatch(os.path.basename(resolved))):
+        return None
+    return resolved
+
+
 @app.route('/view_report')
 def view_report():
+    unique_dir = upload_dir(request.args.get('dir'))
+    if unique_dir is None:
+        log_message(f"Rejected report path: {request.args.get('dir')!r}",
+                    "Warning")
+        return render_template('generic_error.html', reportid='unknown'), 404
     try:
-        unique_dir = request.args.get('dir')
         report_path = os.path.join(unique_dir, 'linuxaioperf_report.html')
-        return send_file(report_path)
+        response = send_file(report_path)
+        # Record the view (atime) for LRU eviction; mtime keeps the age
+        os.utime(unique_dir, (time.time(), os.stat(unique_dir).st_mtime))
+        return response
     except Exception as e:
-        reportid = unique_dir.split("/")[-1]
+        reportid = os.path.basename(unique_dir)
         log_message(f"Error: {e}", "Error")
         return render_template('generic_error.html',
                                reportid=reportid), 500
 
 
-def start_delete_thread():
-    log_message("Starting delete thread")
-    delete_thread = threading.Thread(
-        target=delete_contents_periodically, args=(600,))
-    delete_thread.daemon = True
-    delete_thread.start()
+@app.route('/retention_stats')
+def retention_stats():
+    return jsonify(janitor.stats())
+
+
+def start_background_services():
+    """Take the report queue and start the retention janitor and the
+    report worker pool, once per server process. Nothing is started at
+    import: the pool's worker processes re-import this module when it is
+    run as a script, and a server may fork its workers after importing it.
+
+    Raises:
+        RuntimeError: If another server process owns the report queue
+    """
+    global background_services_started
+    with background_services_lock:
+        if background_services_started:
+            return
+        acquire_report_queue()
+        background_services_started = True
+    janitor.start()
+    if report_pool is not None:
+        # Workers import pandas, plotly and the processors now, not on
+        # the first upload
+        report_pool.start()
+
 
+@app.before_request
+def ensure_background_services():
+    start_background_services()
 
-start_delete_thread()
 
 if __name__ == '__main__':
+    start_background_services()
     app.run(host='0.0.0.0', port=80)
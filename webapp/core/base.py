@@ -3,11 +3,20 @@ Base classes and interfaces for Linux AIO Performance Checker data processors.
 """
 
 import os
+import hashlib
 import logging
 from abc import ABC, abstractmethod
-from typing import List, Dict, Any, Optional, Tuple
-import pandas as pd
-import plotly.graph_objects as go
+from typing import TYPE_CHECKING, List, Dict, Any, Collection, Optional, Tuple
+
+if TYPE_CHECKING:
+    # Only needed for annotations; importing them here would make every
+    # importer of the exceptions below pay for pandas and plotly
+    import pandas as pd
+    import plotly.graph_objects as go
+
+# File in an extracted capture directory holding the sha256 of the archive
+# it came from; lets data_key() identify the capture without reading it
+CAPTURE_HASH_FILE = '.archive.sha256'
 
 
 class DataProcessorError(Exception):
@@ -33,6 +42,23 @@ class BaseDataProcessor(ABC):
     for processing different types of system performance data.
     """
 
+    # Capture files this processor reads. The first entry is its primary
+    # input; any others are side files (e.g. info.txt for the date).
+    capture_files: Tuple[str, ...] = ()
+
+    # Bump when process_data() output changes for the same input, so frames
+    # cached by an older version are not reused
+    data_version: int = 1
+
+    # Parsed-frame cache (a storage.FrameCache) shared by all processors;
+    # set by the application, None parses every time
+    data_cache: Optional[Any] = None
+
+    # Position of the column naming the device, interface or CPU each row
+    # belongs to, for inputs that interleave several; None if rows are not
+    # keyed that way (see select_items)
+    item_column: Optional[int] = None
+
     def __init__(
         self,
         input_file: str,
@@ -50,6 +76,9 @@ class BaseDataProcessor(ABC):
         self.input_file = input_file
         self.output_dir = output_dir
         self.logger = logger or self._setup_logger()
+        # Columnar data a processor precomputes for the report's series
+        # store while creating its plots: {table name: {column: array}}
+        self.tables: Dict[str, Dict[str, Any]] = {}
         self._validate_input_file()
 
     def _setup_logger(self) -> logging.Logger:
@@ -100,7 +129,7 @@ class BaseDataProcessor(ABC):
         pass
 
     @abstractmethod
-    def process_data(self) -> pd.DataFrame:
+    def process_data(self) -> 'pd.DataFrame':
         """
         Process the filtered data into a pandas DataFrame.
 
@@ -110,7 +139,7 @@ class BaseDataProcessor(ABC):
         pass
 
     @abstractmethod
-    def create_plots(self, df: pd.DataFrame) -> List[go.Figure]:
+    def create_plots(self, df: 'pd.DataFrame') -> List['go.Figure']:
         """
         Create plotly figures from the processed data.
 
@@ -179,26 +208,111 @@ class BaseDataProcessor(ABC):
             }
         }
 
-    def process(self) -> Tuple[pd.DataFrame, List[go.Figure]]:
+    def data_key(self) -> str:
+        """
+        Key of the parsed data: the processor and its data version plus the
+        capture it reads.
+
+        A capture extracted from an uploaded archive is identified by the
+        archive's sha256 (see CAPTURE_HASH_FILE), which the upload already
+        computed, so building the key does not read the capture. Other
+        captures are identified by the name, size and contents of every
+        capture file the processor reads.
+
+        Returns:
+            Hex digest identifying the output of process_data()
+        """
+        cls = type(self)
+        digest = hashlib.sha1(
+            f'{cls.__module__}.{cls.__qualname__}:{cls.data_version}'.encode())
+        capture_dir = os.path.dirname(self.input_file)
+        paths = [self.input_file] + [os.path.join(capture_dir, name)
+                                     for name in self.capture_files[1:]]
+        try:
+            with open(os.path.join(capture_dir, CAPTURE_HASH_FILE)) as f:
+                archive_hash = f.read().strip()
+        except OSError:
+            archive_hash = ''
+        if archive_hash:
+            digest.update(f'\0archive:{archive_hash}'.encode())
+            for path in paths:
+                digest.update(f'\0{os.path.basename(path)}:'
+                              f'{int(os.path.isfile(path))}'.encode())
+            return digest.hexdigest()
+        for path in paths:
+            if not os.path.isfile(path):
+                digest.update(f'\0{os.path.basename(path)}:-'.encode())
+                continue
+            digest.update(f'\0{os.path.basename(path)}:'
+                          f'{os.path.getsize(path)}\0'.encode())
+            with open(path, 'rb') as f:
+                while chunk := f.read(1024 * 1024):
+                    digest.update(chunk)
+        return digest.hexdigest()
+
+    def load_data(self) -> 'pd.DataFrame':
+        """
+        Parse the input into a DataFrame, or load it from the data cache
+        when this input was parsed before.
+
+        Returns:
+            Processed DataFrame (columns may be read-only memory maps)
+        """
+        cache = self.data_cache
+        key = self.data_key() if cache is not None and cache.enabled else None
+        if key is not None:
+            df = cache.get(key)
+            if df is not None:
+                self.logger.debug(f"Loaded parsed data from cache ({key})")
+                return df
+
+        # Extract header
+        header = self.extract_header()
+        self.logger.debug(f"Extracted header: {header}")
+
+        # Filter data lines
+        data_lines = self.filter_data_lines()
+        self.logger.debug(f"Filtered {len(data_lines)} data lines")
+
+        # Process data
+        df = self.process_data()
+        if key is not None:
+            cache.put(key, df)
+        return df
+
+    def select_items(self, df: 'pd.DataFrame',
+                     items: Optional[Collection[str]]) -> 'pd.DataFrame':
+        """
+        Keep only the rows of some devices, interfaces or CPUs.
+
+        Args:
+            df: Processed DataFrame
+            items: Values of item_column to keep; None or empty keeps all
+
+        Returns:
+            Filtered DataFrame (df itself when there is nothing to filter)
+        """
+        if not items or self.item_column is None:
+            return df
+        column = df.iloc[:, self.item_column].astype(str)
+        return df[column.isin(set(items)).to_numpy()]
+
+    def process(self, items: Optional[Collection[str]] = None
+                ) -> Tuple['pd.DataFrame', List['go.Figure']]:
         """
         Main processing pipeline.
 
+        Args:
+            items: Devices, interfaces or CPUs to plot (default: all)
+
         Returns:
             Tuple of (processed_dataframe, plotly_figures)
         """
         try:
             self.logger.info(f"Starting processing of {self.input_file}")
 
-            # Extract header
-            header = self.extract_header()
-            self.logger.debug(f"Extracted header: {header}")
-
-            # Filter data lines
-            data_lines = self.filter_data_lines()
-            self.logger.debug(f"Filtered {len(data_lines)} data lines")
-
-            # Process data
-            df = self.process_data()
+            # Parse (or load) the data
+            df = self.select_items(self.load_data(), items)
             self.logger.debug(f"Processed data shape: {df.shape}")
 
             # Create plots
@@ -0,0 +1,181 @@
+"""
+HTTP content-encoding helpers.
+
+Negotiates gzip or brotli from an Accept-Encoding header, compresses whole
+bodies or NDJSON streams, and writes precompressed .gz/.br sidecars for
+static files. Brotli is optional: when the brotli package is not installed
+only gzip is offered.
+"""
+
+import gzip
+import logging
+import os
+import zlib
+from typing import Dict, Iterable, Optional, Tuple
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Preferred first when the client rates encodings equally
+SUPPORTED_ENCODINGS: Tuple[str, ...] = (('br',) if brotli else ()) + ('gzip',)
+
+SIDECAR_SUFFIXES: Dict[str, str] = {'br': '.br', 'gzip': '.gz'}
+
+DEFAULT_GZIP_LEVEL = 6
+DEFAULT_BROTLI_QUALITY = 5
+
+
+def parse_accept_encoding(header: Optional[str]) -> Dict[str, float]:
+    """
+    Parse an Accept-Encoding header into {coding: q-value}.
+
+    Args:
+        header: Accept-Encoding header value
+
+    Returns:
+        Dictionary of lower-cased content codings to their q-values
+    """
+    accepted = {}
+    for item in (header or '').split(','):
+        coding, _, params = item.strip().partition(';')
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        q = 1.0
+        for param in params.split(';'):
+            name, _, value = param.strip().partition('=')
+            if name.strip().lower() == 'q':
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        accepted[coding] = q
+    return accepted
+
+
+def choose_encoding(header: Optional[str],
+                    available: Iterable[str] = SUPPORTED_ENCODINGS
+                    ) -> Optional[str]:
+    """
+    Pick the best content coding both sides support.
+
+    Args:
+        header: Accept-Encoding header value
+        available: Codings the server can produce, in preference order
+
+    Returns:
+        'br', 'gzip' or None for identity
+    """
+    accepted = parse_accept_encoding(header)
+    best, best_q = None, 0.0
+    for coding in available:
+        q = accepted.get(coding, accepted.get('*', 0.0))
+        if q > best_q:
+            best, best_q = coding, q
+    return best
+
+
+def compress(data: bytes, encoding: str,
+             gzip_level: int = DEFAULT_GZIP_LEVEL,
+             brotli_quality: int = DEFAULT_BROTLI_QUALITY) -> bytes:
+    """
+    Compress a complete body.
+
+    Args:
+        data: Body bytes
+        encoding: 'br' or 'gzip'
+        gzip_level: zlib level 1-9
+        brotli_quality: Brotli quality 0-11
+
+    Returns:
+        Compressed bytes
+    """
+    if encoding == 'br':
+        return brotli.compress(data, quality=brotli_quality)
+    if encoding == 'gzip':
+        # mtime=0 keeps the output deterministic (stable ETags/sidecars)
+        return gzip.compress(data, compresslevel=gzip_level, mtime=0)
+    raise ValueError(f"Unsupported content encoding: {encoding}")
+
+
+class StreamCompressor:
+    """
+    Incremental compressor that flushes after every write, so each NDJSON
+    record can be decoded by the client as soon as it arrives.
+    """
+    def __init__(self, encoding: str,
+                 gzip_level: int = DEFAULT_GZIP_LEVEL,
+                 brotli_quality: int = DEFAULT_BROTLI_QUALITY):
+        self.encoding = encoding
+        if encoding == 'br':
+            self._brotli = brotli.Compressor(quality=brotli_quality)
+        elif encoding == 'gzip':
+            self._zlib = zlib.compressobj(gzip_level, zlib.DEFLATED, 31)
+        else:
+            raise ValueError(f"Unsupported content encoding: {encoding}")
+
+    def compress(self, data: bytes) -> bytes:
+        if self.encoding == 'br':
+            return self._brotli.process(data) + self._brotli.flush()
+        return self._zlib.compress(data) + self._zlib.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        if self.encoding == 'br':
+            return self._brotli.finish()
+        return self._zlib.flush(zlib.Z_FINISH)
+
+
+def precompress_tree(root: str, extensions: Iterable[str],
+                     min_size: int = 1024,
+                     gzip_level: int = 9, brotli_quality: int = 11,
+                     logger: Optional[logging.Logger] = None) -> int:
+    """
+    Write .gz (and .br when brotli is available) sidecars next to static
+    files. Sidecars newer than their source are left alone, so repeated
+    startups only pay for files that changed.
+
+    Args:
+        root: Directory to walk
+        extensions: File extensions worth compressing (e.g. '.js')
+        min_size: Files smaller than this are skipped
+        gzip_level: zlib level for .gz sidecars
+        brotli_quality: Brotli quality for .br sidecars
+        logger: Logger instance (optional)
+
+    Returns:
+        Number of sidecar files written
+    """
+    logger = logger or logging.getLogger(__name__)
+    extensions = tuple(ext.lower() for ext in extensions)
+    written = 0
+    for dirpath, _, filenames in os.walk(root):
+        for name in filenames:
+            if not name.lower().endswith(extensions):
+                continue
+            path = os.path.join(dirpath, name)
+            try:
+                st = os.stat(path)
+                if st.st_size < min_size:
+                    continue
+                data = None
+                for encoding in SUPPORTED_ENCODINGS:
+                    sidecar = path + SIDECAR_SUFFIXES[encoding]
+                    if (os.path.exists(sidecar)
+                            and os.path.getmtime(sidecar) >= st.st_mtime):
+                        continue
+                    if data is None:
+                        with open(path, 'rb') as f:
+                            data = f.read()
+                    body = compress(data, encoding, gzip_level, brotli_quality)
+                    if len(body) >= len(data):
+                        continue
+                    tmp = sidecar + '.tmp'
+                    with open(tmp, 'wb') as f:
+                        f.write(body)
+                    os.replace(tmp, sidecar)
+                    written += 1
+            except OSError as e:
+                logger.warning(f'precompress {path} failed: {e}')
+    return written
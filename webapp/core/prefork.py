@@ -0,0 +1,276 @@
+"""
+Pre-forking HTTP server.
+
+The parent process binds the listening socket and has already imported the
+application (pandas, numpy, plotly and every processor) before it forks,
+so workers share those pages copy-on-write and start in milliseconds
+instead of paying the import cost again. Each worker runs a threaded HTTP
+server on the shared socket, so requests are handled concurrently both
+across and within workers.
+
+A worker stops accepting connections once it has finished max_jobs jobs
+(as counted by the jobs_done callback), which bounds memory creep from
+large report builds. It tells the parent through a pipe, so a replacement
+is forked at once while the old worker drains: it finishes its in-flight
+requests, then runs the on_worker_exit hook (e.g. waiting for its queued
+and running background jobs) before it exits. On SIGTERM or SIGINT the
+parent asks every worker to stop accepting and drain the same way, and
+kills what is left after graceful_timeout plus exit_timeout. Idle
+keep-alive connections are closed as soon as a worker starts draining.
+"""
+
+import logging
+import os
+import random
+import signal
+import socket
+import threading
+import time
+from http.server import ThreadingHTTPServer
+from typing import Callable, Dict, Optional, Set, Tuple
+
+
+class _WorkerHTTPServer(ThreadingHTTPServer):
+    """Threaded server on an inherited socket that stops after N jobs."""
+    # Join request threads on server_close() so shutdown is graceful
+    daemon_threads = False
+    block_on_close = True
+
+    def __init__(self, listener: socket.socket, handler_class,
+                 max_jobs: int = 0,
+                 jobs_done: Optional[Callable[[], int]] = None):
+        super().__init__(listener.getsockname(), handler_class,
+                         bind_and_activate=False)
+        self.socket.close()
+        self.socket = listener
+        # What server_bind() would have set
+        host, self.server_port = self.server_address[:2]
+        self.server_name = socket.getfqdn(host)
+        self.max_jobs = max_jobs if jobs_done is not None else 0
+        self.jobs_done = jobs_done
+        self.recycling = False
+        # Keep-alive connections waiting for their next request
+        self.draining = False
+        self._idle = set()
+        self._idle_lock = threading.Lock()
+
+    def service_actions(self):
+        # Called by serve_forever() between polls of the socket
+        if (self.max_jobs and not self.recycling
+                and self.jobs_done() >= self.max_jobs):
+            self.recycling = True
+            # shutdown() blocks until serve_forever() returns: not on this thread
+            threading.Thread(target=self.shutdown, daemon=True).start()
+
+    def connection_idle(self, connection: socket.socket) -> bool:
+        """
+        Called by a handler before it waits for the next request on a
+        persistent connection.
+
+        Returns:
+            False if the server is draining and the connection should close
+        """
+        with self._idle_lock:
+            if self.draining:
+                return False
+            self._idle.add(connection)
+            return True
+
+    def connection_busy(self, connection: socket.socket) -> None:
+        """Called by a handler once a request line has arrived (or the
+        connection is done)."""
+        with self._idle_lock:
+            self._idle.discard(connection)
+
+    def close_idle_connections(self) -> None:
+        """Stop keep-alive: wake idle connections so their threads exit, and
+        make busy ones close after their current response."""
+        with self._idle_lock:
+            self.draining = True
+            for connection in self._idle:
+                try:
+                    connection.shutdown(socket.SHUT_RD)
+                except OSError:
+                    pass
+            self._idle.clear()
+
+
+class PreforkServer:
+    """
+    Serves one HTTP handler class from a fixed number of forked workers.
+    """
+    def __init__(self, address: Tuple[str, int], handler_class,
+                 workers: int = 2, backlog: int = 64, max_jobs: int = 0,
+                 graceful_timeout: float = 30.0,
+                 jobs_done: Optional[Callable[[], int]] = None,
+                 on_worker_exit: Optional[Callable[[], None]] = None,
+                 exit_timeout: float = 0.0,
+                 logger: Optional[logging.Logger] = None):
+        """
+        Initialize the server (nothing is bound until serve_forever()).
+
+        Args:
+            address: (host, port) to listen on
+            handler_class: BaseHTTPRequestHandler subclass
+            workers: Number of worker processes
+            backlog: Listen backlog of the shared socket
+            max_jobs: Jobs a worker finishes before it is replaced (0 =
+                never); each worker gets up to 10% jitter so they do not
+                all restart at once
+            graceful_timeout: Seconds workers get to finish in-flight
+                requests on shutdown
+            jobs_done: Returns the number of jobs the calling worker has
+                finished (required for max_jobs)
+            on_worker_exit: Called in a worker after it stopped serving,
+                before it exits (e.g. to let background jobs finish)
+            exit_timeout: Seconds on_worker_exit may take on shutdown
+            logger: Logger instance (optional)
+        """
+        self.address = address
+        self.handler_class = handler_class
+        self.workers = max(1, workers)
+        self.backlog = backlog
+        self.max_jobs = max_jobs
+        self.graceful_timeout = graceful_timeout
+        self.jobs_done = jobs_done
+        self.on_worker_exit = on_worker_exit
+        self.exit_timeout = exit_timeout
+        self.logger = logger or logging.getLogger(__name__)
+        self.socket: Optional[socket.socket] = None
+        self._children: Dict[int, float] = {}
+        # Workers that stopped accepting and are finishing their jobs
+        self._draining: Set[int] = set()
+        self._drain_r = self._drain_w = -1
+        self._stopping = False
+
+    # ── Parent ───────────────────────────────────────────────────────────────
+
+    def _bind(self) -> None:
+        self.socket = socket.create_server(self.address, backlog=self.backlog,
+                                           reuse_port=False)
+        # Every worker polls the same socket; non-blocking accept lets the
+        # ones that lose the race go back to polling instead of blocking
+        self.socket.setblocking(False)
+        # Workers write their pid here when they stop accepting
+        self._drain_r, self._drain_w = os.pipe()
+        os.set_blocking(self._drain_r, False)
+
+    def _spawn(self) -> None:
+        pid = os.fork()
+        if pid == 0:
+            code = 1
+            try:
+                self._run_worker()
+                code = 0
+            except BaseException as e:
+                self.logger.error(f'worker {os.getpid()} failed: {e}')
+            finally:
+                os._exit(code)
+        self._children[pid] = time.time()
+
+    def _request_stop(self, signum, frame) -> None:
+        self._stopping = True
+
+    def _collect_draining(self) -> None:
+        """Note workers that stopped accepting, so they get replaced."""
+        try:
+            data = os.read(self._drain_r, 4096)
+        except BlockingIOError:
+            return
+        for pid in data.split():
+            if int(pid) in self._children:
+                self._draining.add(int(pid))
+
+    def _reap(self) -> None:
+        """Collect exited workers."""
+        while self._children:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                self._children.clear()
+                return
+            if pid == 0:
+                return
+            started = self._children.pop(pid, None)
+            self._draining.discard(pid)
+            if started is not None and os.waitstatus_to_exitcode(status) != 0:
+                self.logger.warning(
+                    f'worker {pid} exited with status '
+                    f'{os.waitstatus_to_exitcode(status)}')
+                if time.time() - started < 1:
+                    # Crashing on start: do not fork in a tight loop
+                    time.sleep(1)
+
+    def serve_forever(self, poll_interval: float = 0.5) -> None:
+        """
+        Bind, fork the workers and keep their number up until SIGTERM or
+        SIGINT, then shut them down gracefully.
+
+        Args:
+            poll_interval: Seconds between checks for exited workers
+        """
+        self._bind()
+        previous = {sig: signal.signal(sig, self._request_stop)
+                    for sig in (signal.SIGTERM, signal.SIGINT)}
+        try:
+            while not self._stopping:
+                self._reap()
+                self._collect_draining()
+                while (len(self._children) - len(self._draining) < self.workers
+                       and not self._stopping):
+                    self._spawn()
+                time.sleep(poll_interval)
+        finally:
+            self._stop_workers()
+            for sig, handler in previous.items():
+                signal.signal(sig, handler)
+            self.socket.close()
+            os.close(self._drain_r)
+            os.close(self._drain_w)
+
+    def _stop_workers(self) -> None:
+        for pid in list(self._children):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+        deadline = time.time() + self.graceful_timeout + self.exit_timeout + 1
+        while self._children and time.time() < deadline:
+            self._reap()
+            time.sleep(0.1)
+        for pid in list(self._children):
+            self.logger.warning(f'worker {pid} did not stop in time; killing it')
+            try:
+                os.kill(pid, signal.SIGKILL)
+                os.waitpid(pid, 0)
+            except (ProcessLookupError, ChildProcessError):
+                pass
+        self._children.clear()
+        self._draining.clear()
+
+    # ── Worker ───────────────────────────────────────────────────────────────
+
+    def _run_worker(self) -> None:
+        os.close(self._drain_r)
+        max_jobs = self.max_jobs
+        if max_jobs:
+            max_jobs += random.randint(0, max_jobs // 10)
+        server = _WorkerHTTPServer(self.socket, self.handler_class, max_jobs,
+                                   self.jobs_done)
+
+        def stop(signum, frame):
+            threading.Thread(target=server.shutdown, daemon=True).start()
+
+        # Ctrl-C reaches the whole process group; the parent coordinates
+        signal.signal(signal.SIGINT, signal.SIG_IGN)
+        signal.signal(signal.SIGTERM, stop)
+
+        server.serve_forever()
+        # No longer accepting: let the parent fork a replacement now
+        os.write(self._drain_w, f'{os.getpid()}\n'.encode())
+        # Joins the threads of in-flight requests, once idle keep-alive
+        # connections have been told to close
+        server.close_idle_connections()
+        server.server_close()
+        if self.on_worker_exit:
+            self.on_worker_exit()
@@ -0,0 +1,131 @@
+"""
+Process-pool scheduler for independent report tasks.
+
+Report sections (processors, sysconfig, process activity, ...) do not
+depend on each other, so they can be computed on separate cores. Tasks and
+their results cross a process boundary and must therefore be picklable:
+module-level functions with plain arguments.
+"""
+
+import logging
+import threading
+from concurrent.futures import ProcessPoolExecutor, as_completed, wait
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Iterable, Iterator, Optional, Tuple
+
+
+class ScheduledTask:
+    """
+    A named unit of work: a module-level callable and its arguments.
+    """
+    def __init__(self, key: str, func: Callable, *args: Any):
+        self.key = key
+        self.func = func
+        self.args = args
+
+    def __call__(self) -> Any:
+        return self.func(*self.args)
+
+
+class TaskScheduler:
+    """
+    Runs independent tasks inline or fanned out to a process pool.
+
+    With max_workers <= 1 tasks run in the calling thread, which keeps
+    environments without multiprocessing support (e.g. serverless
+    functions) working unchanged. The pool is created on first use and
+    shared by every caller in the process.
+    """
+    def __init__(self, max_workers: int = 1,
+                 logger: Optional[logging.Logger] = None):
+        """
+        Initialize the scheduler.
+
+        Args:
+            max_workers: Number of worker processes (<= 1 runs inline)
+            logger: Logger instance (optional)
+        """
+        self.max_workers = max_workers
+        self.logger = logger or logging.getLogger(__name__)
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers)
+            return self._executor
+
+    def _discard_executor(self, executor: ProcessPoolExecutor) -> None:
+        """Drop a broken pool so the next call starts a fresh one."""
+        with self._lock:
+            if self._executor is executor:
+                self._executor = None
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    def _run_inline(self, task: ScheduledTask) -> Any:
+        try:
+            return task()
+        except Exception as e:
+            self.logger.warning(f'{task.key} failed: {e}')
+            return None
+
+    def run(self, tasks: Iterable[ScheduledTask]
+            ) -> Iterator[Tuple[str, Any]]:
+        """
+        Run tasks and yield (key, result) pairs as each one finishes.
+
+        A task that raises (or whose worker dies) is logged as a warning
+        and yields None, so one failing section never sinks the others.
+        If the caller stops early (closing the generator or raising out of
+        its loop), tasks that have not started are cancelled and running
+        ones are waited for, as they may still read the caller's files.
+
+        Args:
+            tasks: Tasks to run
+
+        Yields:
+            Tuples of (task key, task result or None)
+        """
+        tasks = list(tasks)
+        if self.max_workers <= 1 or len(tasks) <= 1:
+            for task in tasks:
+                yield task.key, self._run_inline(task)
+            return
+
+        executor = self._get_executor()
+        futures = {}
+        try:
+            for task in tasks:
+                try:
+                    futures[executor.submit(task.func, *task.args)] = task
+                except (BrokenProcessPool, RuntimeError) as e:
+                    self.logger.warning(
+                        f'{task.key} could not be scheduled ({e}); '
+                        f'running inline')
+                    yield task.key, self._run_inline(task)
+
+            for future in as_completed(futures):
+                task = futures[future]
+                try:
+                    result = future.result()
+                except BrokenProcessPool as e:
+                    self.logger.warning(f'{task.key} failed: worker died ({e})')
+                    self._discard_executor(executor)
+                    result = None
+                except Exception as e:
+                    self.logger.warning(f'{task.key} failed: {e}')
+                    result = None
+                yield task.key, result
+        finally:
+            for future in futures:
+                future.cancel()
+            wait(futures)
+
+    def shutdown(self) -> None:
+        """Stop the worker pool, if one was started."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
@@ -0,0 +1,215 @@
+"""
+In-memory static asset table.
+
+Indexes a built frontend (frontend/dist) once at startup: content type,
+size, a content-hash ETag and the .gz/.br sidecars of every file, plus the
+bytes themselves for files small enough to keep in memory. Serving an
+asset then needs no filesystem access at all for cached files and a single
+os.sendfile() for the large ones. Files under assets/ carry a content hash
+in their name (Vite build output) and are marked immutable; everything
+else is revalidated with If-None-Match.
+"""
+
+import hashlib
+import logging
+import mimetypes
+import os
+import posixpath
+import re
+from typing import Dict, Optional, Tuple
+from urllib.parse import unquote
+
+from .compression import SIDECAR_SUFFIXES, SUPPORTED_ENCODINGS
+
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+REVALIDATE_CACHE_CONTROL = 'no-cache'
+
+# Directory of content-hashed build output (safe to cache forever)
+IMMUTABLE_PREFIX = 'assets/'
+
+# Types the platform mimetypes table may lack or get wrong
+CONTENT_TYPES = {
+    '.html': 'text/html; charset=utf-8',
+    '.js': 'text/javascript; charset=utf-8',
+    '.mjs': 'text/javascript; charset=utf-8',
+    '.css': 'text/css; charset=utf-8',
+    '.json': 'application/json',
+    '.map': 'application/json',
+    '.svg': 'image/svg+xml',
+    '.ico': 'image/x-icon',
+    '.webmanifest': 'application/manifest+json',
+    '.woff2': 'font/woff2',
+    '.woff': 'font/woff',
+    '.ttf': 'font/ttf',
+    '.txt': 'text/plain; charset=utf-8',
+    '.wasm': 'application/wasm',
+}
+
+_RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+def content_type(path: str) -> str:
+    """Content-Type header value for a file name."""
+    ext = os.path.splitext(path)[1].lower()
+    if ext in CONTENT_TYPES:
+        return CONTENT_TYPES[ext]
+    guessed, _ = mimetypes.guess_type(path)
+    return guessed or 'application/octet-stream'
+
+
+def parse_range(header: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+    """
+    Parse a single-range Range header.
+
+    Args:
+        header: Range header value (e.g. 'bytes=0-1023', 'bytes=-500')
+        size: Size of the representation
+
+    Returns:
+        Inclusive (start, end) byte positions, or None when the header is
+        absent, malformed or asks for several ranges (serve the whole body)
+
+    Raises:
+        ValueError: If the range is well-formed but not satisfiable
+    """
+    match = _RANGE_RE.match((header or '').strip())
+    if not match or match.group(1) == match.group(2) == '':
+        return None
+    first, last = match.groups()
+    if first == '':
+        length = int(last)
+        if length == 0:
+            raise ValueError('empty suffix range')
+        return max(0, size - length), size - 1
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or start > end:
+        raise ValueError(f'range {header} outside 0-{size - 1}')
+    return start, end
+
+
+class Representation:
+    """
+    One stored form of an asset: the file itself or a compressed sidecar.
+    """
+    def __init__(self, path: str, size: int, etag: str,
+                 encoding: Optional[str] = None, body: Optional[bytes] = None):
+        self.path = path
+        self.size = size
+        self.etag = etag
+        self.encoding = encoding
+        self.body = body
+
+
+class StaticAsset:
+    """
+    A servable file with its representations and caching headers.
+    """
+    def __init__(self, name: str, content_type: str, cache_control: str,
+                 identity: Representation,
+                 encoded: Dict[str, Representation]):
+        self.name = name
+        self.content_type = content_type
+        self.cache_control = cache_control
+        self.identity = identity
+        self.encoded = encoded
+
+    def representation(self, encoding: Optional[str]) -> Representation:
+        return self.encoded[encoding] if encoding else self.identity
+
+
+class StaticAssets:
+    """
+    Startup index of a static directory, answering lookups by URL path.
+    """
+    def __init__(self, root: str, max_file_size: int = 256 * 1024,
+                 max_memory: int = 64 * 1024 * 1024,
+                 logger: Optional[logging.Logger] = None):
+        """
+        Initialize an empty index; call load() to scan the directory.
+
+        Args:
+            root: Directory holding the built frontend
+            max_file_size: Largest file (or sidecar) kept in memory
+            max_memory: Total bytes kept in memory
+            logger: Logger instance (optional)
+        """
+        self.root = root
+        self.max_file_size = max_file_size
+        self.max_memory = max_memory
+        self.logger = logger or logging.getLogger(__name__)
+        self.assets: Dict[str, StaticAsset] = {}
+        self.memory = 0
+
+    def _read(self, path: str, size: int, digest) -> Optional[bytes]:
+        """Hash a file; return its bytes if they fit the memory budget."""
+        keep = (size <= self.max_file_size
+                and self.memory + size <= self.max_memory)
+        chunks = []
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b''):
+                digest.update(chunk)
+                if keep:
+                    chunks.append(chunk)
+        if not keep:
+            return None
+        self.memory += size
+        return b''.join(chunks)
+
+    def _representation(self, path: str,
+                        encoding: Optional[str] = None) -> Representation:
+        size = os.path.getsize(path)
+        digest = hashlib.sha1()
+        body = self._read(path, size, digest)
+        tag = digest.hexdigest()[:20]
+        etag = f'"{tag}-{encoding}"' if encoding else f'"{tag}"'
+        return Representation(path, size, etag, encoding, body)
+
+    def load(self) -> int:
+        """
+        Scan the root directory, replacing any previous index.
+
+        Returns:
+            Number of assets indexed
+        """
+        sidecars = tuple(SIDECAR_SUFFIXES.values())
+        assets = {}
+        self.memory = 0
+        for dirpath, _, filenames in os.walk(self.root):
+            for filename in filenames:
+                if filename.endswith(sidecars) or filename.endswith('.tmp'):
+                    continue
+                path = os.path.join(dirpath, filename)
+                name = os.path.relpath(path, self.root).replace(os.sep, '/')
+                try:
+                    identity = self._representation(path)
+                    encoded = {}
+                    for encoding in SUPPORTED_ENCODINGS:
+                        sidecar = path + SIDECAR_SUFFIXES[encoding]
+                        if os.path.isfile(sidecar):
+                            encoded[encoding] = self._representation(sidecar, encoding)
+                except OSError as e:
+                    self.logger.warning(f'static asset {name} skipped: {e}')
+                    continue
+                cache_control = (IMMUTABLE_CACHE_CONTROL
+                                 if name.startswith(IMMUTABLE_PREFIX)
+                                 else REVALIDATE_CACHE_CONTROL)
+                assets[name] = StaticAsset(name, content_type(name),
+                                           cache_control, identity, encoded)
+        self.assets = assets
+        return len(assets)
+
+    def lookup(self, url_path: str) -> Optional[StaticAsset]:
+        """
+        Asset for a request path.
+
+        Args:
+            url_path: Path component of the request URL (no query)
+
+        Returns:
+            The asset, or None if no such file was indexed
+        """
+        name = posixpath.normpath(unquote(url_path)).lstrip('/')
+        if name in ('', '.'):
+            name = 'index.html'
+        return self.assets.get(name)
@@ -1,19 +1,18 @@
 """
 Factory for creating domain-specific data processors.
+
+Processor modules import pandas and plotly, which dominate cold-start
+time, so the registry holds import paths that are resolved on first use,
+next to the capture files each processor reads (so building an upload
+manifest never imports a processor).
 """
 
+import importlib
+import importlib.util
 import logging
-from typing import Dict, Optional
+from typing import Dict, List, Optional, Set, Tuple, Union
 from core.base import BaseDataProcessor, DataProcessorError
 
-# Performance Analysis domains
-from .perfanalysis.cpu.mpstat import CPUProcessor
-from .perfanalysis.disk.diskiostat import DiskIostatProcessor
-from .perfanalysis.disk.diskmetrics import DiskMetricsProcessor
-from .perfanalysis.disk.diskhighres import DiskHighResProcessor
-from .perfanalysis.memory.vmstat import MemoryProcessor
-from .perfanalysis.network.sarnet import NetworkProcessor
-
 # Process Information domains
 # NOTE: Process info and system config processors are not used in
 # the current implementation. They only provide legacy function
@@ -27,15 +26,16 @@ class ProcessorFactory:
     """
     Factory class for creating domain-specific data processors.
     """
-    # Registry of available processors
-    _processors = {
+    # Registry of available processors: 'module:Class' paths (relative to
+    # this package) until first use, then the imported classes
+    _processors: Dict[str, Union[str, type]] = {
         # Performance Analysis processors
-        'cpu': CPUProcessor,
-        'diskiostat': DiskIostatProcessor,
-        'diskmetrics': DiskMetricsProcessor,
-        'diskhighres': DiskHighResProcessor,
-        'memory': MemoryProcessor,
-        'network': NetworkProcessor,
+        'cpu': '.perfanalysis.cpu.mpstat:CPUProcessor',
+        'diskiostat': '.perfanalysis.disk.diskiostat:DiskIostatProcessor',
+        'diskmetrics': '.perfanalysis.disk.diskmetrics:DiskMetricsProcessor',
+        'diskhighres': '.perfanalysis.disk.diskhighres:DiskHighResProcessor',
+        'memory': '.perfanalysis.memory.vmstat:MemoryProcessor',
+        'network': '.perfanalysis.network.sarnet:NetworkProcessor',
 
         # Process Information processors
         # NOTE: Process info and system config processors are not used in
@@ -45,6 +45,64 @@ class ProcessorFactory:
         # HTML Generation is handled by functions/generate_html.py
     }
 
+    # Capture files each registered processor reads (its capture_files,
+    # checked when the class is imported)
+    _capture_files: Dict[str, Tuple[str, ...]] = {
+        'cpu': ('mpstat.txt', 'info.txt'),
+        'diskiostat': ('iostat-data.out',),
+        'diskmetrics': ('iostat-data.out',),
+        'diskhighres': ('diskstats_log.txt',),
+        'memory': ('vmstat-data.out',),
+        'network': ('sarnetwork.txt', 'info.txt'),
+    }
+
+    @classmethod
+    def _resolve(cls, processor_type: str) -> type:
+        """
+        Import a registered processor class on first use.
+
+        Args:
+            processor_type: Registered processor type
+
+        Returns:
+            Processor class
+        """
+        entry = cls._processors[processor_type]
+        if isinstance(entry, str):
+            module_name, class_name = entry.split(':')
+            module = importlib.import_module(module_name, __package__)
+            entry = getattr(module, class_name)
+            if tuple(entry.capture_files) != cls._capture_files.get(processor_type):
+                raise DataProcessorError(
+                    f"Registered capture files of {processor_type} do not "
+                    f"match {class_name}.capture_files")
+            cls._processors[processor_type] = entry
+        return entry
+
+    @classmethod
+    def modules(cls) -> List[str]:
+        """
+        Absolute names of the registered processor modules, without
+        importing them (e.g. for a forkserver to import up front).
+        """
+        names = []
+        for entry in cls._processors.values():
+            if isinstance(entry, str):
+                names.append(importlib.util.resolve_name(entry.split(':')[0],
+                                                         __package__))
+            else:
+                names.append(entry.__module__)
+        return names
+
+    @classmethod
+    def preload(cls) -> None:
+        """
+        Import every registered processor now (e.g. before forking workers
+        that should share the imported modules).
+        """
+        for processor_type in list(cls._processors):
+            cls._resolve(processor_type)
+
     @classmethod
     def create_processor(
         self,
@@ -75,7 +133,7 @@ class ProcessorFactory:
                 f"Available types: {available_types}"
             )
 
-        processor_class = self._processors[processor_type]
+        processor_class = self._resolve(processor_type)
         return processor_class(input_file, output_dir, logger)
 
     @classmethod
@@ -98,6 +156,20 @@ class ProcessorFactory:
             # HTML Generation is handled by functions/generate_html.py
         }
 
+    @classmethod
+    def get_capture_files(cls) -> Set[str]:
+        """
+        Get the capture file names read by the registered processors,
+        without importing them.
+
+        Returns:
+            Set of file names relative to the capture directory
+        """
+        files = set()
+        for names in cls._capture_files.values():
+            files.update(names)
+        return files
+
     @classmethod
     def register_processor(cls, processor_type: str,
                            processor_class: type) -> None:
@@ -114,3 +186,4 @@ class ProcessorFactory:
             )
 
         cls._processors[processor_type] = processor_class
+        cls._capture_files[processor_type] = tuple(processor_class.capture_files)
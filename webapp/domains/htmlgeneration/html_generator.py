@@ -51,8 +51,15 @@ def generate_report(
     vmstat_figs,
     sarnet_figs,
     diskstats_figs,
-    output_filename='linuxaioperf_report.html'
+    output_filename='linuxaioperf_report.html',
+    data_dir='.'
 ):
+    """
+    Render the HTML report for the capture files in data_dir.
+
+    The report is written to output_filename, resolved relative to
+    data_dir unless it is an absolute path.
+    """
 
     # Do not change, this are links to flask static files
     static_url = "/static/report_style.css"
@@ -77,7 +84,7 @@ def generate_report(
         "<!-- header.script2_placeholder -->",
         rp)
 
-    if os.stat("lvs.txt").st_size != 0:
+    if os.stat(os.path.join(data_dir, "lvs.txt")).st_size != 0:
         rp = """
                     <div class="subtab" onclick="event.stopPropagation();
                     openTab(event, 'subcontent-lvmdisplay')">LVM Layout</div>
@@ -92,9 +99,10 @@ def generate_report(
 
     # System Configuration - Information
     # Check if the file "info.txt" exists
-    if os.path.exists("info.txt"):
+    info_path = os.path.join(data_dir, "info.txt")
+    if os.path.exists(info_path):
         # Execute the code only if the file exists
-        with open("info.txt", "r") as file:
+        with open(info_path, "r") as file:
             runtimeinfo = file.read()
 
         rp = ""
@@ -113,7 +121,7 @@ def generate_report(
                 <h2>os-release</h2>
             <div class="console-output">
             """
-    osrelease = print_file_contents("os-release")
+    osrelease = print_file_contents(os.path.join(data_dir, "os-release"))
     rp += osrelease
     rp += """</div>"""
 
@@ -127,7 +135,7 @@ def generate_report(
             <h2>lshw</h2>
             <div class="console-output">
             """
-    lshw = print_file_contents("lshw.txt")
+    lshw = print_file_contents(os.path.join(data_dir, "lshw.txt"))
     rp += lshw
     rp += """</div>"""
 
@@ -140,7 +148,7 @@ def generate_report(
             <h2>dmidecode</h2>
             <div class="console-output">
             """
-    dmidecode = print_file_contents("dmidecode.txt")
+    dmidecode = print_file_contents(os.path.join(data_dir, "dmidecode.txt"))
     rp += dmidecode
     rp += """</div>"""
 
@@ -154,7 +162,7 @@ def generate_report(
             <h2>lssci</h2>
             <div class="console-output">
             """
-    lssci = print_file_contents("lsscsi.txt")
+    lssci = print_file_contents(os.path.join(data_dir, "lsscsi.txt"))
     rp += lssci
     rp += """</div>"""
 
@@ -167,7 +175,7 @@ def generate_report(
             <h2>lsblk -f</h2>
             <div class="console-output">
             """
-    lsblk = print_file_contents("lsblk-f.txt")
+    lsblk = print_file_contents(os.path.join(data_dir, "lsblk-f.txt"))
     rp += lsblk
     rp += """</div>"""
 
@@ -180,7 +188,7 @@ def generate_report(
             <h2>df -h</h2>
             <div class="console-output">
             """
-    dfh = print_file_contents("df-h.txt")
+    dfh = print_file_contents(os.path.join(data_dir, "df-h.txt"))
     rp += dfh
     rp += """</div>"""
 
@@ -193,7 +201,7 @@ def generate_report(
             <h2>ls -l dev mapper</h2>
             <div class="console-output">
             """
-    lsldevmapper = print_file_contents("ls-l-dev-mapper.txt")
+    lsldevmapper = print_file_contents(os.path.join(data_dir, "ls-l-dev-mapper.txt"))
     rp += lsldevmapper
     rp += """</div>"""
 
@@ -206,20 +214,20 @@ def generate_report(
             <h2>parted -l</h2>
             <div class="console-output">
             """
-    partedl = print_file_contents("parted-l.txt")
+    partedl = print_file_contents(os.path.join(data_dir, "parted-l.txt"))
     rp += partedl
     rp += """</div>"""
 
     # System Configuration - LVM
-    if os.stat("lvs.txt").st_size != 0:
+    if os.stat(os.path.join(data_dir, "lvs.txt")).st_size != 0:
         rp = ""
         rp += """
             <div class="tab-content" id="subcontent-lvmdisplay">
             """
-        pvs = parse_pvs()
-        vgs = parse_vgs()
-        lvs = parse_lvs()
-        svg_contents = create_graph(pvs, vgs, lvs)
+        pvs = parse_pvs(os.path.join(data_dir, "pvs.txt"))
+        vgs = parse_vgs(os.path.join(data_dir, "vgs.txt"))
+        lvs = parse_lvs(os.path.join(data_dir, "lvs.txt"))
+        svg_contents = create_graph(pvs, vgs, lvs, data_dir=data_dir)
 
         for svg_content in svg_contents:
             rp += (
@@ -231,42 +239,42 @@ def generate_report(
                 <h2>pvs</h2>
                 <div class="console-output">
                 """
-        pvs = print_file_contents("pvs.txt")
+        pvs = print_file_contents(os.path.join(data_dir, "pvs.txt"))
         rp += pvs
         rp += """</div>"""
         rp += """
                 <h2>vgs</h2>
                 <div class="console-output">
                 """
-        vgs = print_file_contents("vgs.txt")
+        vgs = print_file_contents(os.path.join(data_dir, "vgs.txt"))
         rp += vgs
         rp += """</div>"""
         rp += """
                 <h2>lvs</h2>
                 <div class="console-output">
                 """
-        lvs = print_file_contents("lvs.txt")
+        lvs = print_file_contents(os.path.join(data_dir, "lvs.txt"))
         rp += lvs
         rp += """</div>"""
         rp += """
                 <h2>pvdisplay</h2>
                 <div class="console-output">
                 """
-        pvdisplay = print_file_contents("pvdisplay.txt")
+        pvdisplay = print_file_contents(os.path.join(data_dir, "pvdisplay.txt"))
         rp += pvdisplay
         rp += """</div>"""
         rp += """
                 <h2>vgdisplay</h2>
                 <div class="console-output">
                 """
-        vgdisplay = print_file_contents("vgdisplay.txt")
+        vgdisplay = print_file_contents(os.path.join(data_dir, "vgdisplay.txt"))
         rp += vgdisplay
         rp += """</div>"""
         rp += """
                 <h2>lvdisplay</h2>
                 <div class="console-output">
                 """
-        lvdisplay = print_file_contents("lvdisplay.txt")
+        lvdisplay = print_file_contents(os.path.join(data_dir, "lvdisplay.txt"))
         rp += lvdisplay
         rp += """</div>"""
         rp += """</div>"""
@@ -281,7 +289,7 @@ def generate_report(
             <h2>CPU Information</h2>
             <div class="console-output">
             """
-    lscpu = print_file_contents("lscpu.txt")
+    lscpu = print_file_contents(os.path.join(data_dir, "lscpu.txt"))
     rp += lscpu
     rp += """</div>"""
 
@@ -295,7 +303,7 @@ def generate_report(
             <h2>Memory Information</h2>
             <div class="console-output">
             """
-    meminfo = print_file_contents("meminfo.txt")
+    meminfo = print_file_contents(os.path.join(data_dir, "meminfo.txt"))
     rp += meminfo
     rp += """</div>"""
 
@@ -309,7 +317,7 @@ def generate_report(
             <h2>Kernel Parameters</h2>
             <div class="console-output">
             """
-    kernelparam = print_file_contents("sysctl.txt")
+    kernelparam = print_file_contents(os.path.join(data_dir, "sysctl.txt"))
     rp += kernelparam
     rp += """</div>"""
 
@@ -323,7 +331,7 @@ def generate_report(
             <h2>Kernel Modules</h2>
             <div class="console-output">
             """
-    kernelmod = print_file_contents("lsmod.txt")
+    kernelmod = print_file_contents(os.path.join(data_dir, "lsmod.txt"))
     rp += kernelmod
     rp += """</div>"""
 
@@ -334,23 +342,23 @@ def generate_report(
     # System Configuration - Security
     rp = ""
 
-    if os.stat("apparmor_status.txt").st_size != 0:
+    if os.stat(os.path.join(data_dir, "apparmor_status.txt")).st_size != 0:
         rp += """
             <h2>apparmor Status</h2>
             <div class="console-output">
             """
-        apparmor = print_file_contents("apparmor_status.txt")
+        apparmor = print_file_contents(os.path.join(data_dir, "apparmor_status.txt"))
         rp += apparmor
         rp += """</div>"""
         content = content.replace(
             "<!-- sysinfo.apparmor_placeholder -->",
             rp)
-    elif os.stat("sestatus.txt").st_size != 0:
+    elif os.stat(os.path.join(data_dir, "sestatus.txt")).st_size != 0:
         rp += """
             <h2>SELinux Status</h2>
             <div class="console-output">
             """
-        sestatus = print_file_contents("sestatus.txt")
+        sestatus = print_file_contents(os.path.join(data_dir, "sestatus.txt"))
         rp += sestatus
         rp += """</div>"""
         content = content.replace(
@@ -434,7 +442,7 @@ def generate_report(
 
     # Process Information - Process Stats CPU
     log_message("Process Information 1/5 - CPU")
-    pidstat_input_file = "pidstat.txt"
+    pidstat_input_file = os.path.join(data_dir, "pidstat.txt")
     pidstat_header = pidstat_extract_header_line(pidstat_input_file)
     chunks, timestamps, chunks_js_object = generate_pidstat(
         pidstat_input_file, pidstat_header)
@@ -486,7 +494,7 @@ def generate_report(
 
     # Process Information - Process Stats IO
     log_message("Process Information 2/5 - IO")
-    pidstatio_input_file = "pidstat-io.txt"
+    pidstatio_input_file = os.path.join(data_dir, "pidstat-io.txt")
     pidstatio_header = pidstatio_extract_header_line(pidstatio_input_file)
     piochunks, piotimestamps, piochunks_js_object = generate_pidstatio(
         pidstatio_input_file, pidstatio_header)
@@ -541,7 +549,7 @@ def generate_report(
 
     # Process Information - Process Stats Memory
     log_message("Process Information 3/5 - Memory")
-    pidstatmem_input_file = "pidstat-memory.txt"
+    pidstatmem_input_file = os.path.join(data_dir, "pidstat-memory.txt")
     pidstatmem_header = pidstatmem_extract_header_line(pidstatmem_input_file)
     memchunks, memtimestamps, memchunks_js_object = generate_pidstatmem(
         pidstatmem_input_file, pidstatmem_header)
@@ -598,7 +606,8 @@ def generate_report(
 
     # Process Information - top
     log_message("Process Information 4/5 - top")
-    top_chunks_js_object, top_timestamps = generate_top("top.txt")
+    top_chunks_js_object, top_timestamps = generate_top(
+        os.path.join(data_dir, "top.txt"))
 
     rp = ""
     rp += f'''
@@ -650,7 +659,8 @@ def generate_report(
 
     # Process Information - iotop
     log_message("Process Information 5/5 - iotop")
-    iotop_timestamps, iotop_chunks_js_object = generate_iotop("iotop.txt")
+    iotop_timestamps, iotop_chunks_js_object = generate_iotop(
+        os.path.join(data_dir, "iotop.txt"))
 
     rp = ""
     rp += f'''
@@ -705,7 +715,8 @@ def generate_report(
     rp = ""
 
     try:
-        top_cpu_data = extract_top_cpu_consumers("pidstat.txt", top_n=10)
+        top_cpu_data = extract_top_cpu_consumers(
+            os.path.join(data_dir, "pidstat.txt"), top_n=10)
 
         if top_cpu_data['timestamps']:
             # Color palette for distinct process lines
@@ -866,7 +877,8 @@ def generate_report(
     rp = ""
 
     try:
-        top_io_data = extract_top_io_consumers("pidstat-io.txt", top_n=10)
+        top_io_data = extract_top_io_consumers(
+            os.path.join(data_dir, "pidstat-io.txt"), top_n=10)
 
         if top_io_data['timestamps']:
             # Color palette for distinct process lines
@@ -1028,7 +1040,7 @@ def generate_report(
 
     try:
         top_mem_data = extract_top_mem_consumers(
-            "pidstat-memory.txt", top_n=10)
+            os.path.join(data_dir, "pidstat-memory.txt"), top_n=10)
 
         if top_mem_data['timestamps']:
             # Color palette for distinct process lines
@@ -1199,7 +1211,7 @@ def generate_report(
         rp)
 
     # Output file path
-    output_filepath = output_filename
+    output_filepath = os.path.join(data_dir, output_filename)
 
     # Write the modified template content to the output file
     with open(output_filepath, 'w') as f:
@@ -0,0 +1,24 @@
+"""
+Ingest Domain
+
+This domain handles reading capture uploads off the wire: streaming
+multipart/form-data parsing, request body framing and manifest-driven
+archive extraction.
+"""
+
+from .archive import capture_member_name, extract_capture
+from .multipart import (
+    MultipartError,
+    MultipartPart,
+    open_request_body,
+    parse_multipart,
+)
+
+__all__ = [
+    'capture_member_name',
+    'extract_capture',
+    'MultipartError',
+    'MultipartPart',
+    'open_request_body',
+    'parse_multipart',
+]
@@ -0,0 +1,140 @@
+"""
+Manifest-driven capture archive extraction.
+
+Reads a .tar.gz capture in stream mode ('r|gz') and writes only the members
+that some processor or extractor declares it needs. The collector's
+'<host>_<date>_linuxaioperfcheck/' directory prefix is stripped on the fly,
+as is the top-level directory of an archive that holds a single one, so
+the capture files land flat in the destination directory. When the
+archive's sha256 is known it is recorded next to the capture files (see
+core.base.CAPTURE_HASH_FILE) so parsed frames can be keyed on it.
+"""
+
+import logging
+import os
+import posixpath
+import re
+import tarfile
+from typing import BinaryIO, Iterable, List, Optional, Set
+
+from core.base import CAPTURE_HASH_FILE
+
+CAPTURE_DIR_SUFFIX = '_linuxaioperfcheck'
+
+_UNSAFE_PREFIX_RE = re.compile(r'^(/|\.\./?)+')
+
+logger = logging.getLogger(__name__)
+
+
+def _safe_member_path(name: str) -> Optional[str]:
+    """Normalize a member name and drop absolute and parent prefixes."""
+    name = _UNSAFE_PREFIX_RE.sub('', posixpath.normpath(name))
+    return None if name in ('', '.') else name
+
+
+def _unflatten(dest_dir: str, root: str, names: Iterable[str],
+               wanted: Optional[Set[str]], extracted: Set[str]) -> None:
+    """
+    Move files extracted with the top-level directory root stripped back
+    under it, once the archive turns out to hold more than that directory.
+    Files that are not wanted under their real name are deleted.
+    """
+    for name in names:
+        extracted.discard(name)
+        src = os.path.join(dest_dir, name)
+        real = f'{root}/{name}'
+        if wanted is not None and real not in wanted:
+            os.remove(src)
+            continue
+        dst = os.path.join(dest_dir, real)
+        os.makedirs(os.path.dirname(dst), exist_ok=True)
+        os.replace(src, dst)
+        extracted.add(real)
+
+
+def capture_member_name(name: str) -> Optional[str]:
+    """
+    Map an archive member name to its path inside the capture directory.
+
+    Args:
+        name: Member name as stored in the archive
+
+    Returns:
+        Relative path with the capture directory prefix removed, or None if
+        nothing remains (e.g. the capture directory entry itself)
+    """
+    name = _safe_member_path(name)
+    if name is None:
+        return None
+    head, _, rest = name.partition('/')
+    if head.endswith(CAPTURE_DIR_SUFFIX):
+        name = rest
+    return name or None
+
+
+def extract_capture(fileobj: BinaryIO, dest_dir: str,
+                    wanted: Optional[Iterable[str]] = None,
+                    archive_hash: Optional[str] = None) -> List[str]:
+    """
+    Extract a capture archive in a single forward pass.
+
+    Args:
+        fileobj: Readable gzip-compressed tar stream (need not be seekable)
+        dest_dir: Directory to write the capture files into
+        wanted: Capture-relative file names to keep; None keeps every
+            regular file
+        archive_hash: sha256 of the archive, recorded in CAPTURE_HASH_FILE;
+            a member of that name in the archive itself is never extracted
+
+    Returns:
+        List of capture-relative names that were written
+
+    Raises:
+        tarfile.TarError: If the stream is not a valid .tar.gz archive
+    """
+    wanted = set(wanted) if wanted is not None else None
+    extracted: Set[str] = set()
+    skipped = 0
+    # Top-level directory shared by every member so far (None before the
+    # first member, '' once a second top-level entry shows up) and the
+    # files extracted with it stripped
+    root: Optional[str] = None
+    under_root: List[str] = []
+
+    with tarfile.open(fileobj=fileobj, mode='r|gz') as tar:
+        for member in tar:
+            path = _safe_member_path(member.name)
+            if path is None:
+                continue
+            top, sep, _ = path.partition('/')
+            if root is None and (sep or member.isdir()):
+                root = top
+            elif root != top or not (sep or member.isdir()):
+                if root and under_root:
+                    _unflatten(dest_dir, root, under_root, wanted, extracted)
+                root, under_root = '', []
+            if not member.isfile():
+                continue
+            name = capture_member_name(path)
+            flattened = name == path and root == top
+            if flattened:
+                name = path.partition('/')[2]
+            if (not name or name == CAPTURE_HASH_FILE
+                    or (wanted is not None and name not in wanted)):
+                skipped += 1
+                continue
+            if name in extracted:
+                # Keep the first copy, matching the old flatten behaviour
+                continue
+            member.name = name
+            tar.extract(member, path=dest_dir, filter='data')
+            extracted.add(name)
+            if flattened:
+                under_root.append(name)
+
+    if archive_hash:
+        with open(os.path.join(dest_dir, CAPTURE_HASH_FILE), 'w') as f:
+            f.write(archive_hash)
+    logger.debug(f"Extracted {len(extracted)} capture files, "
+                 f"skipped {skipped} unused members")
+    return sorted(extracted)
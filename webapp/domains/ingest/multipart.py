@@ -0,0 +1,302 @@
+"""
+Streaming multipart/form-data parser.
+
+Reads a request body incrementally and spools each part to a
+SpooledTemporaryFile, so peak memory per upload is bounded by the spool
+size instead of the archive size. Each part's SHA-256 is computed on the
+way through, so callers can content-address uploads without a second
+pass. Supports both Content-Length and chunked transfer-encoded bodies.
+"""
+
+import email
+import email.message
+import hashlib
+import tempfile
+from typing import BinaryIO, Dict, Optional
+
+DEFAULT_CHUNK_SIZE = 64 * 1024
+DEFAULT_SPOOL_SIZE = 8 * 1024 * 1024
+MAX_PART_HEADER_SIZE = 16 * 1024
+
+
+class MultipartError(ValueError):
+    """Raised when a multipart/form-data body is malformed or truncated."""
+    pass
+
+
+class LengthReader:
+    """
+    File-like reader that stops after Content-Length bytes.
+    """
+    def __init__(self, rfile: BinaryIO, length: int):
+        self.rfile = rfile
+        self.remaining = max(length, 0)
+
+    def read(self, size: int = -1) -> bytes:
+        if self.remaining <= 0:
+            return b''
+        if size < 0 or size > self.remaining:
+            size = self.remaining
+        data = self.rfile.read(size)
+        self.remaining -= len(data)
+        if not data:
+            self.remaining = 0
+        return data
+
+
+class ChunkedReader:
+    """
+    File-like reader that decodes a chunked transfer-encoded body.
+    """
+    def __init__(self, rfile: BinaryIO):
+        self.rfile = rfile
+        self.chunk_left = 0
+        self.eof = False
+
+    def _next_chunk(self) -> None:
+        line = self.rfile.readline(MAX_PART_HEADER_SIZE)
+        if not line:
+            raise MultipartError("Unexpected end of chunked body")
+        try:
+            # Chunk extensions (";name=value") are allowed and ignored
+            self.chunk_left = int(line.split(b';', 1)[0].strip(), 16)
+        except ValueError:
+            raise MultipartError(f"Invalid chunk size line: {line!r}")
+        if self.chunk_left == 0:
+            # Consume optional trailers up to the terminating blank line
+            while True:
+                trailer = self.rfile.readline(MAX_PART_HEADER_SIZE)
+                if trailer in (b'\r\n', b'\n', b''):
+                    break
+            self.eof = True
+
+    def read(self, size: int = -1) -> bytes:
+        if self.eof:
+            return b''
+        if self.chunk_left == 0:
+            self._next_chunk()
+            if self.eof:
+                return b''
+        if size < 0 or size > self.chunk_left:
+            size = self.chunk_left
+        data = self.rfile.read(size)
+        if not data:
+            raise MultipartError("Unexpected end of chunked body")
+        self.chunk_left -= len(data)
+        if self.chunk_left == 0:
+            # Each chunk's data is followed by CRLF
+            self.rfile.readline(MAX_PART_HEADER_SIZE)
+        return data
+
+
+def open_request_body(rfile: BinaryIO, headers) -> BinaryIO:
+    """
+    Wrap a raw request stream so reads stop at the end of the body.
+
+    Args:
+        rfile: Raw socket stream of the request
+        headers: Request headers (email.message.Message-like)
+
+    Returns:
+        File-like object yielding only the request body
+    """
+    transfer_encoding = headers.get('Transfer-Encoding', '') or ''
+    if 'chunked' in transfer_encoding.lower():
+        return ChunkedReader(rfile)
+    try:
+        length = int(headers.get('Content-Length', 0) or 0)
+    except ValueError:
+        raise MultipartError("Invalid Content-Length header")
+    return LengthReader(rfile, length)
+
+
+class MultipartPart:
+    """
+    A single form-data part whose payload is spooled to a temporary file.
+    """
+    def __init__(self, name: str, filename: Optional[str],
+                 content_type: Optional[str], spool_max_size: int):
+        self.name = name
+        self.filename = filename
+        self.content_type = content_type
+        self.size = 0
+        self.file = tempfile.SpooledTemporaryFile(max_size=spool_max_size)
+        self._digest = hashlib.sha256()
+
+    @property
+    def sha256(self) -> str:
+        """Hex SHA-256 of the payload written so far."""
+        return self._digest.hexdigest()
+
+    def write(self, data: bytes) -> None:
+        self.size += len(data)
+        self._digest.update(data)
+        self.file.write(data)
+
+    def read(self) -> bytes:
+        """Return the whole payload (intended for small text fields)."""
+        self.file.seek(0)
+        data = self.file.read()
+        self.file.seek(0)
+        return data
+
+    def close(self) -> None:
+        self.file.close()
+
+
+class _DiscardSink:
+    """Write target for preamble bytes that are not kept."""
+    def write(self, data: bytes) -> None:
+        pass
+
+
+class _StreamBuffer:
+    """
+    Small look-ahead buffer over a body stream used to find delimiters.
+    """
+    def __init__(self, stream: BinaryIO, chunk_size: int):
+        self.stream = stream
+        self.chunk_size = chunk_size
+        # A leading CRLF lets the first delimiter match the same pattern
+        # as the others (RFC 2046 allows it to start the body directly)
+        self.buf = b'\r\n'
+
+    def _fill(self) -> None:
+        data = self.stream.read(self.chunk_size)
+        if not data:
+            raise MultipartError("Unexpected end of multipart body")
+        self.buf += data
+
+    def peek(self, size: int) -> bytes:
+        while len(self.buf) < size:
+            self._fill()
+        return self.buf[:size]
+
+    def read_exact(self, size: int) -> bytes:
+        data = self.peek(size)
+        self.buf = self.buf[size:]
+        return data
+
+    def read_until(self, sep: bytes, limit: int) -> bytes:
+        while True:
+            idx = self.buf.find(sep)
+            if idx >= 0:
+                data = self.buf[:idx]
+                self.buf = self.buf[idx + len(sep):]
+                return data
+            if len(self.buf) > limit:
+                raise MultipartError("Multipart header block too large")
+            self._fill()
+
+    def copy_until(self, sep: bytes, sink) -> None:
+        # Keep enough bytes back that a delimiter split across two reads
+        # is still found on the next pass
+        keep = len(sep) - 1
+        while True:
+            idx = self.buf.find(sep)
+            if idx >= 0:
+                sink.write(self.buf[:idx])
+                self.buf = self.buf[idx + len(sep):]
+                return
+            if len(self.buf) > keep:
+                sink.write(self.buf[:-keep])
+                self.buf = self.buf[-keep:]
+            self._fill()
+
+    def drain(self) -> None:
+        self.buf = b''
+        while self.stream.read(self.chunk_size):
+            pass
+
+
+def parse_boundary(content_type: str) -> bytes:
+    """
+    Extract the multipart boundary from a Content-Type header value.
+
+    Args:
+        content_type: Content-Type header value
+
+    Returns:
+        Boundary as bytes
+
+    Raises:
+        MultipartError: If the header is not multipart or has no boundary
+    """
+    msg = email.message.Message()
+    msg['Content-Type'] = content_type or ''
+    if msg.get_content_maintype() != 'multipart':
+        raise MultipartError("Request is not multipart/form-data")
+    boundary = msg.get_param('boundary')
+    if not boundary:
+        raise MultipartError("Missing multipart boundary")
+    return str(boundary).encode('latin-1')
+
+
+def parse_multipart(body: BinaryIO, content_type: str,
+                    spool_max_size: int = DEFAULT_SPOOL_SIZE,
+                    chunk_size: int = DEFAULT_CHUNK_SIZE
+                    ) -> Dict[str, MultipartPart]:
+    """
+    Parse a multipart/form-data body without buffering it in memory.
+
+    Args:
+        body: Request body stream (see open_request_body)
+        content_type: Content-Type header value carrying the boundary
+        spool_max_size: Bytes kept in memory per part before spilling
+            to a temporary file
+        chunk_size: Read size used on the body stream
+
+    Returns:
+        Dictionary mapping field names to parts, each rewound to offset 0.
+        The caller owns the parts and must close() them.
+
+    Raises:
+        MultipartError: If the body is malformed or truncated
+    """
+    delimiter = b'\r\n--' + parse_boundary(content_type)
+    stream = _StreamBuffer(body, chunk_size)
+    parts: Dict[str, MultipartPart] = {}
+
+    try:
+        # Preamble
+        stream.copy_until(delimiter, _DiscardSink())
+
+        while True:
+            if stream.peek(2) == b'--':
+                break
+            # Rest of the delimiter line (transport padding is allowed)
+            stream.read_until(b'\r\n', MAX_PART_HEADER_SIZE)
+
+            if stream.peek(2) == b'\r\n':
+                raw_headers = b''
+                stream.read_exact(2)
+            else:
+                raw_headers = stream.read_until(b'\r\n\r\n',
+                                                MAX_PART_HEADER_SIZE)
+            headers = email.message_from_bytes(raw_headers + b'\r\n\r\n')
+            name = headers.get_param('name', header='content-disposition')
+            filename = headers.get_param('filename',
+                                         header='content-disposition')
+
+            part = MultipartPart(
+                str(name or ''),
+                str(filename) if filename else None,
+                headers.get('Content-Type'),
+                spool_max_size,
+            )
+            stream.copy_until(delimiter, part)
+            part.file.seek(0)
+
+            if part.name and part.name not in parts:
+                parts[part.name] = part
+            else:
+                part.close()
+
+        # Epilogue is ignored but consumed so the connection stays in sync
+        stream.drain()
+    except Exception:
+        for part in parts.values():
+            part.close()
+        raise
+
+    return parts
@@ -0,0 +1,19 @@
+"""
+Jobs Domain
+
+This domain handles running long report builds in the background: a
+bounded queue, a fixed pool of worker threads and per-stage progress that
+clients can poll.
+"""
+
+from .manager import DONE, FAILED, QUEUED, RUNNING, Job, JobManager, JobQueueFull
+
+__all__ = [
+    'DONE',
+    'FAILED',
+    'QUEUED',
+    'RUNNING',
+    'Job',
+    'JobManager',
+    'JobQueueFull',
+]
@@ -0,0 +1,478 @@
+"""
+Bounded in-process job queue.
+
+Long-running work (building a report from a large capture) is submitted as a
+job and run by a fixed number of worker threads, so HTTP requests return
+immediately and clients poll for the outcome. The queue has a hard limit:
+when it is full, submit() raises JobQueueFull instead of letting work pile
+up without bound.
+
+When several server processes share one port (scripts/serve.py in prefork
+mode) a poll can reach a process other than the one running the job. With
+a state_dir, every status change is written there as <id>.json (and the
+result as <id>.result), so any process can answer for any job.
+"""
+
+import json
+import logging
+import os
+import re
+import tempfile
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Any, Callable, Deque, Dict, Iterable, List, Optional, Tuple
+
+QUEUED = 'queued'
+RUNNING = 'running'
+DONE = 'done'
+FAILED = 'failed'
+
+_ID_RE = re.compile(r'^[A-Za-z0-9_-]+$')
+
+
+def _process_alive(pid: Optional[int]) -> bool:
+    """Whether a process on this host still exists."""
+    if not pid:
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+class JobQueueFull(Exception):
+    """Raised when a job is submitted while the queue is at capacity."""
+    pass
+
+
+class Job:
+    """
+    A unit of queued work and its progress.
+
+    The job function is called as func(job, *args) and may call
+    job.complete_stage(name) as it makes progress; its return value becomes
+    job.result.
+    """
+    def __init__(self, job_id: str, func: Optional[Callable] = None,
+                 args: tuple = (), stages: Iterable[str] = ()):
+        self.id = job_id
+        self.func = func
+        self.args = args
+        self.status = QUEUED
+        self.stages: Dict[str, bool] = {name: False for name in stages}
+        self.error: Optional[str] = None
+        self.created = time.time()
+        self.started: Optional[float] = None
+        self.finished: Optional[float] = None
+        # Called after every status change (set by a JobManager with a state_dir)
+        self.on_change: Optional[Callable[['Job'], None]] = None
+        # Queue position when the job was last saved (jobs loaded from disk)
+        self.saved_position = 0
+        self._result: Any = None
+        self._result_path: Optional[str] = None
+
+    @property
+    def result(self) -> Any:
+        """Job result; read on first access for jobs loaded from disk."""
+        if self._result is None and self._result_path:
+            try:
+                with open(self._result_path, 'rb') as f:
+                    self._result = f.read()
+            except FileNotFoundError:
+                pass
+        return self._result
+
+    @result.setter
+    def result(self, value: Any) -> None:
+        self._result = value
+
+    def complete_stage(self, name: str) -> None:
+        self.stages[name] = True
+        if self.on_change:
+            self.on_change(self)
+
+    @property
+    def active(self) -> bool:
+        return self.status in (QUEUED, RUNNING)
+
+    def to_dict(self) -> dict:
+        """JSON-serialisable status (the result itself is not included)."""
+        done = sum(self.stages.values())
+        return {
+            'job_id': self.id,
+            'status': self.status,
+            'progress': {'completed': done, 'total': len(self.stages)},
+            'stages': [{'name': name, 'status': DONE if finished else 'pending'}
+                       for name, finished in self.stages.items()],
+            'error': self.error,
+            'created': self.created,
+            'started': self.started,
+            'finished': self.finished,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict, result_path: Optional[str] = None) -> 'Job':
+        """
+        Rebuild a job snapshot from to_dict() output.
+
+        Args:
+            data: Saved status
+            result_path: File holding the result bytes of a finished job
+
+        Returns:
+            Job without a function (it is never run)
+        """
+        job = cls(data['job_id'], stages=[s['name'] for s in data['stages']])
+        for stage in data['stages']:
+            job.stages[stage['name']] = stage['status'] == DONE
+        job.status = data['status']
+        job.error = data['error']
+        job.created = data['created']
+        job.started = data['started']
+        job.finished = data['finished']
+        job.saved_position = data.get('queue_position', 0)
+        job._result_path = result_path
+        return job
+
+
+class JobManager:
+    """
+    Runs submitted jobs on a fixed pool of daemon worker threads.
+    """
+    def __init__(self, max_workers: int = 2, max_queue: int = 16,
+                 retention: float = 3600, max_finished: int = 32,
+                 state_dir: Optional[str] = None,
+                 logger: Optional[logging.Logger] = None):
+        """
+        Initialize the manager. Worker threads start on first submit, so a
+        manager created before os.fork() works in the child.
+
+        Args:
+            max_workers: Number of jobs run concurrently
+            max_queue: Jobs allowed to wait for a worker before submit()
+                raises JobQueueFull
+            retention: Seconds a finished job (and its result) is kept
+            max_finished: Finished jobs kept regardless of retention
+            state_dir: Directory shared with other processes for job
+                status and results (optional)
+            logger: Logger instance (optional)
+        """
+        self.max_workers = max(1, max_workers)
+        self.max_queue = max_queue
+        self.retention = retention
+        self.max_finished = max_finished
+        self.state_dir = state_dir
+        self.logger = logger or logging.getLogger(__name__)
+        self._jobs: 'OrderedDict[str, Job]' = OrderedDict()
+        self._pending: Deque[Job] = deque()
+        self._cond = threading.Condition()
+        self._save_lock = threading.Lock()
+        # Jobs that finished but whose final state is still being saved
+        self._finishing = 0
+        self._workers = []
+
+    def _start_workers(self) -> None:
+        while len(self._workers) < self.max_workers:
+            worker = threading.Thread(target=self._work, daemon=True,
+                                      name=f'job-worker-{len(self._workers)}')
+            worker.start()
+            self._workers.append(worker)
+
+    def _prune(self) -> None:
+        """Forget finished jobs past their retention (call with lock held)."""
+        now = time.time()
+        finished = [job for job in self._jobs.values()
+                    if not job.active and job.finished is not None]
+        excess = len(finished) - self.max_finished
+        for job in finished:
+            if excess > 0 or now - job.finished > self.retention:
+                del self._jobs[job.id]
+                self._discard(job.id)
+                excess -= 1
+
+    # ── Shared state ─────────────────────────────────────────────────────────
+
+    def _state_path(self, job_id: str, suffix: str) -> str:
+        if not _ID_RE.match(job_id):
+            raise ValueError(f"Invalid job id: {job_id!r}")
+        return os.path.join(self.state_dir, job_id + suffix)
+
+    def _write(self, path: str, data: bytes) -> None:
+        fd, tmp_path = tempfile.mkstemp(dir=self.state_dir, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    def _save(self, job: Job) -> None:
+        """Write a job's status (and result, once done) to the state dir."""
+        if not self.state_dir:
+            return
+        # Snapshot and write under one lock: a progress update taken before
+        # the job finished must not land after the final state
+        with self._save_lock:
+            with self._cond:
+                if self._jobs.get(job.id) is not job:
+                    # Forgotten or pruned: its state is gone for good
+                    return
+            status = job.to_dict()
+            status['queue_position'] = self.position(job)
+            status['pid'] = os.getpid()
+            try:
+                os.makedirs(self.state_dir, exist_ok=True)
+                if job.status == DONE and isinstance(job.result, bytes):
+                    # Result first: a reader that sees DONE finds it in place
+                    self._write(self._state_path(job.id, '.result'), job.result)
+                self._write(self._state_path(job.id, '.json'),
+                            json.dumps(status).encode('utf-8'))
+            except (OSError, ValueError) as e:
+                self.logger.warning(f'job state write failed for {job.id}: {e}')
+
+    def _load(self, job_id: str) -> Optional[Job]:
+        """Job snapshot saved by another process, or None."""
+        if not self.state_dir:
+            return None
+        try:
+            with open(self._state_path(job_id, '.json'), 'rb') as f:
+                data = json.loads(f.read())
+            job = Job.from_dict(data, self._state_path(job_id, '.result'))
+        except (OSError, ValueError, KeyError):
+            return None
+        if job.active and not _process_alive(data.get('pid')):
+            job.status = FAILED
+            job.error = 'Server process exited before the job finished'
+            job.finished = time.time()
+        if not job.active and time.time() - job.finished > self.retention:
+            self._discard(job_id)
+            return None
+        return job
+
+    def _discard(self, job_id: str) -> None:
+        if not self.state_dir:
+            return
+        for suffix in ('.json', '.result'):
+            try:
+                os.remove(self._state_path(job_id, suffix))
+            except (OSError, ValueError):
+                pass
+
+    def submit(self, job_id: str, func: Callable, *args: Any,
+               stages: Iterable[str] = ()) -> Job:
+        """
+        Queue a job.
+
+        Args:
+            job_id: Identifier clients use to poll the job
+            func: Callable run as func(job, *args) on a worker thread
+            *args: Extra arguments for func
+            stages: Stage names reported as progress
+
+        Returns:
+            The queued job
+
+        Raises:
+            JobQueueFull: If max_queue jobs are already waiting
+        """
+        with self._cond:
+            job = self._enqueue(job_id, func, args, stages)
+        self._watch(job)
+        return job
+
+    def get_or_submit(self, job_id: str, func: Callable, *args: Any,
+                      stages: Iterable[str] = ()) -> Tuple[Job, bool]:
+        """
+        Queue a job unless one with this id is already queued, running or
+        done; the lookup and the insert happen under one lock, so two
+        submissions of the same id never both run.
+
+        Args:
+            job_id: Identifier clients use to poll the job
+            func: Callable run as func(job, *args) on a worker thread
+            *args: Extra arguments for func
+            stages: Stage names reported as progress
+
+        Returns:
+            (job, submitted): the new job and True, or the existing job and
+            False (func will not be called; its arguments are the caller's
+            to clean up)
+
+        Raises:
+            JobQueueFull: If max_queue jobs are already waiting
+        """
+        with self._cond:
+            self._prune()
+            job = self._jobs.get(job_id)
+            if job is not None and job.status != FAILED:
+                return job, False
+            job = self._enqueue(job_id, func, args, stages)
+        self._watch(job)
+        return job, True
+
+    def _enqueue(self, job_id: str, func: Callable, args: tuple,
+                 stages: Iterable[str]) -> Job:
+        """Create a job and put it in line (call with lock held)."""
+        if len(self._pending) >= self.max_queue:
+            raise JobQueueFull(
+                f"Job queue is full ({self.max_queue} waiting)")
+        self._prune()
+        job = Job(job_id, func, args, stages)
+        self._jobs[job_id] = job
+        self._pending.append(job)
+        self._start_workers()
+        self._cond.notify()
+        return job
+
+    def _watch(self, job: Job) -> None:
+        """Save a new job's state now and on every change."""
+        if self.state_dir:
+            job.on_change = self._save
+            self._save(job)
+
+    def queue_full(self) -> bool:
+        """Whether submit() would currently raise JobQueueFull."""
+        with self._cond:
+            return len(self._pending) >= self.max_queue
+
+    def add_finished(self, job_id: str, result: Any) -> Job:
+        """
+        Record an already-available result as a finished job, unless a job
+        with this id is already queued, running or done.
+
+        Args:
+            job_id: Identifier clients use to poll the job
+            result: Job result
+
+        Returns:
+            The finished job, or the existing one
+        """
+        job = Job(job_id)
+        job.status = DONE
+        job.result = result
+        job.started = job.finished = job.created
+        with self._cond:
+            self._prune()
+            existing = self._jobs.get(job_id)
+            if existing is not None and existing.status != FAILED:
+                return existing
+            self._jobs[job_id] = job
+        self._save(job)
+        return job
+
+    def wait(self, job: Job, timeout: Optional[float] = None) -> bool:
+        """
+        Block until a job of this process is done or failed.
+
+        Args:
+            job: Job returned by submit() or get_or_submit()
+            timeout: Seconds to wait at most (None waits indefinitely)
+
+        Returns:
+            True if the job finished, False on timeout
+        """
+        with self._cond:
+            return self._cond.wait_for(lambda: not job.active, timeout)
+
+    def forget(self, job: Job) -> None:
+        """
+        Drop a finished job and its saved state once its result has been
+        handed out; callers holding the job can still read job.result.
+
+        Args:
+            job: Finished job
+        """
+        if job.active:
+            return
+        # Under the save lock, so a final save still in flight cannot
+        # write the state back after it is discarded
+        with self._save_lock:
+            with self._cond:
+                if self._jobs.get(job.id) is not job:
+                    return
+                del self._jobs[job.id]
+            self._discard(job.id)
+
+    def get(self, job_id: str) -> Optional[Job]:
+        """Job by id, including (with a state_dir) jobs of other processes."""
+        with self._cond:
+            self._prune()
+            job = self._jobs.get(job_id)
+        return job if job is not None else self._load(job_id)
+
+    def active_ids(self) -> List[str]:
+        """Ids of the jobs queued or running in this process."""
+        with self._cond:
+            return [job.id for job in self._jobs.values() if job.active]
+
+    def position(self, job: Job) -> int:
+        """1-based place of a queued job in line, 0 if it is not waiting."""
+        with self._cond:
+            for i, pending in enumerate(self._pending):
+                if pending is job:
+                    return i + 1
+            if self._jobs.get(job.id) is not job:
+                return job.saved_position
+        return 0
+
+    def wait_idle(self, timeout: Optional[float] = None) -> bool:
+        """
+        Block until no job is queued or running (for graceful shutdown).
+
+        Args:
+            timeout: Seconds to wait at most (None waits indefinitely)
+
+        Returns:
+            True if the manager became idle, False on timeout
+        """
+        with self._cond:
+            return self._cond.wait_for(
+                lambda: (not self._finishing
+                         and not any(job.active for job in self._jobs.values())),
+                timeout)
+
+    def _work(self) -> None:
+        while True:
+            with self._cond:
+                while not self._pending:
+                    self._cond.wait()
+                job = self._pending.popleft()
+                job.status = RUNNING
+                job.started = time.time()
+                waiting = list(self._pending) if self.state_dir else []
+            self._save(job)
+            # Everyone still waiting moved up one place
+            for pending in waiting:
+                self._save(pending)
+            result = error = None
+            try:
+                result = job.func(job, *job.args)
+            except Exception as e:
+                self.logger.error(f'job {job.id} failed: {e}')
+                error = str(e)
+            except BaseException:
+                error = 'Job aborted'
+                raise
+            finally:
+                # Status and finish time change together, so _prune never
+                # sees a finished job without a finish time
+                with self._cond:
+                    job.result = result
+                    job.error = error
+                    job.finished = time.time()
+                    job.status = DONE if error is None else FAILED
+                    job.func = job.args = None
+                    self._finishing += 1
+                    self._cond.notify_all()
+                try:
+                    self._save(job)
+                finally:
+                    # wait_idle() returns only once the final state is saved
+                    with self._cond:
+                        self._finishing -= 1
+                        self._cond.notify_all()
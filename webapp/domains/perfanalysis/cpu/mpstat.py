@@ -19,6 +19,9 @@ class CPUProcessor(BaseDataProcessor):
     """
     Processor for CPU performance data from mpstat.
     """
+    capture_files = ('mpstat.txt', 'info.txt')
+    item_column = 1  # CPU
+
     def __init__(self, input_file: str, output_dir: str = ".",
                  logger: logging.Logger = None):
         super().__init__(input_file, output_dir, logger)
@@ -2,18 +2,33 @@
 High-resolution disk statistics processor.
 """
 
-from typing import List
+from typing import Dict, List, Optional, Tuple
 import pandas as pd
 import plotly.graph_objects as go
 import numpy as np
 
 from core.base import BaseDataProcessor, DataProcessorError
+from .pyramid import (RAW_LEVEL, X_COLUMN, build_pyramid, column_name,
+                      display_level, level_stats)
+
+# Rate metrics computed per device and stored in the resolution pyramid
+RATE_METRICS = ('IOPS', 'MB_per_sec', 'Read_Latency', 'Write_Latency')
+
+# Series store table prefix of the pyramid ('diskstats.<level>')
+PYRAMID_TABLE = 'diskstats'
 
 
 class DiskHighResProcessor(BaseDataProcessor):
     """
     Processor for high-resolution disk statistics.
     """
+    capture_files = ('diskstats_log.txt',)
+    item_column = 2  # Device
+
+    # Point budget of the time-series figures: they show the finest
+    # pyramid level whose whole capture fits, finer ones are zoom-only
+    max_points = 2000
+
     def extract_header(self) -> str:
         """High-resolution disk stats don't have a traditional header."""
         return ("Timestamp Major Minor Device Reads_Completed Reads_Merged "
@@ -60,6 +75,9 @@ class DiskHighResProcessor(BaseDataProcessor):
         """
         Calculate IOPS, throughput, and latency from cumulative counters.
 
+        Rates are normalized by the time between samples, so they keep
+        their per-second units at every pyramid level.
+
         Args:
             device_data: Raw device statistics
             device_name: Name of the device being processed
@@ -67,16 +85,20 @@ class DiskHighResProcessor(BaseDataProcessor):
         Returns:
             Device data with calculated rates
         """
+        interval = device_data.index.to_series().diff().dt.total_seconds()
+        interval = interval.where(interval > 0)
+
         # Calculate IOPS
         reads_delta = device_data['Reads_Completed'].diff()
         writes_delta = device_data['Writes_Completed'].diff()
-        device_data['IOPS'] = reads_delta + writes_delta
+        device_data['IOPS'] = (reads_delta + writes_delta) / interval
 
         # Calculate throughput (MB/s)
         sectors_read_delta = device_data['Sectors_Read'].diff()
         sectors_write_delta = device_data['Sectors_Written'].diff()
         device_data['MB_per_sec'] = (
             (sectors_read_delta + sectors_write_delta) * 512 / 1024 / 1024
+            / interval
         )
 
         # Calculate latency (in milliseconds)
@@ -100,52 +122,103 @@ class DiskHighResProcessor(BaseDataProcessor):
 
         return device_data
 
-    def _resample_device_data(self, device_data: pd.DataFrame,
-                              resample_period: str = '1s') -> pd.DataFrame:
+    def _device_rates(self, df: pd.DataFrame) -> pd.DataFrame:
         """
-        Resample device data to a specified time period.
+        Per-sample rates of every device in one frame.
 
         Args:
-            device_data: Device statistics
-            resample_period: Time period for resampling
+            df: Parsed diskstats data
 
         Returns:
-            Resampled device statistics
+            Frame indexed by timestamp with one '<device>.<metric>' column
+            per device and rate metric
         """
-        # Resample the raw counters
-        resampled = device_data[[
-            'Reads_Completed', 'Writes_Completed',
-            'Sectors_Read', 'Sectors_Written',
-            'Time_Reading', 'Time_Writing'
-        ]].resample(resample_period).mean()
-
-        # Calculate rates from resampled data
-        reads_delta = resampled['Reads_Completed'].diff()
-        writes_delta = resampled['Writes_Completed'].diff()
-        resampled['IOPS'] = reads_delta + writes_delta
-
-        sectors_read_delta = resampled['Sectors_Read'].diff()
-        sectors_write_delta = resampled['Sectors_Written'].diff()
-        resampled['MB_per_sec'] = (
-            (sectors_read_delta + sectors_write_delta) * 512 / 1024 / 1024
-        )
+        columns = {}
+        for device in df['Device'].unique():
+            device_data = df[df['Device'] == device]
+            device_data = device_data[~device_data.index.duplicated()].copy()
+            device_data = self._calculate_rates(device_data, device)
+            for metric in RATE_METRICS:
+                columns[f'{device}.{metric}'] = device_data[metric]
+        return pd.DataFrame(columns)
+
+    def _pyramid_figure(self, pyramid: Dict[str, Dict[str, np.ndarray]],
+                        level: str, series: List[Tuple[str, str, dict]],
+                        title: str, y_title: str) -> go.Figure:
+        """
+        Line plot of pyramid series at one level.
 
-        read_time_delta = resampled['Time_Reading'].diff()
-        write_time_delta = resampled['Time_Writing'].diff()
+        Aggregated levels get one trace per statistic and buttons to
+        switch between them; the raw level has only the samples.
 
-        # Avoid division by zero
-        resampled['Read_Latency'] = np.where(
-            reads_delta > 0,
-            read_time_delta / reads_delta,
-            0
-        )
-        resampled['Write_Latency'] = np.where(
-            writes_delta > 0,
-            write_time_delta / writes_delta,
-            0
-        )
+        Args:
+            pyramid: Result of build_pyramid
+            level: Level to plot
+            series: (series, trace label, line style) per plotted series
+            title: Figure title
+            y_title: Y-axis title
 
-        return resampled
+        Returns:
+            Plotly figure
+        """
+        columns = pyramid[level]
+        stats = level_stats(level)
+        fig = go.Figure()
+        for stat in stats:
+            suffix = level if stat == 'mean' else f'{level} {stat}'
+            for name, label, line in series:
+                fig.add_trace(go.Scatter(
+                    x=columns[X_COLUMN],
+                    y=columns[column_name(name, stat)],
+                    mode='lines',
+                    name=f'{label} ({suffix})',
+                    visible=stat == 'mean',
+                    line=dict(shape='linear', **line),
+                    meta={'pyramid': {'table': PYRAMID_TABLE, 'series': name,
+                                      'stat': stat, 'level': level}}
+                ))
+
+        buttons = [
+            dict(
+                label=stat,
+                method="update",
+                args=[{"visible": [s == stat for s in stats
+                                   for _ in series]}]
+            )
+            for stat in stats
+        ]
+        fig.update_layout(
+            title=title,
+            xaxis_title='Time',
+            yaxis_title=y_title,
+            height=500,
+            updatemenus=[dict(
+                type="buttons",
+                direction="right",
+                x=0.1,
+                y=1.15,
+                showactive=True,
+                buttons=buttons
+            )] if len(stats) > 1 else [],
+            xaxis=dict(
+                type="date",
+                tickformat="%m/%d %H:%M:%S"
+            )
+        )
+        return fig
+
+    @staticmethod
+    def _box_stats(values: np.ndarray) -> Optional[dict]:
+        """Precomputed box statistics (Tukey fences) of a series."""
+        values = values[np.isfinite(values)]
+        if not values.size:
+            return None
+        q1, median, q3 = np.percentile(values, [25, 50, 75])
+        iqr = q3 - q1
+        inside = values[(values >= q1 - 1.5 * iqr) & (values <= q3 + 1.5 * iqr)]
+        return dict(q1=[q1], median=[median], q3=[q3],
+                    lowerfence=[inside.min()], upperfence=[inside.max()],
+                    mean=[values.mean()])
 
     def create_plots(self, df: pd.DataFrame) -> List[go.Figure]:
         """Create high-resolution disk performance plots."""
@@ -156,219 +229,61 @@ class DiskHighResProcessor(BaseDataProcessor):
                 return []
 
             devices = df['Device'].unique()
+            pyramid = build_pyramid(self._device_rates(df))
+            self.tables = {f'{PYRAMID_TABLE}.{level}': columns
+                           for level, columns in pyramid.items()}
+            level = display_level(pyramid, self.max_points)
             figures = []
 
-            # Common button menu for resolution switching
-            updatemenus = [dict(
-                type="buttons",
-                direction="right",
-                x=0.1,
-                y=1.15,
-                showactive=True,
-                buttons=[
-                    dict(
-                        label="1s avg",
-                        method="update",
-                        args=[{"visible": [False, True] * len(devices)}]
-                    ),
-                    dict(
-                        label="50ms",
-                        method="update",
-                        args=[{"visible": [True, False] * len(devices)}]
-                    )
-                ]
-            )]
-
             # Create IOPS plot
-            fig_iops = go.Figure()
-            for device in devices:
-                device_data = df[df['Device'] == device].copy()
-                device_data = self._calculate_rates(device_data, device)
-                resample_1s = self._resample_device_data(device_data, '1s')
-
-                fig_iops.add_trace(go.Scatter(
-                    x=device_data.index,
-                    y=device_data['IOPS'],
-                    mode='lines',
-                    name=f'{device} IOPS (50ms)',
-                    visible=False
-                ))
-                fig_iops.add_trace(go.Scatter(
-                    x=resample_1s.index,
-                    y=resample_1s['IOPS'],
-                    mode='lines',
-                    name=f'{device} IOPS (1s avg)',
-                    visible=True
-                ))
-
-            fig_iops.update_layout(
-                title='Disk IOPS Over Time',
-                xaxis_title='Time',
-                yaxis_title='IOPS',
-                height=500,
-                updatemenus=updatemenus,
-                xaxis=dict(
-                    type="date",
-                    tickformat="%m/%d %H:%M:%S"
-                )
-            )
-            fig_iops.update_traces(line={'shape': 'linear'}, mode='lines')
-            figures.append(fig_iops)
+            figures.append(self._pyramid_figure(
+                pyramid, level,
+                [(f'{device}.IOPS', f'{device} IOPS', {})
+                 for device in devices],
+                'Disk IOPS Over Time', 'IOPS'))
 
             # Create Throughput plot
-            fig_throughput = go.Figure()
-            for device in devices:
-                device_data = df[df['Device'] == device].copy()
-                device_data = self._calculate_rates(device_data, device)
-                resample_1s = self._resample_device_data(device_data, '1s')
-
-                fig_throughput.add_trace(go.Scatter(
-                    x=device_data.index,
-                    y=device_data['MB_per_sec'],
-                    mode='lines',
-                    name=f'{device} MB/s (50ms)',
-                    visible=False
-                ))
-                fig_throughput.add_trace(go.Scatter(
-                    x=resample_1s.index,
-                    y=resample_1s['MB_per_sec'],
-                    mode='lines',
-                    name=f'{device} MB/s (1s avg)',
-                    visible=True
-                ))
-
-            fig_throughput.update_layout(
-                title='Disk Throughput Over Time',
-                xaxis_title='Time',
-                yaxis_title='MB/s',
-                height=500,
-                updatemenus=updatemenus,
-                xaxis=dict(
-                    type="date",
-                    tickformat="%m/%d %H:%M:%S"
-                )
-            )
-            fig_throughput.update_traces(line={'shape': 'linear'},
-                                         mode='lines')
-            figures.append(fig_throughput)
+            figures.append(self._pyramid_figure(
+                pyramid, level,
+                [(f'{device}.MB_per_sec', f'{device} MB/s', {})
+                 for device in devices],
+                'Disk Throughput Over Time', 'MB/s'))
 
             # Create Latency plot
-            fig_latency = go.Figure()
+            latency_series = []
             for device in devices:
-                device_data = df[df['Device'] == device].copy()
-                device_data = self._calculate_rates(device_data, device)
-                resample_1s = self._resample_device_data(device_data, '1s')
-
-                # Add read latency traces
-                fig_latency.add_trace(go.Scatter(
-                    x=device_data.index,
-                    y=device_data['Read_Latency'],
-                    mode='lines',
-                    name=f'{device} Read Latency (50ms)',
-                    visible=False
-                ))
-                fig_latency.add_trace(go.Scatter(
-                    x=resample_1s.index,
-                    y=resample_1s['Read_Latency'],
-                    mode='lines',
-                    name=f'{device} Read Latency (1s avg)',
-                    visible=True
-                ))
-
-                # Add write latency traces
-                fig_latency.add_trace(go.Scatter(
-                    x=device_data.index,
-                    y=device_data['Write_Latency'],
-                    mode='lines',
-                    name=f'{device} Write Latency (50ms)',
-                    visible=False,
-                    line=dict(dash='dash')
-                ))
-                fig_latency.add_trace(go.Scatter(
-                    x=resample_1s.index,
-                    y=resample_1s['Write_Latency'],
-                    mode='lines',
-                    name=f'{device} Write Latency (1s avg)',
-                    visible=True,
-                    line=dict(dash='dash')
-                ))
-
-            fig_latency.update_layout(
-                title='Disk Latency Over Time',
-                xaxis_title='Time',
-                yaxis_title='Latency (ms)',
-                height=500,
-                updatemenus=[dict(
-                    type="buttons",
-                    direction="right",
-                    x=0.1,
-                    y=1.15,
-                    showactive=True,
-                    buttons=[
-                        dict(
-                            label="1s avg",
-                            method="update",
-                            args=[{
-                                "visible": [False, True, False, True] *
-                                len(devices)
-                            }]
-                        ),
-                        dict(
-                            label="50ms",
-                            method="update",
-                            args=[{
-                                "visible": [True, False, True, False] *
-                                len(devices)
-                            }]
-                        )
-                    ]
-                )],
-                xaxis=dict(
-                    type="date",
-                    tickformat="%m/%d %H:%M:%S"
-                )
-            )
-            fig_latency.update_traces(line={'shape': 'linear'}, mode='lines')
-            figures.append(fig_latency)
-
-            # Create Latency Boxplot
+                latency_series.append(
+                    (f'{device}.Read_Latency', f'{device} Read Latency', {}))
+                latency_series.append(
+                    (f'{device}.Write_Latency', f'{device} Write Latency',
+                     {'dash': 'dash'}))
+            figures.append(self._pyramid_figure(
+                pyramid, level, latency_series,
+                'Disk Latency Over Time', 'Latency (ms)'))
+
+            # Create Latency Boxplot from precomputed statistics, so the
+            # samples themselves are not shipped: 50ms samples and 1s means
             fig_latency_box = go.Figure()
-            for device in devices:
-                device_data = df[df['Device'] == device].copy()
-                device_data = self._calculate_rates(device_data, device)
-                resample_1s = self._resample_device_data(device_data, '1s')
-
-                # Add 50ms read latency boxplot
-                fig_latency_box.add_trace(go.Box(
-                    y=device_data['Read_Latency'],
-                    name=f'{device} Read (50ms)',
-                    boxpoints=False,
-                    visible=True
-                ))
-
-                # Add 50ms write latency boxplot
-                fig_latency_box.add_trace(go.Box(
-                    y=device_data['Write_Latency'],
-                    name=f'{device} Write (50ms)',
-                    boxpoints=False,
-                    visible=True
-                ))
-
-                # Add 1s read latency boxplot
-                fig_latency_box.add_trace(go.Box(
-                    y=resample_1s['Read_Latency'],
-                    name=f'{device} Read (1s)',
-                    boxpoints=False,
-                    visible=False
-                ))
-
-                # Add 1s write latency boxplot
-                fig_latency_box.add_trace(go.Box(
-                    y=resample_1s['Write_Latency'],
-                    name=f'{device} Write (1s)',
-                    boxpoints=False,
-                    visible=False
-                ))
+            box_levels = (RAW_LEVEL, '1s')
+            visible = []
+            for box_level in box_levels:
+                columns = pyramid[box_level]
+                for device in devices:
+                    for metric, label in (('Read_Latency', 'Read'),
+                                          ('Write_Latency', 'Write')):
+                        stats = self._box_stats(
+                            columns[column_name(f'{device}.{metric}', 'mean')])
+                        if stats is None:
+                            continue
+                        name = f'{device} {label} ({box_level})'
+                        fig_latency_box.add_trace(go.Box(
+                            x=[name],
+                            name=name,
+                            boxpoints=False,
+                            visible=box_level == RAW_LEVEL,
+                            **stats
+                        ))
+                        visible.append(box_level)
 
             fig_latency_box.update_layout(
                 title='Disk Latency Distribution',
@@ -386,18 +301,13 @@ class DiskHighResProcessor(BaseDataProcessor):
                         dict(
                             label="50ms",
                             method="update",
-                            args=[{
-                                "visible": [True, True, False, False] *
-                                len(devices)
-                            }]
+                            args=[{"visible": [v == RAW_LEVEL
+                                               for v in visible]}]
                         ),
                         dict(
                             label="1s avg",
                             method="update",
-                            args=[{
-                                "visible": [False, False, True, True] *
-                                len(devices)
-                            }]
+                            args=[{"visible": [v == '1s' for v in visible]}]
                         )
                     ]
                 )]
@@ -16,6 +16,9 @@ class DiskMetricsProcessor(BaseDataProcessor):
     """
     Processor for disk metrics (per-metric view) from iostat data.
     """
+    capture_files = ('iostat-data.out',)
+    item_column = 1  # Device
+
     def __init__(self, input_file: str, output_dir: str = ".",
                  logger: logging.Logger = None):
         super().__init__(input_file, output_dir, logger)
@@ -0,0 +1,85 @@
+"""
+Multi-resolution pyramid of high-resolution disk statistics.
+
+diskstats_log.txt is sampled every 50 ms, far too dense to plot whole for
+anything but short captures. The pyramid aggregates the per-sample rates
+into 250 ms, 1 s, 10 s and 1 min buckets, keeping the mean, max and 99th
+percentile of each bucket, above the raw 50 ms level. Figures show the
+finest level that fits their point budget; finer levels are served per
+zoom window from the report's series store.
+"""
+
+from typing import TYPE_CHECKING, Dict
+
+import numpy as np
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+# Pyramid levels from finest to coarsest; the first holds the raw samples
+LEVELS = ('50ms', '250ms', '1s', '10s', '1min')
+RAW_LEVEL = LEVELS[0]
+
+# Per-bucket statistics of the aggregated levels
+STATS = ('mean', 'max', 'p99')
+
+# Column holding the bucket start times of every level
+X_COLUMN = 'x'
+
+
+def column_name(series: str, stat: str) -> str:
+    """Pyramid column of one statistic of a series ('sda.IOPS.p99')."""
+    return f'{series}.{stat}'
+
+
+def level_stats(level: str) -> tuple:
+    """Statistics stored at a level (the raw level holds the samples as 'mean')."""
+    return ('mean',) if level == RAW_LEVEL else STATS
+
+
+def build_pyramid(rates: 'pd.DataFrame') -> Dict[str, Dict[str, np.ndarray]]:
+    """
+    Aggregate per-sample rates into every pyramid level.
+
+    Args:
+        rates: Frame indexed by sample time with one column per series
+            (e.g. 'sda.IOPS')
+
+    Returns:
+        {level: {'x': datetime64[ms] bucket starts,
+                 '<series>.<stat>': float32 values}}; empty buckets are NaN
+    """
+    pyramid = {}
+    for level in LEVELS:
+        if level == RAW_LEVEL:
+            frames = {'mean': rates}
+        else:
+            buckets = rates.resample(level)
+            frames = {'mean': buckets.mean(), 'max': buckets.max(),
+                      'p99': buckets.quantile(0.99)}
+        index = frames['mean'].index
+        columns = {X_COLUMN: index.values.astype('datetime64[ms]')}
+        for stat, frame in frames.items():
+            for series in rates.columns:
+                columns[column_name(series, stat)] = (
+                    frame[series].to_numpy(dtype=np.float32, na_value=np.nan))
+        pyramid[level] = columns
+    return pyramid
+
+
+def display_level(pyramid: Dict[str, Dict[str, np.ndarray]],
+                  max_points: int) -> str:
+    """
+    Finest level whose whole time range fits in max_points buckets.
+
+    Args:
+        pyramid: Result of build_pyramid
+        max_points: Point budget per trace
+
+    Returns:
+        Level name (the coarsest level if none fits)
+    """
+    for level in LEVELS:
+        if len(pyramid[level][X_COLUMN]) <= max_points:
+            return level
+    return LEVELS[-1]
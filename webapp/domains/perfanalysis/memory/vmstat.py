@@ -16,6 +16,8 @@ class MemoryProcessor(BaseDataProcessor):
     """
     Processor for memory performance data from vmstat.
     """
+    capture_files = ('vmstat-data.out',)
+
     def __init__(self, input_file: str, output_dir: str = ".",
                  logger: logging.Logger = None):
         super().__init__(input_file, output_dir, logger)
@@ -18,6 +18,9 @@ class NetworkProcessor(BaseDataProcessor):
     """
     Processor for network performance data from sar network.
     """
+    capture_files = ('sarnetwork.txt', 'info.txt')
+    item_column = 1  # IFACE
+
     def __init__(self, input_file: str, output_dir: str = ".",
                  logger: logging.Logger = None):
         super().__init__(input_file, output_dir, logger)
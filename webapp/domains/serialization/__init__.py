@@ -0,0 +1,27 @@
+"""
+Serialization Domain
+
+This domain handles turning computed report sections into the JSON sent
+to the frontend: direct Plotly figure conversion, downsampling of long
+traces, the compact array encoding, the report-level shared-resource table
+and a report encoder that understands numpy arrays and datetime64 values.
+"""
+
+from .compact import CompactEncoding
+from .downsample import Downsampler, window_slice
+from .encoder import ReportJSONEncoder, datetime64_strings, dumps_report
+from .figures import figure_to_dict, trace_to_dict
+from .shared import REF_KEY, SharedResources
+
+__all__ = [
+    'CompactEncoding',
+    'ReportJSONEncoder',
+    'datetime64_strings',
+    'Downsampler',
+    'dumps_report',
+    'figure_to_dict',
+    'trace_to_dict',
+    'window_slice',
+    'REF_KEY',
+    'SharedResources',
+]
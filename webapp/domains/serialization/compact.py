@@ -0,0 +1,131 @@
+"""
+Compact array encoding for report figures.
+
+Rewrites trace x/y arrays before figure_to_dict turns them into JSON:
+
+- numeric series become typed arrays at a configurable float precision
+  (float32 halves the payload of the default float64);
+- uniformly sampled timestamps become x0 + dx, and irregular ones a typed
+  array of epoch milliseconds, both of which plotly.js reads natively on a
+  date axis;
+- mostly-zero series (e.g. top consumers, zero-filled wherever a process
+  was not in the top list) become {"sparse": {length, index, values}},
+  which the frontend expands before plotting.
+"""
+
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .figures import typed_array
+
+FLOAT_DTYPES = {'f4': np.float32, 'f8': np.float64}
+
+
+class CompactEncoding:
+    """
+    Options and trace rewriting for the compact report encoding.
+    """
+    def __init__(self, float_dtype: str = 'f4', sparse_threshold: float = 0.5,
+                 min_length: int = 8):
+        """
+        Initialize the encoding.
+
+        Args:
+            float_dtype: Typed-array precision for float series ('f4' or 'f8')
+            sparse_threshold: Fraction of zeros above which a series is
+                sent sparse
+            min_length: Arrays shorter than this are left untouched
+        """
+        if float_dtype not in FLOAT_DTYPES:
+            raise ValueError(f"Unsupported float dtype: {float_dtype}")
+        self.float_dtype = FLOAT_DTYPES[float_dtype]
+        self.sparse_threshold = sparse_threshold
+        self.min_length = min_length
+
+    def _as_datetimes(self, values: Any) -> Optional[np.ndarray]:
+        """datetime64[ms] view of x values, or None if they are not dates."""
+        if isinstance(values, np.ndarray):
+            if values.dtype.kind != 'M':
+                return None
+            return values.astype('datetime64[ms]')
+        if (isinstance(values, (list, tuple)) and values
+                and all(isinstance(v, str) for v in values)):
+            try:
+                return np.array(values, dtype='datetime64[ms]')
+            except ValueError:
+                return None
+        return None
+
+    def _encode_x(self, trace: Dict[str, Any]) -> bool:
+        """Rewrite a date x array in place; True if the axis must be 'date'."""
+        values = trace.get('x')
+        if values is None or len(values) < max(self.min_length, 2):
+            return False
+        dates = self._as_datetimes(values)
+        if dates is None or np.isnat(dates).any():
+            return False
+
+        millis = dates.astype('int64')
+        steps = np.diff(millis)
+        del trace['x']
+        if (steps == steps[0]).all():
+            trace['x0'] = str(dates[0])
+            trace['dx'] = int(steps[0])
+        else:
+            trace['x'] = millis.astype(np.float64)
+        return True
+
+    def _sparse(self, values: np.ndarray) -> Dict[str, Any]:
+        index = np.flatnonzero(values)
+        return {'sparse': {
+            'length': int(values.size),
+            'index': typed_array(index.astype(np.uint32)),
+            'values': typed_array(values[index]),
+        }}
+
+    def _encode_y(self, trace: Dict[str, Any]) -> None:
+        values = trace.get('y')
+        if values is None or isinstance(values, str) or len(values) < self.min_length:
+            return
+        try:
+            array = np.asarray(values, dtype=np.float64)
+        except (TypeError, ValueError):
+            return
+        array = array.astype(self.float_dtype)
+        zeros = np.count_nonzero(array == 0)
+        if zeros / array.size >= self.sparse_threshold:
+            trace['y'] = self._sparse(array)
+        else:
+            trace['y'] = array
+
+    def encode(self, traces: List[Dict[str, Any]], layout: Dict[str, Any]
+               ) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+        """
+        Compact the arrays of a figure's traces.
+
+        Args:
+            traces: Trace property dicts (not modified)
+            layout: Layout property dict (not modified)
+
+        Returns:
+            Tuple of (new traces, new layout) sharing unchanged values with
+            the inputs
+        """
+        date_axes = set()
+        out = []
+        for trace in traces:
+            trace = dict(trace)
+            if self._encode_x(trace):
+                ref = trace.get('xaxis', 'x')
+                date_axes.add('xaxis' + ref[1:])
+            self._encode_y(trace)
+            out.append(trace)
+
+        if date_axes:
+            layout = dict(layout)
+            for axis in date_axes:
+                settings = dict(layout.get(axis) or {})
+                settings.setdefault('type', 'date')
+                layout[axis] = settings
+        return out, layout
@@ -0,0 +1,257 @@
+"""
+Server-side downsampling of long figure traces.
+
+High-resolution processors (50 ms diskstats, per-CPU mpstat) emit traces
+with far more points than a chart is wide. Downsampler caps every line
+trace at a point budget before the figure is serialized, using either
+Largest-Triangle-Three-Buckets (keeps the visual shape) or per-bucket
+min/max (keeps every spike). The full-resolution arrays of each reduced
+trace are collected so the server can store them and answer zoom requests
+(see storage.SeriesStore); the trace's meta.downsampled carries the
+content-derived series id.
+"""
+
+import hashlib
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+METHODS = ('lttb', 'minmax')
+
+# Trace types whose points are drawn along x and can be thinned
+LINE_TRACE_TYPES = (None, 'scatter', 'scattergl')
+
+# Per-point trace arrays that must be thinned along with x/y
+POINT_KEYS = ('text', 'hovertext', 'customdata')
+
+Series = Tuple[np.ndarray, np.ndarray]
+
+
+def _positions(x: np.ndarray) -> np.ndarray:
+    """x as float64 for area computations (datetimes as integer ticks)."""
+    if x.dtype.kind == 'M':
+        return x.astype('int64').astype(np.float64)
+    return x.astype(np.float64)
+
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, n_out: int) -> np.ndarray:
+    """
+    Indices of the points Largest-Triangle-Three-Buckets keeps.
+
+    Args:
+        x: Numeric or datetime64 x values
+        y: Float y values (NaN counts as 0 when ranking points)
+        n_out: Number of points to keep (at least 3)
+
+    Returns:
+        Sorted int64 index array of length min(n_out, len(x))
+    """
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+    px = _positions(x)
+    py = np.nan_to_num(y.astype(np.float64))
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+
+    # Average point of every bucket after the first (the last point on its
+    # own forms the final one); bucket i is ranked against bucket i + 1
+    starts = edges[1:]
+    counts = np.diff(np.append(starts, n))
+    cx = np.add.reduceat(px, starts) / counts
+    cy = np.add.reduceat(py, starts) / counts
+
+    keep = np.empty(n_out, dtype=np.int64)
+    keep[0], keep[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        area = np.abs((px[a] - cx[i]) * (py[lo:hi] - py[a])
+                      - (px[a] - px[lo:hi]) * (cy[i] - py[a]))
+        a = lo + int(area.argmax())
+        keep[i + 1] = a
+    return keep
+
+
+def minmax_indices(y: np.ndarray, n_out: int) -> np.ndarray:
+    """
+    Indices of the first and last point and the minimum and maximum of
+    each of (n_out - 2) // 2 buckets.
+
+    Args:
+        y: Float y values; an all-NaN bucket keeps its first point so gaps
+            survive
+        n_out: Number of points to keep (at most)
+
+    Returns:
+        Sorted int64 index array
+    """
+    n = len(y)
+    # Two points per bucket plus the first and last point
+    buckets = (n_out - 2) // 2
+    if n_out >= n or buckets < 1:
+        return np.arange(n)
+    size = -(-n // buckets)
+    padded = np.full(buckets * size, np.nan)
+    padded[:n] = y
+    rows = padded.reshape(buckets, size)
+    base = np.arange(buckets) * size
+    lows = base + np.where(np.isnan(rows), np.inf, rows).argmin(axis=1)
+    highs = base + np.where(np.isnan(rows), -np.inf, rows).argmax(axis=1)
+    keep = np.unique(np.concatenate(([0, n - 1], lows, highs)))
+    return keep[keep < n]
+
+
+def series_id(x: np.ndarray, y: np.ndarray) -> str:
+    """Content-derived id of a full-resolution series."""
+    digest = hashlib.sha1(np.ascontiguousarray(x).view(np.uint8))
+    digest.update(np.ascontiguousarray(y).view(np.uint8))
+    return digest.hexdigest()[:16]
+
+
+class Downsampler:
+    """
+    Caps line traces at a point budget and collects their full data.
+
+    Collected series are kept per thread, so one instance can serve the
+    request threads, job threads and pool workers of a server.
+    """
+    def __init__(self, max_points: int = 2000, method: str = 'lttb'):
+        """
+        Initialize the downsampler.
+
+        Args:
+            max_points: Point budget per trace
+            method: 'lttb' or 'minmax'
+        """
+        if method not in METHODS:
+            raise ValueError(f"Unsupported downsampling method: {method}")
+        self.max_points = max_points
+        self.method = method
+        self._local = threading.local()
+
+    def indices(self, x: np.ndarray, y: np.ndarray, n_out: int) -> np.ndarray:
+        if self.method == 'minmax':
+            return minmax_indices(y, n_out)
+        return lttb_indices(x, y, n_out)
+
+    def _series(self, trace: Dict[str, Any]) -> Optional[Series]:
+        """(x, y) arrays of a trace that can be thinned, else None."""
+        if trace.get('type') not in LINE_TRACE_TYPES:
+            return None
+        x, y = trace.get('x'), trace.get('y')
+        if x is None or y is None or isinstance(x, str) or isinstance(y, str):
+            return None
+        if len(y) <= self.max_points or len(x) != len(y):
+            return None
+        x = np.asarray(x)
+        if x.dtype.kind not in 'iufM':
+            try:
+                x = x.astype('datetime64[ms]')
+            except (TypeError, ValueError):
+                return None
+        try:
+            y = np.asarray(y, dtype=np.float64)
+        except (TypeError, ValueError):
+            return None
+        return x, y
+
+    def reduce(self, traces: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Thin every trace that exceeds the point budget.
+
+        Args:
+            traces: Trace property dicts (not modified)
+
+        Returns:
+            New trace list; reduced traces carry
+            meta.downsampled = {id, total, method}
+        """
+        out = []
+        for trace in traces:
+            series = self._series(trace)
+            if series is None:
+                out.append(trace)
+                continue
+            x, y = series
+            sid = series_id(x, y)
+            self.collected()[sid] = series
+            keep = self.indices(x, y, self.max_points)
+            trace = dict(trace, x=x[keep], y=y[keep],
+                         meta={'downsampled': {'id': sid, 'total': len(y),
+                                               'method': self.method}})
+            for key in POINT_KEYS:
+                values = trace.get(key)
+                if (values is not None and not isinstance(values, str)
+                        and len(values) == len(y)):
+                    trace[key] = np.asarray(values)[keep]
+            out.append(trace)
+        return out
+
+    def collected(self) -> Dict[str, Series]:
+        """Full-resolution series reduced by this thread since take_series()."""
+        if not hasattr(self._local, 'series'):
+            self._local.series = {}
+        return self._local.series
+
+    def take_series(self) -> Dict[str, Series]:
+        """Return and clear this thread's collected series."""
+        series = self.collected()
+        self._local.series = {}
+        return series
+
+    def window(self, x: np.ndarray, y: np.ndarray, start: Optional[str] = None,
+               end: Optional[str] = None,
+               max_points: Optional[int] = None) -> Series:
+        """
+        Slice a stored series to [start, end] and thin it to max_points.
+
+        Args:
+            x: Full x array (sorted ascending, possibly memory-mapped)
+            y: Full y array
+            start: Lower bound: ISO date or epoch milliseconds for date
+                series, a number otherwise; None for the beginning
+            end: Upper bound, same format; None for the end
+            max_points: Point budget for the window (default: max_points)
+
+        Returns:
+            (x, y) arrays for the window
+
+        Raises:
+            ValueError: If a bound cannot be parsed
+        """
+        window = window_slice(x, start, end)
+        x, y = np.asarray(x[window]), np.asarray(y[window])
+        keep = self.indices(x, y, max_points or self.max_points)
+        return x[keep], y[keep]
+
+
+def window_slice(x: np.ndarray, start: Optional[str] = None,
+                 end: Optional[str] = None) -> slice:
+    """
+    Positions of the sorted x values within [start, end].
+
+    Args:
+        x: Sorted x array
+        start: Lower bound as accepted by Downsampler.window, or None
+        end: Upper bound, or None
+
+    Returns:
+        Slice of x
+
+    Raises:
+        ValueError: If a bound cannot be parsed
+    """
+    lo = 0 if start is None else int(np.searchsorted(x, _bound(start, x), 'left'))
+    hi = len(x) if end is None else int(np.searchsorted(x, _bound(end, x), 'right'))
+    return slice(lo, hi)
+
+
+def _bound(value: str, x: np.ndarray) -> Any:
+    """Parse a window bound into a value comparable with x."""
+    if x.dtype.kind == 'M':
+        try:
+            return np.datetime64(int(float(value)), 'ms')
+        except ValueError:
+            return np.datetime64(value.strip().replace(' ', 'T'))
+    return float(value)
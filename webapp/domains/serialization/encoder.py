@@ -0,0 +1,92 @@
+"""
+Report JSON encoder.
+
+Serializes report dicts that still hold numpy arrays, numpy scalars and
+datetime64 values (see figures.figure_to_dict). orjson is used when it is
+installed and the standard library encoder otherwise; both route numpy
+values through the same conversion, so output does not depend on which
+one ran. (orjson's own numpy mode is not used: it rejects or crashes on
+datetime64 arrays containing NaT.)
+"""
+
+import datetime
+import json
+import re
+from typing import Any
+
+import numpy as np
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+_ZERO_FRACTION = re.compile(r'\.0+$')
+
+
+def datetime64_strings(values: np.ndarray) -> list:
+    """
+    ISO-8601 strings for a datetime64 array, dropping an all-zero
+    fractional part ('2025-09-10T14:54:20', '2025-09-10T14:54:19.297000').
+
+    Args:
+        values: datetime64 array
+
+    Returns:
+        List of strings (None for NaT)
+    """
+    return [None if s == 'NaT' else _ZERO_FRACTION.sub('', s)
+            for s in np.datetime_as_string(values).tolist()]
+
+
+def _default(obj: Any) -> Any:
+    """Fallback conversion for values neither encoder handles itself."""
+    if isinstance(obj, np.ndarray):
+        if obj.dtype.kind == 'M':
+            return datetime64_strings(obj)
+        if obj.dtype.kind == 'f':
+            values = obj.astype(object)
+            values[~np.isfinite(obj)] = None
+            return values.tolist()
+        return obj.tolist()
+    if isinstance(obj, np.datetime64):
+        return datetime64_strings(np.array([obj]))[0]
+    if isinstance(obj, np.generic):
+        return obj.item()
+    if isinstance(obj, (datetime.datetime, datetime.date)):
+        # pandas.NaT is a datetime subclass that is not equal to itself
+        return obj.isoformat() if obj == obj else None
+    if hasattr(obj, 'tolist'):
+        return obj.tolist()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+class ReportJSONEncoder(json.JSONEncoder):
+    """
+    json.JSONEncoder that understands numpy arrays, numpy scalars and
+    datetime64 values.
+    """
+    def default(self, obj):
+        return _default(obj)
+
+
+def dumps_report(obj: Any) -> bytes:
+    """
+    Serialize a report (or any part of one) to compact UTF-8 JSON.
+
+    Args:
+        obj: Report dict, section or NDJSON record
+
+    Returns:
+        JSON bytes
+    """
+    if orjson is not None:
+        return orjson.dumps(obj, default=_default,
+                            option=orjson.OPT_NON_STR_KEYS)
+    text = json.dumps(obj, cls=ReportJSONEncoder, separators=(',', ':'))
+    if 'NaN' in text or 'Infinity' in text:
+        # Rare: a bare float NaN outside the figures. Re-encode as null so
+        # the output is strict JSON, like orjson's
+        text = json.dumps(json.loads(text, parse_constant=lambda _: None),
+                          separators=(',', ':'))
+    return text.encode('utf-8')
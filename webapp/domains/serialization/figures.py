@@ -0,0 +1,139 @@
+"""
+Direct Plotly figure to plain-structure conversion.
+
+fig.to_dict() deep-copies every trace and the layout before converting
+arrays, and pio.to_json() then encodes everything to text. Here the
+figure's property dicts are walked once, building new containers while
+numeric numpy arrays become plotly.js typed-array specs ({dtype, bdata}).
+Other arrays (datetime64, strings) are left as numpy arrays for the report
+encoder, so no value is ever encoded to text more than once.
+"""
+
+import base64
+import math
+from typing import Any
+
+import numpy as np
+
+# _plotly_utils.utils pulls in plotly's validators; it is imported on the
+# first conversion, by which time a processor has loaded plotly anyway
+_plotly_utils = None
+
+# Keys whose values plotly never converts to typed arrays
+SKIPPED_KEYS = frozenset(('geojson', 'layer', 'layers', 'range'))
+
+# int64/uint64 are narrowed to the smallest plotly.js type that fits
+_NARROW_TYPES = {
+    'int64': ('int8', 'int16', 'int32'),
+    'uint64': ('uint8', 'uint16', 'uint32'),
+}
+
+
+def _utils():
+    global _plotly_utils
+    if _plotly_utils is None:
+        from _plotly_utils import utils
+        _plotly_utils = utils
+    return _plotly_utils
+
+
+def typed_array(values: Any) -> Any:
+    """
+    plotly.js typed-array spec ({dtype, bdata[, shape]}) for a numeric
+    array, or the array itself when it has no typed equivalent.
+
+    Same result as plotly's to_typed_array_spec, minus its generic
+    dataframe coercion for the common plain-ndarray case.
+    """
+    utils = _utils()
+    if not isinstance(values, np.ndarray):
+        return utils.to_typed_array_spec(values)
+    if values.size == 0:
+        return values
+    dtype = str(values.dtype)
+    if dtype in _NARROW_TYPES:
+        lo, hi = values.min(), values.max()
+        for candidate in _NARROW_TYPES[dtype]:
+            info = np.iinfo(candidate)
+            if info.min <= lo and hi <= info.max:
+                values = values.astype(candidate)
+                dtype = candidate
+                break
+    if dtype not in utils.plotlyjsShortTypes:
+        return values
+    spec = {
+        'dtype': utils.plotlyjsShortTypes[dtype],
+        'bdata': base64.b64encode(np.ascontiguousarray(values)).decode('ascii'),
+    }
+    if values.ndim > 1:
+        spec['shape'] = str(values.shape)[1:-1]
+    return spec
+
+
+def _plain(obj: Any, typed: bool = True) -> Any:
+    is_homogeneous_array = _utils().is_homogeneous_array
+    if isinstance(obj, dict):
+        out = {}
+        for key, value in obj.items():
+            if key in SKIPPED_KEYS:
+                out[key] = _plain(value, typed=False)
+            elif typed and (isinstance(value, np.ndarray)
+                            or is_homogeneous_array(value)):
+                out[key] = typed_array(value)
+            else:
+                out[key] = _plain(value, typed)
+        return out
+    if isinstance(obj, (list, tuple)):
+        return [_plain(value, typed) for value in obj]
+    if isinstance(obj, float) and not math.isfinite(obj):
+        # Strict JSON has no NaN/Infinity; plotly.js treats null as a gap
+        return None
+    return obj
+
+
+def figure_to_dict(fig, encoding=None, downsampler=None) -> dict:
+    """
+    Convert a Plotly figure to a {'data', 'layout'} dict ready for the
+    report encoder, without copying or JSON round-tripping it.
+
+    Args:
+        fig: plotly.graph_objects.Figure
+        encoding: Optional CompactEncoding applied to trace arrays first
+        downsampler: Optional Downsampler capping long traces before that
+
+    Returns:
+        Dictionary with 'data' (list of traces), 'layout' and, if the
+        figure has any, 'frames'
+    """
+    # _data/_layout are the property dicts fig.to_dict() would deep-copy;
+    # _plain builds fresh containers, so the figure is never modified
+    traces, layout = fig._data, fig._layout
+    if downsampler is not None:
+        traces = downsampler.reduce(traces)
+    if encoding is not None:
+        traces, layout = encoding.encode(traces, layout)
+    result = {
+        'data': [_plain(trace) for trace in traces],
+        'layout': _plain(layout),
+    }
+    frames = [_plain(frame._props) for frame in fig._frame_objs]
+    if frames:
+        result['frames'] = frames
+    return result
+
+
+def trace_to_dict(trace: dict, encoding=None) -> dict:
+    """
+    Convert a bare trace property dict (e.g. {'x': ..., 'y': ...}) the
+    same way figure_to_dict converts figure traces.
+
+    Args:
+        trace: Trace properties with numpy or list values
+        encoding: Optional CompactEncoding
+
+    Returns:
+        Trace dict ready for the report encoder
+    """
+    if encoding is not None:
+        (trace,), _ = encoding.encode([trace], {})
+    return _plain(trace)
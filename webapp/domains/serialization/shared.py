@@ -0,0 +1,102 @@
+"""
+Report-level shared-resource table.
+
+Many figures in a report carry identical blocks: the expanded seaborn
+template, the common rangeselector/date x-axis from
+BaseDataProcessor.get_common_plot_layout, and the timestamp array repeated
+for every trace of a multi-series plot. SharedResources stores each such
+value once in report['shared'] and replaces it in the figure with
+{"$ref": <id>}; the frontend resolves the references when the report is
+loaded. Ids are derived from the content, so the same value always gets
+the same id regardless of the order sections were built in.
+"""
+
+import hashlib
+from typing import Any, Dict, List
+
+from .encoder import dumps_report
+
+REF_KEY = '$ref'
+
+# Trace properties that are shared between traces of the same figure
+SHARED_TRACE_KEYS = ('x',)
+
+
+class SharedResources:
+    """
+    Collects values shared by figures and swaps them for references.
+    """
+    def __init__(self, min_size: int = 256):
+        """
+        Initialize an empty table.
+
+        Args:
+            min_size: Values whose JSON is smaller than this stay inline
+        """
+        self.min_size = min_size
+        self.table: Dict[str, Any] = {}
+        self._new: List[str] = []
+
+    def ref(self, value: Any) -> Any:
+        """
+        Store a value in the table and return a reference to it.
+
+        Args:
+            value: JSON-serializable value (dicts, lists, typed arrays)
+
+        Returns:
+            {"$ref": id}, or the value itself if it is too small to share
+        """
+        body = dumps_report(value)
+        if len(body) < self.min_size:
+            return value
+        ref_id = hashlib.sha1(body).hexdigest()[:12]
+        if ref_id not in self.table:
+            self.table[ref_id] = value
+            self._new.append(ref_id)
+        return {REF_KEY: ref_id}
+
+    def share_figure(self, figure: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Replace a figure's layout blocks and trace x arrays with references.
+
+        Args:
+            figure: Figure dict from figure_to_dict (not modified)
+
+        Returns:
+            New figure dict
+        """
+        layout = {key: self.ref(value) if isinstance(value, (dict, list)) else value
+                  for key, value in figure.get('layout', {}).items()}
+        data = []
+        for trace in figure.get('data', []):
+            shared = {key: self.ref(trace[key]) for key in SHARED_TRACE_KEYS
+                      if key in trace and not isinstance(trace[key], str)}
+            data.append({**trace, **shared} if shared else trace)
+        return {**figure, 'data': data, 'layout': layout}
+
+    def share_section(self, section: Any) -> Any:
+        """
+        Share every figure found in a report section.
+
+        Args:
+            section: Report section (any {'figures': [...]} dicts nested
+                inside it are rewritten)
+
+        Returns:
+            New section value
+        """
+        if not isinstance(section, dict):
+            return section
+        out = {}
+        for key, value in section.items():
+            if key == 'figures' and isinstance(value, list):
+                out[key] = [self.share_figure(fig) for fig in value]
+            else:
+                out[key] = self.share_section(value)
+        return out
+
+    def take_new(self) -> List[str]:
+        """Ids added since the previous call (used when streaming)."""
+        new, self._new = self._new, []
+        return new
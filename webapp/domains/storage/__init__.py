@@ -0,0 +1,32 @@
+"""
+Storage Domain
+
+This domain handles persisting generated output between requests, such as
+the content-addressed cache of finished reports, the store of reports by
+id behind shared report links, the extracted captures that single report
+sections are recomputed from, the columnar store of full-resolution
+figure series behind the zoom endpoint and the cache of parsed capture
+frames processors reuse instead of re-parsing, all under one retention
+policy, which a background janitor also applies to the upload folder.
+"""
+
+from .capture_store import CaptureStore
+from .frame_cache import FrameCache
+from .janitor import RetentionJanitor
+from .report_cache import ReportCache
+from .report_store import ReportStore
+from .retention import directory_entries, select_evictions
+from .series_store import SeriesStore
+from .store import RetentionStore
+
+__all__ = [
+    'CaptureStore',
+    'FrameCache',
+    'ReportCache',
+    'ReportStore',
+    'RetentionJanitor',
+    'RetentionStore',
+    'SeriesStore',
+    'directory_entries',
+    'select_evictions',
+]
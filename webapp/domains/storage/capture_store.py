@@ -0,0 +1,112 @@
+"""
+Store of extracted captures by report id.
+
+A report is built from the capture files extracted out of the uploaded
+archive; instead of deleting them once the report is done, the work
+directory is moved here so single report sections can be recomputed with
+other parameters (thresholds, top-N, resolution, device filters) without
+the archive being uploaded again. Only the files some processor reads are
+extracted in the first place, so an entry is a flat directory of capture
+files. The directory's mtime records when the capture was stored (for the
+TTL) and its atime when it was last used (for LRU eviction).
+"""
+
+import logging
+import os
+import re
+import shutil
+import time
+from typing import Optional
+
+from .retention import tree_size
+from .store import RetentionStore
+
+_ID_RE = re.compile(r'^[A-Za-z0-9_-]+$')
+
+
+class CaptureStore(RetentionStore):
+    """
+    Size-bounded, TTL-limited LRU store of extracted capture directories.
+    """
+    def __init__(self, store_dir: str, max_bytes: int = 2 * 1024 * 1024 * 1024,
+                 ttl: float = 7 * 24 * 3600,
+                 logger: Optional[logging.Logger] = None):
+        """
+        Initialize the store.
+
+        Args:
+            store_dir: Directory holding one subdirectory per report
+            max_bytes: Total size limit; 0 disables the store
+            ttl: Seconds a capture is kept after being stored; 0 keeps
+                captures until they are evicted for space
+            logger: Logger instance (optional)
+        """
+        super().__init__(store_dir, max_bytes, ttl, logger)
+        self.store_dir = store_dir
+
+    def _capture_dir(self, report_id: str) -> str:
+        if not _ID_RE.match(report_id):
+            raise ValueError(f"Invalid report id: {report_id!r}")
+        return os.path.join(self.store_dir, report_id)
+
+    def put(self, report_id: str, work_dir: str) -> bool:
+        """
+        Move an extracted capture into the store.
+
+        A capture already stored for the report is kept (report ids are
+        content-derived) and work_dir is left in place for the caller to
+        remove.
+
+        Args:
+            report_id: Report built from the capture
+            work_dir: Directory holding the extracted capture files
+
+        Returns:
+            True if work_dir was moved into the store
+        """
+        if not self.enabled:
+            return False
+        capture_dir = self._capture_dir(report_id)
+        if os.path.isdir(capture_dir):
+            return False
+        try:
+            os.makedirs(self.store_dir, exist_ok=True)
+            # A rename when both are on one filesystem, a copy otherwise
+            shutil.move(work_dir, capture_dir)
+            os.utime(capture_dir)
+        except OSError as e:
+            self.logger.warning(f'capture store write failed for {report_id}: {e}')
+            return False
+        self._written(tree_size(capture_dir))
+        return True
+
+    def contains(self, report_id: str) -> bool:
+        """Whether a capture is stored (without counting it as a use)."""
+        return self.enabled and os.path.isdir(self._capture_dir(report_id))
+
+    def path(self, report_id: str) -> Optional[str]:
+        """
+        Look up a stored capture.
+
+        Args:
+            report_id: Report built from the capture
+
+        Returns:
+            Directory holding the capture files, or None if not stored
+        """
+        if not self.enabled:
+            return None
+        capture_dir = self._capture_dir(report_id)
+        now = time.time()
+        try:
+            st = os.stat(capture_dir)
+            if self._expired(st.st_mtime, now):
+                self._remove(capture_dir)
+                return None
+            os.utime(capture_dir, (now, st.st_mtime))
+        except FileNotFoundError:
+            return None
+        except OSError as e:
+            self.logger.warning(f'capture store read failed for {report_id}: {e}')
+            return None
+        return capture_dir
@@ -0,0 +1,251 @@
+"""
+Columnar cache of parsed capture data.
+
+Parsing the raw text files (read_csv on whitespace-separated tool output,
+timestamp enrichment, per-device filtering) is most of a processor's
+work, and it is repeated whenever the same capture is analysed again:
+re-uploads with other options, section re-runs, zoom windows. Here the
+DataFrame a processor's process_data() returns is kept per content key
+(see BaseDataProcessor.data_key), one directory per frame holding an
+uncompressed .npy file per column plus a small JSON manifest. Numeric and
+datetime columns are memory-mapped on load, so a cached frame costs a few
+page faults instead of a parse; string columns are stored as fixed-width
+unicode arrays and rebuilt as strings. Retention is the usual TTL plus a
+size-bounded LRU (see storage.retention).
+"""
+
+import json
+import logging
+import os
+import re
+import shutil
+import tempfile
+import time
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from .retention import tree_size
+from .store import RetentionStore
+
+MANIFEST = 'frame.json'
+
+# Bump when the on-disk layout changes
+FORMAT_VERSION = 1
+
+# numpy kinds stored as-is: bool, ints, floats, complex, datetime/timedelta
+NATIVE_KINDS = 'biufcmM'
+
+_KEY_RE = re.compile(r'^[A-Za-z0-9_-]+$')
+
+
+class UncacheableFrame(ValueError):
+    """Raised for frames whose columns or index cannot be stored."""
+    pass
+
+
+def _encode(values) -> Dict[str, Any]:
+    """Column (Series or Index) to {'kind', 'dtype', 'array'[, 'mask']}."""
+    import pandas as pd
+
+    dtype = values.dtype
+    if isinstance(dtype, np.dtype) and dtype.kind in NATIVE_KINDS:
+        return {'kind': 'native', 'dtype': str(dtype),
+                'array': np.asarray(values.to_numpy())}
+    if pd.api.types.infer_dtype(values, skipna=True) in ('string', 'empty'):
+        mask = np.asarray(pd.isna(values))
+        text = np.where(mask, '', np.asarray(values, dtype=object)).astype(str)
+        encoded = {'kind': 'str', 'dtype': str(dtype), 'array': text}
+        if mask.any():
+            encoded['mask'] = mask
+        return encoded
+    raise UncacheableFrame(f'unsupported column dtype {dtype}')
+
+
+def _decode(meta: Dict[str, Any], array: np.ndarray,
+            mask: Optional[np.ndarray]) -> Any:
+    """Inverse of _encode: the values to build a column or index from."""
+    if meta['kind'] == 'native':
+        # A plain ndarray view still backed by the mapping (np.memmap
+        # subclass instances leak into pandas results otherwise)
+        return array.view(np.ndarray)
+    import pandas as pd
+
+    values = array.astype(object)
+    if mask is not None:
+        values[mask] = np.nan
+    return pd.array(values, dtype=meta['dtype'])
+
+
+class FrameCache(RetentionStore):
+    """
+    Size-bounded, TTL-limited LRU cache of DataFrames on disk.
+    """
+    def __init__(self, cache_dir: str, max_bytes: int = 1024 * 1024 * 1024,
+                 ttl: float = 7 * 24 * 3600, mmap: bool = True,
+                 logger: Optional[logging.Logger] = None):
+        """
+        Initialize the cache.
+
+        Args:
+            cache_dir: Directory holding one subdirectory per frame
+            max_bytes: Total size limit; 0 disables the cache
+            ttl: Seconds a frame stays valid after being stored; 0 keeps
+                frames until they are evicted for space
+            mmap: Memory-map numeric columns instead of reading them
+            logger: Logger instance (optional)
+        """
+        super().__init__(cache_dir, max_bytes, ttl, logger)
+        self.cache_dir = cache_dir
+        self.mmap = mmap
+        self.hits = 0
+        self.misses = 0
+
+    def _dir(self, key: str) -> str:
+        if not _KEY_RE.match(key):
+            raise ValueError(f"Invalid cache key: {key!r}")
+        return os.path.join(self.cache_dir, key)
+
+    def _load_array(self, frame_dir: str, name: str) -> np.ndarray:
+        return np.load(os.path.join(frame_dir, name),
+                       mmap_mode='r' if self.mmap else None,
+                       allow_pickle=False)
+
+    def _load_values(self, frame_dir: str, meta: Dict[str, Any]) -> Any:
+        mask = (self._load_array(frame_dir, meta['mask'])
+                if 'mask' in meta else None)
+        return _decode(meta, self._load_array(frame_dir, meta['file']), mask)
+
+    def get(self, key: str):
+        """
+        Load a cached frame.
+
+        Args:
+            key: Content key of the parsed input
+
+        Returns:
+            pandas DataFrame (numeric columns memory-mapped, read-only),
+            or None on a miss
+        """
+        if not self.enabled:
+            return None
+        frame_dir = self._dir(key)
+        now = time.time()
+        try:
+            st = os.stat(frame_dir)
+            if self._expired(st.st_mtime, now):
+                self._remove(frame_dir)
+                raise FileNotFoundError(frame_dir)
+            with open(os.path.join(frame_dir, MANIFEST)) as f:
+                manifest = json.load(f)
+            if manifest.get('format') != FORMAT_VERSION:
+                raise FileNotFoundError(frame_dir)
+            df = self._build(frame_dir, manifest)
+            # Bump the access time only; mtime keeps the store time for TTL
+            os.utime(frame_dir, (now, st.st_mtime))
+        except FileNotFoundError:
+            self._count('misses')
+            return None
+        except (OSError, ValueError, KeyError) as e:
+            self.logger.warning(f'frame cache read failed for {key}: {e}')
+            self._count('misses')
+            return None
+        self._count('hits')
+        return df
+
+    def _build(self, frame_dir: str, manifest: Dict[str, Any]):
+        import pandas as pd
+
+        index_meta = manifest['index']
+        if index_meta['kind'] == 'range':
+            index = pd.RangeIndex(index_meta['start'], index_meta['stop'],
+                                  index_meta['step'], name=index_meta['name'])
+        else:
+            index = pd.Index(self._load_values(frame_dir, index_meta),
+                             name=index_meta['name'], copy=False)
+        columns = manifest['columns']
+        data = {i: self._load_values(frame_dir, meta)
+                for i, meta in enumerate(columns)}
+        # copy=False keeps the memory maps; positional keys allow any
+        # (or duplicate) column names, which are restored afterwards
+        df = pd.DataFrame(data, index=index, copy=False)
+        df.columns = pd.Index([meta['name'] for meta in columns],
+                              name=manifest['columns_name'])
+        return df
+
+    def put(self, key: str, df) -> None:
+        """
+        Store a frame. Frames with unsupported dtypes, a MultiIndex or no
+        rows are skipped.
+
+        Args:
+            key: Content key of the parsed input
+            df: pandas DataFrame returned by a processor
+        """
+        if not self.enabled or df is None or len(df) == 0:
+            return
+        frame_dir = self._dir(key)
+        if os.path.isdir(frame_dir):
+            return
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            tmp_dir = tempfile.mkdtemp(dir=self.cache_dir, prefix='.tmp-')
+            try:
+                self._write(tmp_dir, df)
+                os.rename(tmp_dir, frame_dir)
+            except BaseException:
+                shutil.rmtree(tmp_dir, ignore_errors=True)
+                raise
+        except UncacheableFrame as e:
+            self.logger.debug(f'frame {key} not cached: {e}')
+            return
+        except (OSError, ValueError, TypeError) as e:
+            # A concurrent writer may have stored the same frame first
+            if not os.path.isdir(frame_dir):
+                self.logger.warning(f'frame cache write failed for {key}: {e}')
+            return
+        self._written(tree_size(frame_dir))
+
+    def _write_values(self, frame_dir: str, name: str, values,
+                      meta: Dict[str, Any]) -> Dict[str, Any]:
+        encoded = _encode(values)
+        meta.update(kind=encoded['kind'], dtype=encoded['dtype'],
+                    file=f'{name}.npy')
+        np.save(os.path.join(frame_dir, meta['file']), encoded['array'],
+                allow_pickle=False)
+        if 'mask' in encoded:
+            meta['mask'] = f'{name}.mask.npy'
+            np.save(os.path.join(frame_dir, meta['mask']), encoded['mask'],
+                    allow_pickle=False)
+        return meta
+
+    def _write(self, frame_dir: str, df) -> None:
+        import pandas as pd
+
+        labels = list(df.columns) + [df.index.name, df.columns.name]
+        if not all(label is None or isinstance(label, (str, int, float))
+                   for label in labels):
+            raise UncacheableFrame('column labels must be strings or numbers')
+        if isinstance(df.index, pd.MultiIndex):
+            raise UncacheableFrame('MultiIndex is not supported')
+
+        if isinstance(df.index, pd.RangeIndex):
+            index_meta = {'kind': 'range', 'name': df.index.name,
+                          'start': df.index.start, 'stop': df.index.stop,
+                          'step': df.index.step}
+        else:
+            index_meta = self._write_values(frame_dir, 'index', df.index,
+                                            {'name': df.index.name})
+        columns: List[Dict[str, Any]] = []
+        for i in range(df.shape[1]):
+            columns.append(self._write_values(
+                frame_dir, f'c{i}', df.iloc[:, i], {'name': df.columns[i]}))
+
+        manifest = {'format': FORMAT_VERSION, 'index': index_meta,
+                    'columns': columns, 'columns_name': df.columns.name}
+        with open(os.path.join(frame_dir, MANIFEST), 'w') as f:
+            json.dump(manifest, f)
+
+    def stats(self) -> Dict[str, int]:
+        """Hit/miss/eviction counters for this process plus on-disk usage."""
+        return {'hits': self.hits, 'misses': self.misses, **super().stats()}
@@ -0,0 +1,225 @@
+"""
+Background retention janitor for a directory of per-upload directories.
+
+The retention policy (see storage.retention) is applied in-process by a
+daemon thread: directories older than the TTL go first, then the least
+recently viewed ones until the rest fit in the byte quota. Besides the
+periodic sweep, the thread checks the free space of the filesystem every
+few seconds (and whenever it is poked after an upload) and sweeps early
+when it drops below a watermark, evicting least recently viewed
+directories until the watermark is met again. Eviction and reclaimed
+byte counts are kept for monitoring.
+"""
+
+import logging
+import os
+import shutil
+import threading
+import time
+from typing import Callable, Collection, Dict, List, Optional
+
+from .retention import Entry, directory_entries, select_evictions
+
+
+class RetentionJanitor:
+    """
+    Periodic and free-space-triggered TTL/quota/LRU sweeper of a directory.
+    """
+    def __init__(self, root: str, max_bytes: int = 2 * 1024 * 1024 * 1024,
+                 ttl: float = 7 * 24 * 3600, interval: float = 600,
+                 min_free_bytes: int = 0, check_interval: float = 10,
+                 min_age: float = 0,
+                 in_use: Optional[Callable[[], Collection[str]]] = None,
+                 logger: Optional[logging.Logger] = None):
+        """
+        Initialize the janitor (no thread is started until start()).
+
+        Args:
+            root: Directory holding one subdirectory per entry
+            max_bytes: Total size limit of the entries (0 = no limit)
+            ttl: Seconds an entry is kept after being stored (0 = no limit)
+            interval: Seconds between scheduled sweeps
+            min_free_bytes: Free space watermark of the filesystem holding
+                root; below it a sweep runs at once (0 = disabled)
+            check_interval: Seconds between free space checks
+            min_age: Entries stored less than this many seconds ago are
+                never evicted for quota or free space (they may still be
+                being written)
+            in_use: Returns the paths of entries still in use (e.g. waiting
+                for a job), which are never evicted, not even by the TTL
+            logger: Logger instance (optional)
+        """
+        self.root = root
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.interval = interval
+        self.min_free_bytes = min_free_bytes
+        self.check_interval = check_interval
+        self.min_age = min_age
+        self.in_use = in_use
+        self.logger = logger or logging.getLogger(__name__)
+        self.sweeps = 0
+        self.early_sweeps = 0
+        self.evictions = 0
+        self.bytes_reclaimed = 0
+        self.failures = 0
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def free_bytes(self) -> Optional[int]:
+        """Space available to unprivileged users on root's filesystem."""
+        try:
+            st = os.statvfs(self.root)
+        except (OSError, AttributeError):
+            return None
+        return st.f_bavail * st.f_frsize
+
+    def low_on_space(self) -> bool:
+        """Whether free space is below the watermark."""
+        if self.min_free_bytes <= 0:
+            return False
+        free = self.free_bytes()
+        return free is not None and free < self.min_free_bytes
+
+    def select(self, entries: List[Entry], now: float,
+               free: Optional[int] = None) -> List[Entry]:
+        """
+        Pick the entries a sweep removes.
+
+        Args:
+            entries: Current entries
+            now: Current time
+            free: Current free bytes, to also evict least recently viewed
+                entries until min_free_bytes is met (None = ignore)
+
+        Returns:
+            Entries to remove, in eviction order
+        """
+        # Entries still being written are neither counted nor evicted,
+        # except by the TTL
+        young = [e for e in entries if now - e.stored_at < self.min_age]
+        old = [e for e in entries if now - e.stored_at >= self.min_age]
+        doomed = select_evictions(old, self.max_bytes, self.ttl, now)
+        if free is not None and self.min_free_bytes > 0:
+            missing = self.min_free_bytes - free - sum(e.size for e in doomed)
+            if missing > 0:
+                chosen = {e.path for e in doomed}
+                live = sorted((e for e in old if e.path not in chosen),
+                              key=lambda e: e.read_at)
+                while live and missing > 0:
+                    entry = live.pop(0)
+                    missing -= entry.size
+                    doomed.append(entry)
+        if self.ttl > 0:
+            doomed.extend(e for e in young if now - e.stored_at > self.ttl)
+        return doomed
+
+    def sweep(self, early: bool = False) -> int:
+        """
+        Apply the retention policy once.
+
+        Args:
+            early: Whether the sweep was triggered by low free space (only
+                affects the counters)
+
+        Returns:
+            Number of entries removed
+        """
+        free = self.free_bytes() if self.min_free_bytes > 0 else None
+        entries = directory_entries(self.root)
+        if self.in_use is not None:
+            busy = set(self.in_use())
+            entries = [e for e in entries if e.path not in busy]
+        doomed = self.select(entries, time.time(), free)
+        removed = 0
+        reclaimed = 0
+        failed = 0
+        for entry in doomed:
+            try:
+                shutil.rmtree(entry.path)
+            except FileNotFoundError:
+                # Removed by another process sharing the folder
+                continue
+            except OSError as e:
+                self.logger.warning(f'Failed to delete directory {entry.path}: {e}')
+                failed += 1
+                continue
+            removed += 1
+            reclaimed += entry.size
+            self.logger.info(f'Deleted directory: {entry.path}')
+        with self._lock:
+            self.sweeps += 1
+            self.early_sweeps += early
+            self.evictions += removed
+            self.bytes_reclaimed += reclaimed
+            self.failures += failed
+        if removed:
+            self.logger.info(f'Retention sweep removed {removed} director'
+                             f'{"y" if removed == 1 else "ies"}, '
+                             f'{reclaimed} bytes'
+                             f'{" (low free space)" if early else ""}')
+        elif early:
+            self.logger.debug('Free space is low but nothing is left to evict')
+        return removed
+
+    def poke(self) -> None:
+        """Ask the thread to check free space now (e.g. after an upload)."""
+        self._wake.set()
+
+    def _run(self) -> None:
+        next_sweep = time.monotonic() + self.interval
+        while not self._stop.is_set():
+            self._wake.wait(min(self.check_interval,
+                                max(next_sweep - time.monotonic(), 0)))
+            self._wake.clear()
+            if self._stop.is_set():
+                return
+            try:
+                if self.low_on_space():
+                    self.sweep(early=True)
+                elif time.monotonic() >= next_sweep:
+                    self.sweep()
+                else:
+                    continue
+            except Exception as e:
+                self.logger.warning(f'Retention sweep failed: {e}')
+            next_sweep = time.monotonic() + self.interval
+
+    def start(self) -> None:
+        """Start the background thread."""
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run,
+                                            name='retention-janitor',
+                                            daemon=True)
+            self._thread.start()
+        self.logger.info(f'Retention janitor started for {self.root}')
+
+    def stop(self, timeout: float = 5) -> None:
+        """Stop the background thread."""
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            self._stop.set()
+            self._wake.set()
+            thread.join(timeout)
+
+    def stats(self) -> Dict[str, int]:
+        """Sweep and eviction counters for this process plus disk usage."""
+        entries = directory_entries(self.root)
+        free = self.free_bytes()
+        with self._lock:
+            return {
+                'sweeps': self.sweeps,
+                'early_sweeps': self.early_sweeps,
+                'evictions': self.evictions,
+                'bytes_reclaimed': self.bytes_reclaimed,
+                'failures': self.failures,
+                'entries': len(entries),
+                'bytes': sum(entry.size for entry in entries),
+                'free_bytes': free if free is not None else -1,
+            }
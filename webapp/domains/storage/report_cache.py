@@ -0,0 +1,135 @@
+"""
+Content-addressed cache of finished report JSON.
+
+Entries are keyed by the SHA-256 of the uploaded archive, so re-uploading
+the same capture (after a browser reload, from a colleague, ...) skips
+extraction and plotting entirely. Each entry is one file in the cache
+directory; the file's mtime records when it was stored (for the TTL) and
+its atime records when it was last served (for LRU eviction). Keeping all
+state on disk lets several server processes share one cache.
+"""
+
+import logging
+import os
+import re
+import tempfile
+import time
+from typing import Dict, List, Optional
+
+from .retention import Entry
+from .store import RetentionStore
+
+ENTRY_SUFFIX = '.json'
+
+_KEY_RE = re.compile(r'^[A-Za-z0-9_.-]+$')
+
+
+class ReportCache(RetentionStore):
+    """
+    Size-bounded, TTL-limited LRU cache of report JSON bytes on disk.
+    """
+    entry_suffix = ENTRY_SUFFIX
+
+    def __init__(self, cache_dir: str, max_bytes: int = 512 * 1024 * 1024,
+                 ttl: float = 7 * 24 * 3600,
+                 logger: Optional[logging.Logger] = None):
+        """
+        Initialize the cache.
+
+        Args:
+            cache_dir: Directory holding cache entries (created on demand)
+            max_bytes: Total size limit; 0 disables the cache
+            ttl: Seconds an entry stays valid after being stored; 0 keeps
+                entries until they are evicted for space
+            logger: Logger instance (optional)
+        """
+        super().__init__(cache_dir, max_bytes, ttl, logger)
+        self.cache_dir = cache_dir
+        self.hits = 0
+        self.misses = 0
+
+    def _path(self, key: str) -> str:
+        if not _KEY_RE.match(key):
+            raise ValueError(f"Invalid cache key: {key!r}")
+        return os.path.join(self.cache_dir, key + self.entry_suffix)
+
+    def get(self, key: str) -> Optional[bytes]:
+        """
+        Look up a report.
+
+        Args:
+            key: Content key (archive hash plus format version)
+
+        Returns:
+            Cached report JSON bytes, or None on a miss
+        """
+        if not self.enabled:
+            return None
+        path = self._path(key)
+        now = time.time()
+        try:
+            st = os.stat(path)
+            if self._expired(st.st_mtime, now):
+                self._remove(path)
+                raise FileNotFoundError(path)
+            with open(path, 'rb') as f:
+                data = f.read()
+            # Bump the access time only; mtime keeps the store time for TTL
+            os.utime(path, (now, st.st_mtime))
+        except FileNotFoundError:
+            self._count('misses')
+            return None
+        except OSError as e:
+            self.logger.warning(f'report cache read failed for {key}: {e}')
+            self._count('misses')
+            return None
+        self._count('hits')
+        return data
+
+    def put(self, key: str, data: bytes) -> None:
+        """
+        Store a report (old entries are evicted once a scan is due).
+
+        Args:
+            key: Content key (archive hash plus format version)
+            data: Report JSON bytes
+        """
+        if not self.enabled or len(data) > self.max_bytes:
+            return
+        path = self._path(key)
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+            try:
+                with os.fdopen(fd, 'wb') as f:
+                    f.write(data)
+                os.replace(tmp_path, path)
+            except BaseException:
+                os.unlink(tmp_path)
+                raise
+        except OSError as e:
+            self.logger.warning(f'report cache write failed for {key}: {e}')
+            return
+        self._written(len(data))
+
+    def _entries(self) -> List[Entry]:
+        """Every entry in the cache dir."""
+        entries = []
+        try:
+            with os.scandir(self.cache_dir) as it:
+                for entry in it:
+                    if not entry.name.endswith(self.entry_suffix):
+                        continue
+                    try:
+                        st = entry.stat()
+                    except FileNotFoundError:
+                        continue
+                    entries.append(Entry(entry.path, st.st_size,
+                                         st.st_mtime, st.st_atime))
+        except FileNotFoundError:
+            pass
+        return entries
+
+    def stats(self) -> Dict[str, int]:
+        """Hit/miss/eviction counters for this process plus on-disk usage."""
+        return {'hits': self.hits, 'misses': self.misses, **super().stats()}
@@ -0,0 +1,84 @@
+"""
+Persistent store of finished reports by report id.
+
+The report cache answers "was this archive processed before?"; this store
+answers "show me report <id>", so a report page survives a browser reload
+and can be shared as a link without uploading the capture again. Reports
+are kept gzip-compressed, one file per report id, and are served to
+clients that accept gzip without being decompressed. Retention follows
+the same TTL and size-bounded LRU policy as the cache.
+"""
+
+import gzip
+import logging
+import os
+from typing import Optional
+
+from .report_cache import ReportCache
+
+ENTRY_SUFFIX = '.json.gz'
+
+
+class ReportStore(ReportCache):
+    """
+    Size-bounded, TTL-limited LRU store of gzip-compressed report JSON.
+    """
+    entry_suffix = ENTRY_SUFFIX
+
+    def __init__(self, store_dir: str, max_bytes: int = 1024 * 1024 * 1024,
+                 ttl: float = 7 * 24 * 3600, compress_level: int = 6,
+                 logger: Optional[logging.Logger] = None):
+        """
+        Initialize the store.
+
+        Args:
+            store_dir: Directory holding one file per report (created on demand)
+            max_bytes: Total compressed size limit; 0 disables the store
+            ttl: Seconds a report is kept after being stored; 0 keeps
+                reports until they are evicted for space
+            compress_level: gzip level (1-9)
+            logger: Logger instance (optional)
+        """
+        super().__init__(store_dir, max_bytes, ttl, logger)
+        self.compress_level = compress_level
+
+    def put(self, report_id: str, data: bytes) -> None:
+        """
+        Compress and store a report under its id, replacing any older one.
+
+        Args:
+            report_id: Report id
+            data: Report JSON bytes
+        """
+        if not self.enabled:
+            return
+        super().put(report_id, gzip.compress(data, self.compress_level, mtime=0))
+
+    def get_compressed(self, report_id: str) -> Optional[bytes]:
+        """
+        Look up a report without decompressing it.
+
+        Args:
+            report_id: Report id
+
+        Returns:
+            gzip-compressed report JSON, or None if it is not stored
+        """
+        return super().get(report_id)
+
+    def get(self, report_id: str) -> Optional[bytes]:
+        """
+        Look up a report.
+
+        Args:
+            report_id: Report id
+
+        Returns:
+            Report JSON bytes, or None if it is not stored
+        """
+        data = self.get_compressed(report_id)
+        return gzip.decompress(data) if data is not None else None
+
+    def contains(self, report_id: str) -> bool:
+        """Whether a report is stored (without counting it as a read)."""
+        return self.enabled and os.path.exists(self._path(report_id))
@@ -0,0 +1,94 @@
+"""
+Retention policy shared by the on-disk stores.
+
+Every store keeps one entry per file or directory and records on it when
+the entry was stored (mtime) and when it was last read (atime). Entries
+older than the retention TTL are dropped first; if the rest still exceeds
+the size quota, the least recently read ones go next.
+"""
+
+import os
+from typing import List, NamedTuple
+
+
+class Entry(NamedTuple):
+    """One stored entry as seen by the retention policy."""
+    path: str
+    size: int
+    stored_at: float
+    read_at: float
+
+
+def select_evictions(entries: List[Entry], max_bytes: int, ttl: float,
+                     now: float) -> List[Entry]:
+    """
+    Pick the entries to remove so the rest fit the policy.
+
+    Args:
+        entries: Current entries
+        max_bytes: Total size limit of the kept entries (0 = no limit)
+        ttl: Seconds an entry is kept after being stored (0 = no limit)
+        now: Current time
+
+    Returns:
+        Expired entries, then least recently read ones over the quota
+    """
+    live = []
+    doomed = []
+    for entry in entries:
+        expired = ttl > 0 and now - entry.stored_at > ttl
+        (doomed if expired else live).append(entry)
+
+    if max_bytes > 0:
+        total = sum(entry.size for entry in live)
+        live.sort(key=lambda e: e.read_at)
+        while live and total > max_bytes:
+            entry = live.pop(0)
+            total -= entry.size
+            doomed.append(entry)
+    return doomed
+
+
+def tree_size(path: str) -> int:
+    """Total size of the files below a directory (0 if it vanished)."""
+    size = 0
+    try:
+        with os.scandir(path) as it:
+            for entry in it:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        size += tree_size(entry.path)
+                    else:
+                        size += entry.stat(follow_symlinks=False).st_size
+                except FileNotFoundError:
+                    continue
+    except (FileNotFoundError, NotADirectoryError):
+        pass
+    return size
+
+
+def directory_entries(root: str) -> List[Entry]:
+    """
+    Entries for every subdirectory of root, sized recursively.
+
+    Args:
+        root: Directory holding one subdirectory per entry
+
+    Returns:
+        List of entries (empty if root does not exist)
+    """
+    entries = []
+    try:
+        with os.scandir(root) as it:
+            for entry in it:
+                if not entry.is_dir(follow_symlinks=False):
+                    continue
+                try:
+                    st = entry.stat(follow_symlinks=False)
+                except FileNotFoundError:
+                    continue
+                entries.append(Entry(entry.path, tree_size(entry.path),
+                                     st.st_mtime, st.st_atime))
+    except FileNotFoundError:
+        pass
+    return entries
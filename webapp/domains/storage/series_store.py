@@ -0,0 +1,203 @@
+"""
+Columnar store of full-resolution figure series.
+
+Reports only carry downsampled traces (serialization.Downsampler); the
+full arrays are kept here so the zoom endpoint can return any window at
+full resolution. Each report gets a directory holding one pair of .npy
+files per series (<id>.x.npy, <id>.y.npy), which are memory-mapped on
+read, so answering a zoom request only touches the pages of that window.
+Precomputed multi-column tables (e.g. the diskstats resolution pyramid)
+are stored alongside as uncompressed <name>.npz archives whose columns
+are read individually. The directory's mtime records when the report was
+stored (for the TTL) and its atime when it was last read (for LRU
+eviction).
+"""
+
+import logging
+import os
+import re
+import tempfile
+import time
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .store import RetentionStore
+
+_ID_RE = re.compile(r'^[A-Za-z0-9_-]+$')
+_TABLE_RE = re.compile(r'^[A-Za-z0-9_.-]+$')
+
+TABLE_SUFFIX = '.npz'
+
+Series = Tuple[np.ndarray, np.ndarray]
+
+
+class SeriesStore(RetentionStore):
+    """
+    Size-bounded, TTL-limited LRU store of per-report series on disk.
+    """
+    def __init__(self, store_dir: str, max_bytes: int = 1024 * 1024 * 1024,
+                 ttl: float = 7 * 24 * 3600,
+                 logger: Optional[logging.Logger] = None):
+        """
+        Initialize the store.
+
+        Args:
+            store_dir: Directory holding one subdirectory per report
+            max_bytes: Total size limit; 0 disables the store
+            ttl: Seconds a report's series stay valid after being stored;
+                0 keeps them until they are evicted for space
+            logger: Logger instance (optional)
+        """
+        super().__init__(store_dir, max_bytes, ttl, logger)
+        self.store_dir = store_dir
+
+    def _report_dir(self, report_id: str) -> str:
+        if not _ID_RE.match(report_id):
+            raise ValueError(f"Invalid report id: {report_id!r}")
+        return os.path.join(self.store_dir, report_id)
+
+    def _paths(self, report_id: str, series_id: str) -> Tuple[str, str]:
+        if not _ID_RE.match(series_id):
+            raise ValueError(f"Invalid series id: {series_id!r}")
+        base = os.path.join(self._report_dir(report_id), series_id)
+        return base + '.x.npy', base + '.y.npy'
+
+    def _table_path(self, report_id: str, table: str) -> str:
+        if not _TABLE_RE.match(table):
+            raise ValueError(f"Invalid table name: {table!r}")
+        return os.path.join(self._report_dir(report_id), table + TABLE_SUFFIX)
+
+    def put(self, report_id: str, series: Dict[str, Series]) -> None:
+        """
+        Store the full-resolution series of a report.
+
+        Series already on disk are skipped (ids are content-derived).
+
+        Args:
+            report_id: Report the series belong to
+            series: Mapping of series id to (x, y) arrays
+        """
+        if not self.enabled or not series:
+            return
+        report_dir = self._report_dir(report_id)
+        written = 0
+        try:
+            os.makedirs(report_dir, exist_ok=True)
+            for series_id, (x, y) in series.items():
+                for path, values in zip(self._paths(report_id, series_id), (x, y)):
+                    if os.path.exists(path):
+                        continue
+                    fd, tmp_path = tempfile.mkstemp(dir=report_dir, suffix='.tmp')
+                    try:
+                        with os.fdopen(fd, 'wb') as f:
+                            values = np.asarray(values)
+                            np.save(f, values, allow_pickle=False)
+                        os.replace(tmp_path, path)
+                        written += values.nbytes
+                    except BaseException:
+                        os.unlink(tmp_path)
+                        raise
+            os.utime(report_dir)
+        except (OSError, ValueError) as e:
+            self.logger.warning(f'series store write failed for {report_id}: {e}')
+            return
+        self._written(written)
+
+    def put_tables(self, report_id: str,
+                   tables: Dict[str, Dict[str, np.ndarray]]) -> None:
+        """
+        Store precomputed column tables of a report.
+
+        Args:
+            report_id: Report the tables belong to
+            tables: Mapping of table name to {column name: 1-d array}
+        """
+        if not self.enabled or not tables:
+            return
+        report_dir = self._report_dir(report_id)
+        written = 0
+        try:
+            os.makedirs(report_dir, exist_ok=True)
+            for table, columns in tables.items():
+                path = self._table_path(report_id, table)
+                fd, tmp_path = tempfile.mkstemp(dir=report_dir, suffix='.tmp')
+                try:
+                    with os.fdopen(fd, 'wb') as f:
+                        np.savez(f, **columns)
+                    os.replace(tmp_path, path)
+                    written += sum(np.asarray(v).nbytes for v in columns.values())
+                except BaseException:
+                    os.unlink(tmp_path)
+                    raise
+            os.utime(report_dir)
+        except (OSError, ValueError) as e:
+            self.logger.warning(f'series store write failed for {report_id}: {e}')
+            return
+        self._written(written)
+
+    def load_columns(self, report_id: str, table: str,
+                     columns: List[str]) -> Optional[Dict[str, np.ndarray]]:
+        """
+        Read some columns of a stored table.
+
+        Args:
+            report_id: Report the table belongs to
+            table: Table name
+            columns: Column names to read
+
+        Returns:
+            {column: array}, or None if the table or a column is not stored
+        """
+        if not self.enabled:
+            return None
+        report_dir = self._report_dir(report_id)
+        now = time.time()
+        try:
+            st = os.stat(report_dir)
+            if self._expired(st.st_mtime, now):
+                self._remove(report_dir)
+                return None
+            with np.load(self._table_path(report_id, table),
+                         allow_pickle=False) as npz:
+                if not set(columns) <= set(npz.files):
+                    return None
+                values = {column: npz[column] for column in columns}
+            os.utime(report_dir, (now, st.st_mtime))
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            self.logger.warning(f'series store read failed for {report_id}/{table}: {e}')
+            return None
+        return values
+
+    def load(self, report_id: str, series_id: str) -> Optional[Series]:
+        """
+        Memory-map a stored series.
+
+        Args:
+            report_id: Report the series belongs to
+            series_id: Series id from the trace's meta.downsampled.id
+
+        Returns:
+            (x, y) read-only arrays, or None if the series is not stored
+        """
+        if not self.enabled:
+            return None
+        report_dir = self._report_dir(report_id)
+        x_path, y_path = self._paths(report_id, series_id)
+        now = time.time()
+        try:
+            st = os.stat(report_dir)
+            if self._expired(st.st_mtime, now):
+                self._remove(report_dir)
+                return None
+            x = np.load(x_path, mmap_mode='r', allow_pickle=False)
+            y = np.load(y_path, mmap_mode='r', allow_pickle=False)
+            os.utime(report_dir, (now, st.st_mtime))
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            self.logger.warning(f'series store read failed for {report_id}/{series_id}: {e}')
+            return None
+        return x, y
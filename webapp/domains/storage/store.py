@@ -0,0 +1,124 @@
+"""
+Base class of the on-disk stores.
+
+Every store keeps one entry (a file or a directory) per key under its root
+directory and applies the retention policy of storage.retention to them.
+Scanning the root for eviction costs a stat of every stored file, so it
+is not done on every write: puts report how many bytes they wrote and
+eviction runs once enough has been written or enough time has passed
+since the last scan.
+"""
+
+import logging
+import os
+import shutil
+import threading
+import time
+from typing import Dict, List, Optional
+
+from .retention import Entry, directory_entries, select_evictions
+
+# Seconds between eviction scans triggered by writes
+EVICT_INTERVAL = 60
+
+# Fraction of max_bytes that may be written before an early eviction scan
+EVICT_WRITE_FRACTION = 0.05
+
+
+class RetentionStore:
+    """
+    Size-bounded, TTL-limited LRU store of entries under a directory.
+
+    Subclasses implement the entry layout and call _written() after each
+    write. An entry's mtime records when it was stored (for the TTL) and
+    its atime when it was last read (for LRU eviction).
+    """
+    def __init__(self, root: str, max_bytes: int, ttl: float,
+                 logger: Optional[logging.Logger] = None,
+                 evict_interval: float = EVICT_INTERVAL):
+        """
+        Initialize the store.
+
+        Args:
+            root: Directory holding the entries (created on demand)
+            max_bytes: Total size limit; 0 disables the store
+            ttl: Seconds an entry is kept after being stored; 0 keeps
+                entries until they are evicted for space
+            logger: Logger instance (optional)
+            evict_interval: Seconds between eviction scans triggered by
+                writes (0 scans after every write)
+        """
+        self.root = root
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.logger = logger or logging.getLogger(__name__)
+        self.evict_interval = evict_interval
+        self.evict_bytes = max(int(max_bytes * EVICT_WRITE_FRACTION), 1)
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._last_evict = 0.0
+        self._unscanned_bytes = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_bytes > 0
+
+    def _expired(self, stored_at: float, now: float) -> bool:
+        return self.ttl > 0 and now - stored_at > self.ttl
+
+    def _count(self, counter: str, n: int = 1) -> None:
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + n)
+
+    def _remove(self, path: str) -> bool:
+        """Delete one entry; False if it was already gone."""
+        try:
+            if os.path.isdir(path) and not os.path.islink(path):
+                shutil.rmtree(path)
+            else:
+                os.remove(path)
+        except FileNotFoundError:
+            return False
+        except OSError as e:
+            self.logger.warning(f'failed to remove {path}: {e}')
+            return False
+        self._count('evictions')
+        return True
+
+    def _entries(self) -> List[Entry]:
+        """Every stored entry (default: one subdirectory per entry)."""
+        return directory_entries(self.root)
+
+    def _written(self, nbytes: int) -> None:
+        """Record a write and evict when a scan is due."""
+        now = time.monotonic()
+        with self._lock:
+            self._unscanned_bytes += nbytes
+            due = (self._unscanned_bytes >= self.evict_bytes
+                   or now - self._last_evict >= self.evict_interval)
+            if due:
+                self._unscanned_bytes = 0
+                self._last_evict = now
+        if due:
+            self.evict()
+
+    def evict(self) -> int:
+        """
+        Drop expired entries, then least recently read ones until the
+        store fits in max_bytes.
+
+        Returns:
+            Number of entries removed
+        """
+        doomed = select_evictions(self._entries(), self.max_bytes, self.ttl,
+                                  time.time())
+        return sum(self._remove(entry.path) for entry in doomed)
+
+    def stats(self) -> Dict[str, int]:
+        """Eviction counter for this process plus on-disk usage."""
+        entries = self._entries()
+        return {
+            'evictions': self.evictions,
+            'entries': len(entries),
+            'bytes': sum(entry.size for entry in entries),
+        }
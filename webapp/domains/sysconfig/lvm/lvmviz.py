@@ -6,6 +6,8 @@ LVM visualization processor.
 # compatibility. The class-based processor is not used in the current
 # implementation.
 
+import os
+
 
 def parse_pvs(filename='pvs.txt'):
     """Legacy function wrapper for backward compatibility."""
@@ -52,8 +54,11 @@ def parse_lvs(filename='lvs.txt'):
     return lvs
 
 
-def create_graph(pvs, vgs, lvs):
-    """Legacy function wrapper for backward compatibility."""
+def create_graph(pvs, vgs, lvs, data_dir='.'):
+    """Legacy function wrapper for backward compatibility.
+
+    lsblk/df/dev-mapper side files are read from data_dir.
+    """
     from graphviz import Digraph
     import re
 
@@ -197,9 +202,10 @@ def create_graph(pvs, vgs, lvs):
         )
 
     svg_list = []
-    lsblk_data = parse_lsblk()
-    df_data = parse_df()
-    dev_mapper_data = parse_dev_mapper()
+    lsblk_data = parse_lsblk(os.path.join(data_dir, 'lsblk-f.txt'))
+    df_data = parse_df(os.path.join(data_dir, 'df-h.txt'))
+    dev_mapper_data = parse_dev_mapper(
+        os.path.join(data_dir, 'ls-l-dev-mapper.txt'))
 
     for vg, vg_size, vg_free in vgs:
         relevant_pvs = [(pv, size, free)
@@ -16,14 +16,17 @@ class SystemInfoProcessor:
     This class doesn't inherit from BaseDataProcessor because it doesn't
     process a single input file - it reads from multiple system files.
     """
-    def __init__(self, logger: Optional[logging.Logger] = None):
+    def __init__(self, logger: Optional[logging.Logger] = None,
+                 data_dir: str = "."):
         """
         Initialize the system info processor.
 
         Args:
             logger: Logger instance (optional)
+            data_dir: Capture directory holding the system files
         """
         self.logger = logger or self._setup_logger()
+        self.data_dir = data_dir
 
     def _setup_logger(self) -> logging.Logger:
         """Setup logger for this processor."""
@@ -50,58 +53,62 @@ class SystemInfoProcessor:
         """
         try:
             system_info = {}
+
+            def path(name: str) -> str:
+                return os.path.join(self.data_dir, name)
+
             # Runtime information
-            if os.path.exists("info.txt"):
-                with open("info.txt", "r") as file:
+            if os.path.exists(path("info.txt")):
+                with open(path("info.txt"), "r") as file:
                     system_info['runtime_info'] = file.read()
             # OS release information
-            if os.path.exists("os-release"):
-                with open("os-release", "r") as file:
+            if os.path.exists(path("os-release")):
+                with open(path("os-release"), "r") as file:
                     system_info['os_release'] = file.read()
             # Hardware information
-            if os.path.exists("lshw.txt"):
-                with open("lshw.txt", "r") as file:
+            if os.path.exists(path("lshw.txt")):
+                with open(path("lshw.txt"), "r") as file:
                     system_info['hardware_info'] = file.read()
             # DMI decode information
-            if os.path.exists("dmidecode.txt"):
-                with open("dmidecode.txt", "r") as file:
+            if os.path.exists(path("dmidecode.txt")):
+                with open(path("dmidecode.txt"), "r") as file:
                     system_info['dmi_info'] = file.read()
             # Storage information
-            if os.path.exists("lsscsi.txt"):
-                with open("lsscsi.txt", "r") as file:
+            if os.path.exists(path("lsscsi.txt")):
+                with open(path("lsscsi.txt"), "r") as file:
                     system_info['scsi_info'] = file.read()
-            if os.path.exists("lsblk-f.txt"):
-                with open("lsblk-f.txt", "r") as file:
+            if os.path.exists(path("lsblk-f.txt")):
+                with open(path("lsblk-f.txt"), "r") as file:
                     system_info['block_devices'] = file.read()
-            if os.path.exists("df-h.txt"):
-                with open("df-h.txt", "r") as file:
+            if os.path.exists(path("df-h.txt")):
+                with open(path("df-h.txt"), "r") as file:
                     system_info['disk_usage'] = file.read()
-            if os.path.exists("ls-l-dev-mapper.txt"):
-                with open("ls-l-dev-mapper.txt", "r") as file:
+            if os.path.exists(path("ls-l-dev-mapper.txt")):
+                with open(path("ls-l-dev-mapper.txt"), "r") as file:
                     system_info['device_mapper'] = file.read()
-            if os.path.exists("parted-l.txt"):
-                with open("parted-l.txt", "r") as file:
+            if os.path.exists(path("parted-l.txt")):
+                with open(path("parted-l.txt"), "r") as file:
                     system_info['partition_info'] = file.read()
             # CPU and memory information
-            if os.path.exists("lscpu.txt"):
-                with open("lscpu.txt", "r") as file:
+            if os.path.exists(path("lscpu.txt")):
+                with open(path("lscpu.txt"), "r") as file:
                     system_info['cpu_info'] = file.read()
-            if os.path.exists("meminfo.txt"):
-                with open("meminfo.txt", "r") as file:
+            if os.path.exists(path("meminfo.txt")):
+                with open(path("meminfo.txt"), "r") as file:
                     system_info['memory_info'] = file.read()
             # Kernel information
-            if os.path.exists("sysctl.txt"):
-                with open("sysctl.txt", "r") as file:
+            if os.path.exists(path("sysctl.txt")):
+                with open(path("sysctl.txt"), "r") as file:
                     system_info['kernel_params'] = file.read()
-            if os.path.exists("lsmod.txt"):
-                with open("lsmod.txt", "r") as file:
+            if os.path.exists(path("lsmod.txt")):
+                with open(path("lsmod.txt"), "r") as file:
                     system_info['kernel_modules'] = file.read()
             # Security information
-            if os.path.exists("apparmor_status.txt"):
-                with open("apparmor_status.txt", "r") as file:
+            if os.path.exists(path("apparmor_status.txt")):
+                with open(path("apparmor_status.txt"), "r") as file:
                     system_info['apparmor_status'] = file.read()
-            elif os.path.exists("sestatus.txt"):
-                with open("sestatus.txt", "r") as file:
+            elif os.path.exists(path("sestatus.txt")):
+                with open(path("sestatus.txt"), "r") as file:
                     system_info['selinux_status'] = file.read()
             return system_info
         except Exception as e:
@@ -2,9 +2,24 @@
 Script Execution Domain
 
 This domain handles script execution, environment setup, and process management
-for the web application.
+for the web application, including the preloaded worker pool that runs the
+report generator in-process.
 """
 
+from .report_pool import (
+    ReportGenerationError,
+    ReportPoolError,
+    ReportTimeout,
+    ReportWorkerCrashed,
+    ReportWorkerPool,
+)
 from .script_executor import ScriptExecutor
 
-__all__ = ['ScriptExecutor']
+__all__ = [
+    'ReportGenerationError',
+    'ReportPoolError',
+    'ReportTimeout',
+    'ReportWorkerCrashed',
+    'ReportWorkerPool',
+    'ScriptExecutor',
+]
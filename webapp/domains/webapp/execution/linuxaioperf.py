@@ -8,6 +8,7 @@ Version: 2.3.0
 Date: 15/05/2025
 """
 
+import argparse
 import os
 import logging
 import datetime
@@ -60,18 +61,25 @@ class PerformanceReportGenerator:
     Main class for generating Linux AIO performance reports.
     """
 
-    def __init__(self, logger: Optional[logging.Logger] = None):
+    def __init__(self, logger: Optional[logging.Logger] = None,
+                 data_dir: str = '.'):
         self.logger = logger or setup_logging()
+        self.data_dir = data_dir
         self.processors = {}
         self.results = {}
 
+    def _data_path(self, file_name: str) -> str:
+        """Resolve a capture file name against the data directory."""
+        return os.path.join(self.data_dir, file_name)
+
     def process_cpu_data(self) -> List[Any]:
         """Process CPU performance data."""
         self.logger.info("Processing CPU Data")
 
         try:
             processor = ProcessorFactory.create_processor(
-                'cpu', 'mpstat.txt', logger=self.logger
+                'cpu', self._data_path('mpstat.txt'),
+                logger=self.logger
             )
             df, figures = processor.process()
             self.results['cpu'] = {'data': df, 'figures': figures}
@@ -87,7 +95,8 @@ class PerformanceReportGenerator:
         # Process per-device disk data
         try:
             processor = ProcessorFactory.create_processor(
-                'diskiostat', 'iostat-data.out', logger=self.logger
+                'diskiostat', self._data_path('iostat-data.out'),
+                logger=self.logger
             )
             df, figures = processor.process()
             self.results['disk_per_device'] = {'data': df, 'figures': figures}
@@ -101,7 +110,8 @@ class PerformanceReportGenerator:
         # Process per-metric disk data
         try:
             processor = ProcessorFactory.create_processor(
-                'diskmetrics', 'iostat-data.out', logger=self.logger
+                'diskmetrics', self._data_path('iostat-data.out'),
+                logger=self.logger
             )
             df, figures = processor.process()
             self.results['disk_per_metric'] = {'data': df, 'figures': figures}
@@ -116,14 +126,15 @@ class PerformanceReportGenerator:
         """Process high-resolution disk statistics."""
         self.logger.info("Processing High Resolution Diskstats Data")
 
-        if not os.path.exists("diskstats_log.txt"):
+        if not os.path.exists(self._data_path("diskstats_log.txt")):
             self.logger.warning(
                 "No diskstats_log.txt found, skipping diskstats")
             return []
 
         try:
             processor = ProcessorFactory.create_processor(
-                'diskhighres', 'diskstats_log.txt', logger=self.logger
+                'diskhighres', self._data_path('diskstats_log.txt'),
+                logger=self.logger
             )
             df, figures = processor.process()
             self.results['diskstats'] = {'data': df, 'figures': figures}
@@ -138,7 +149,8 @@ class PerformanceReportGenerator:
 
         try:
             processor = ProcessorFactory.create_processor(
-                'memory', 'vmstat-data.out', logger=self.logger
+                'memory', self._data_path('vmstat-data.out'),
+                logger=self.logger
             )
             df, figures = processor.process()
             self.results['memory'] = {'data': df, 'figures': figures}
@@ -151,13 +163,14 @@ class PerformanceReportGenerator:
         """Process network performance data."""
         self.logger.info("Processing Network Data")
 
-        if not os.path.exists("sarnetwork.txt"):
+        if not os.path.exists(self._data_path("sarnetwork.txt")):
             self.logger.warning("No sarnetwork.txt found, skipping network")
             return []
 
         try:
             processor = ProcessorFactory.create_processor(
-                'network', 'sarnetwork.txt', logger=self.logger
+                'network', self._data_path('sarnetwork.txt'),
+                logger=self.logger
             )
             df, figures = processor.process()
             self.results['network'] = {'data': df, 'figures': figures}
@@ -179,7 +192,8 @@ class PerformanceReportGenerator:
         try:
             generate_report(
                 mpstat_figs, iostat_pd_figs, iostat_pm_figs,
-                vmstat_figs, sarnet_figs, diskstats_figs
+                vmstat_figs, sarnet_figs, diskstats_figs,
+                data_dir=self.data_dir
             )
             self.logger.info("HTML report generated successfully")
         except Exception as e:
@@ -213,8 +227,13 @@ class PerformanceReportGenerator:
 
 def main():
     """Main function."""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('data_dir', nargs='?', default='.',
+                        help='Directory holding the capture files; the '
+                             'report is written there (default: .)')
+    args = parser.parse_args()
     logger = setup_logging()
-    generator = PerformanceReportGenerator(logger)
+    generator = PerformanceReportGenerator(logger, data_dir=args.data_dir)
     generator.run()
 
 
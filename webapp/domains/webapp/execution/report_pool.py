@@ -0,0 +1,233 @@
+"""
+Persistent worker pool for in-process report generation.
+
+Launching `python3 linuxaioperf.py` per upload makes every report pay for
+importing pandas, numpy, plotly and the processors, which dominates the
+latency of small captures. Here PerformanceReportGenerator runs in a fixed
+set of long-lived worker processes started from a forkserver that has
+imported the whole processing stack once, so each worker starts warm and
+keeps its imports between jobs.
+
+Each job runs in its own process, away from the web server: a job that
+exceeds its timeout gets its worker killed, a worker that crashes
+(segfault, OOM kill) only fails its own job, and either way a fresh worker
+takes its place. Workers are also recycled after max_jobs jobs to bound
+memory growth. Log records from the workers are forwarded over a queue and
+handled by the pool's logger in the parent process.
+"""
+
+import logging
+import logging.handlers
+import multiprocessing
+import queue
+import threading
+from typing import List, Optional
+
+from domains.factory import ProcessorFactory
+
+# Modules the forkserver imports once, before forking any worker (the
+# processor modules are added from the factory's registry)
+PRELOAD_MODULES = ['pandas', 'plotly.graph_objects',
+                   'domains.webapp.execution.linuxaioperf']
+
+# Logger name the generator and processors log to inside a worker
+WORKER_LOGGER = 'linuxaioperf'
+
+
+class ReportPoolError(Exception):
+    """Base exception for jobs the pool could not complete."""
+    pass
+
+
+class ReportTimeout(ReportPoolError):
+    """Raised when a report job exceeds its timeout."""
+    pass
+
+
+class ReportWorkerCrashed(ReportPoolError):
+    """Raised when a worker process dies while running a job."""
+    pass
+
+
+class ReportGenerationError(ReportPoolError):
+    """Raised when the report generator fails inside a worker."""
+    pass
+
+
+def _worker_main(conn, log_queue) -> None:
+    """Worker process loop: build a report for every data dir received."""
+    logger = logging.getLogger(WORKER_LOGGER)
+    logger.handlers = [logging.handlers.QueueHandler(log_queue)]
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+
+    from domains.webapp.execution.linuxaioperf import PerformanceReportGenerator
+
+    while True:
+        try:
+            data_dir = conn.recv()
+        except (EOFError, KeyboardInterrupt):
+            return
+        if data_dir is None:
+            return
+        try:
+            PerformanceReportGenerator(logger, data_dir=data_dir).run()
+            conn.send(None)
+        except Exception as e:
+            conn.send(f'{type(e).__name__}: {e}')
+
+
+class _Worker:
+    """One worker process and the parent's end of its pipe."""
+    def __init__(self, context, log_queue):
+        self.conn, child_conn = context.Pipe()
+        self.process = context.Process(target=_worker_main,
+                                       args=(child_conn, log_queue),
+                                       daemon=True)
+        self.process.start()
+        child_conn.close()
+        self.jobs = 0
+
+    def stop(self, timeout: float = 5) -> None:
+        """Ask the worker to exit, killing it if it does not."""
+        try:
+            self.conn.send(None)
+        except (OSError, ValueError):
+            pass
+        self.process.join(timeout)
+        self.kill()
+
+    def kill(self) -> None:
+        if self.process.is_alive():
+            self.process.kill()
+        self.process.join()
+        self.conn.close()
+
+
+class ReportWorkerPool:
+    """
+    Fixed-size pool of preloaded processes running report jobs.
+    """
+    def __init__(self, workers: int = 2, timeout: float = 600,
+                 max_jobs: int = 100,
+                 logger: Optional[logging.Logger] = None):
+        """
+        Initialize the pool (no processes are started until start()).
+
+        Args:
+            workers: Number of worker processes
+            timeout: Default seconds a job may run before its worker is
+                killed (0 = no limit)
+            max_jobs: Jobs a worker runs before it is replaced (0 = never)
+            logger: Logger handling the workers' log records (optional)
+        """
+        self.workers = max(workers, 1)
+        self.timeout = timeout
+        self.max_jobs = max_jobs
+        self.logger = logger or logging.getLogger(__name__)
+        methods = multiprocessing.get_all_start_methods()
+        self._context = multiprocessing.get_context(
+            'forkserver' if 'forkserver' in methods else 'spawn')
+        self._idle: 'queue.Queue[_Worker]' = queue.Queue()
+        self._all: List[_Worker] = []
+        self._lock = threading.Lock()
+        self._log_queue = None
+        self._log_thread: Optional[threading.Thread] = None
+        self._started = False
+
+    def start(self) -> None:
+        """Start the forkserver, the workers and the log forwarder."""
+        with self._lock:
+            if self._started:
+                return
+            if self._context.get_start_method() == 'forkserver':
+                self._context.set_forkserver_preload(
+                    PRELOAD_MODULES + ProcessorFactory.modules())
+            self._log_queue = self._context.Queue()
+            self._log_thread = threading.Thread(
+                target=self._forward_logs, name='report-pool-logs', daemon=True)
+            self._log_thread.start()
+            for _ in range(self.workers):
+                self._idle.put(self._spawn())
+            self._started = True
+        self.logger.info(f'Report worker pool started with {self.workers} '
+                         f'worker(s) ({self._context.get_start_method()})')
+
+    def _spawn(self) -> _Worker:
+        worker = _Worker(self._context, self._log_queue)
+        self._all.append(worker)
+        return worker
+
+    def _replace(self, worker: _Worker, graceful: bool = False) -> _Worker:
+        """Stop (or kill) a worker and start a fresh one in its place."""
+        if graceful:
+            worker.stop()
+        else:
+            worker.kill()
+        with self._lock:
+            if worker in self._all:
+                self._all.remove(worker)
+            return self._spawn()
+
+    def _forward_logs(self) -> None:
+        while True:
+            try:
+                record = self._log_queue.get()
+            except (EOFError, OSError):
+                return
+            if record is None:
+                return
+            self.logger.handle(record)
+
+    def run(self, data_dir: str, timeout: Optional[float] = None) -> None:
+        """
+        Generate the report for a capture directory in a worker.
+
+        Blocks until a worker is free and the job has finished.
+
+        Args:
+            data_dir: Directory holding the capture files; the report is
+                written there
+            timeout: Seconds the job may run (default: the pool's)
+
+        Raises:
+            ReportTimeout: If the job ran out of time (its worker is killed)
+            ReportWorkerCrashed: If the worker died during the job
+            ReportGenerationError: If the generator raised
+        """
+        self.start()
+        timeout = self.timeout if timeout is None else timeout
+        worker = self._idle.get()
+        try:
+            try:
+                worker.conn.send(data_dir)
+                if not worker.conn.poll(timeout or None):
+                    worker = self._replace(worker)
+                    raise ReportTimeout(
+                        f'Report for {data_dir} timed out after {timeout}s')
+                error = worker.conn.recv()
+            except (EOFError, OSError) as e:
+                worker.kill()
+                code = worker.process.exitcode
+                worker = self._replace(worker)
+                raise ReportWorkerCrashed(
+                    f'Report worker died (exit code {code}) '
+                    f'while processing {data_dir}') from e
+            worker.jobs += 1
+            if self.max_jobs and worker.jobs >= self.max_jobs:
+                worker = self._replace(worker, graceful=True)
+            if error is not None:
+                raise ReportGenerationError(error)
+        finally:
+            self._idle.put(worker)
+
+    def shutdown(self) -> None:
+        """Stop every worker and the log forwarder."""
+        with self._lock:
+            workers, self._all = self._all, []
+            started, self._started = self._started, False
+        for worker in workers:
+            worker.stop()
+        if started:
+            self._log_queue.put(None)
+            self._log_thread.join(5)
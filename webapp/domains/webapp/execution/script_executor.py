@@ -4,8 +4,18 @@ Script Executor for handling script execution and process management.
 
 import os
 import subprocess
+import sys
 import logging
-from typing import Optional
+from typing import Dict, List, Optional
+
+from .report_pool import ReportPoolError, ReportWorkerPool
+
+# Directory the domains package is imported from (the webapp root)
+APP_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(
+    os.path.dirname(os.path.abspath(__file__)))))
+
+# Module run by the subprocess execution mode
+GENERATOR_MODULE = 'domains.webapp.execution.linuxaioperf'
 
 
 class ScriptExecutor:
@@ -13,35 +23,41 @@ class ScriptExecutor:
     Handles script execution, environment setup, and process management.
     """
 
-    def __init__(self, logger: Optional[logging.Logger] = None):
+    def __init__(self, logger: Optional[logging.Logger] = None,
+                 pool: Optional[ReportWorkerPool] = None):
+        """
+        Initialize the executor.
+
+        Args:
+            logger: Logger instance (optional)
+            pool: Worker pool that generates reports in-process; without
+                one, the generator is launched as a subprocess
+        """
         self.logger = logger or logging.getLogger(__name__)
+        self.pool = pool
 
-    def execute_script(self, script_path: str, working_dir: str) -> int:
+    def _run(self, command: List[str], working_dir: str,
+             env: Optional[Dict[str, str]] = None) -> int:
         """
-        Execute a script in the specified working directory.
+        Run a command in working_dir, streaming its output.
 
         Args:
-            script_path: Path to script to execute
-            working_dir: Working directory for execution
+            command: Program and arguments
+            working_dir: Working directory of the child process
+            env: Environment of the child process (default: inherited)
 
         Returns:
-            Exit code of the script execution
+            Exit code of the command
         """
-        self.logger.info(f"Executing script: {script_path}")
-        self.logger.info(f"Working directory: {working_dir}")
-
-        # Change to working directory
-        original_dir = os.getcwd()
-        os.chdir(working_dir)
-
         try:
-            # Execute the script with real-time output streaming
+            # Execute the command with real-time output streaming
             process = subprocess.Popen(
-                ['python3', script_path],
+                command,
                 stdout=subprocess.PIPE,
                 stderr=subprocess.STDOUT,
                 text=True,
                 cwd=working_dir,
+                env=env,
                 bufsize=1,
                 universal_newlines=True
             )
@@ -69,22 +85,51 @@ class ScriptExecutor:
         except Exception as e:
             self.logger.error(f"Failed to execute script: {e}")
             return 1
-        finally:
-            # Restore original directory
-            os.chdir(original_dir)
 
-    def execute_linuxaioperf(self, working_dir: str) -> int:
+    def execute_script(self, script_path: str, working_dir: str) -> int:
         """
-        Execute the linuxaioperf.py script.
+        Execute a script in the specified working directory.
 
         Args:
+            script_path: Path to script to execute
             working_dir: Working directory for execution
 
         Returns:
             Exit code of the script execution
         """
-        script_path = os.path.join(working_dir, 'linuxaioperf.py')
-        return self.execute_script(script_path, working_dir)
+        self.logger.info(f"Executing script: {script_path}")
+        self.logger.info(f"Working directory: {working_dir}")
+        return self._run(['python3', script_path], working_dir)
+
+    def execute_linuxaioperf(self, working_dir: str) -> int:
+        """
+        Generate the report for the capture in working_dir, in the worker
+        pool when there is one, else by running the installed report
+        generator as a subprocess with working_dir as its data directory.
+
+        Args:
+            working_dir: Directory holding the capture files; the report
+                is written there
+
+        Returns:
+            Exit code of the script execution (0 on success)
+        """
+        if self.pool is not None:
+            try:
+                self.pool.run(working_dir)
+            except ReportPoolError as e:
+                self.logger.error(f"Report generation failed: {e}")
+                return 1
+            self.logger.info("Report generated successfully")
+            return 0
+        self.logger.info(f"Generating report for: {working_dir}")
+        # The generator is imported from the application tree, not from a
+        # copy inside the upload directory
+        env = dict(os.environ)
+        env['PYTHONPATH'] = os.pathsep.join(
+            filter(None, [APP_ROOT, env.get('PYTHONPATH')]))
+        return self._run([sys.executable, '-m', GENERATOR_MODULE,
+                          os.path.abspath(working_dir)], working_dir, env)
 
     def check_script_exists(self, script_path: str) -> bool:
         """
@@ -3,10 +3,12 @@ File Manager for handling file upload, extraction, and management operations.
 """
 
 import os
-import tarfile
 import shutil
+import tarfile
 import logging
-from typing import Optional, Tuple
+from typing import List, Optional, Tuple
+
+from domains.ingest import extract_capture
 
 
 class FileManager:
@@ -34,125 +36,60 @@ class FileManager:
         self.logger.info(f"Created unique directory: {unique_dir}")
         return unique_id, unique_dir
 
-    def save_uploaded_file(self, uploaded_file, unique_dir: str) -> str:
+    def extract_upload(self, uploaded_file, unique_dir: str) -> List[str]:
         """
-        Save uploaded file to unique directory.
+        Extract the uploaded capture archive straight from the upload stream.
+
+        The tarball itself is never written to disk: members are read in a
+        single forward pass, the '*_linuxaioperfcheck/' prefix (or the
+        archive's only top-level directory) is dropped from their paths and
+        the tar 'data' filter is applied, so the capture files land flat in
+        unique_dir.
 
         Args:
             uploaded_file: Flask uploaded file object
-            unique_dir: Directory to save the file
+            unique_dir: Directory to extract the capture files into
 
         Returns:
-            Path to saved file
-        """
-        tar_path = os.path.join(unique_dir, uploaded_file.filename)
-        uploaded_file.save(tar_path)
-        self.logger.info(f"Saved uploaded file: {tar_path}")
-        return tar_path
-
-    def extract_tarfile(self, tar_path: str, extract_dir: str) -> None:
-        """
-        Extract tarfile to specified directory.
-
-        Args:
-            tar_path: Path to tarfile
-            extract_dir: Directory to extract to
+            Capture-relative names of the extracted files
 
         Raises:
-            tarfile.ReadError: If tarfile is corrupted or invalid
+            tarfile.TarError: If the upload is not a valid .tar.gz archive
         """
         try:
-            with tarfile.open(tar_path, 'r:gz') as tar_ref:
-                tar_ref.extractall(extract_dir)
-                self.logger.info(f"Extracted tarfile to: {extract_dir}")
-        except tarfile.ReadError as e:
+            extracted = extract_capture(uploaded_file.stream, unique_dir)
+        except tarfile.TarError as e:
             self.logger.error(f"Failed to extract tarfile: {e}")
             raise
+        self.logger.info(
+            f"Extracted {len(extracted)} capture files to: {unique_dir}")
+        return extracted
 
-    def reorganize_extracted_files(self, unique_dir: str) -> None:
-        """
-        Reorganize extracted files by moving contents from subdirectories.
-
-        Args:
-            unique_dir: Directory containing extracted files
-        """
-        os.chdir(unique_dir)
-        os.system('mv *_linuxaioperfcheck/* .')
-        self.logger.info("Reorganized extracted files")
-
-    def copy_script_file(self, source_base: str, unique_dir: str) -> str:
-        """
-        Copy the main script to the processing directory.
-
-        Args:
-            source_base: Base source directory
-            unique_dir: Destination directory
-
-        Returns:
-            Path to copied script
+    def process_upload(self, uploaded_file,
+                       base_path: str) -> Tuple[str, str]:
         """
-        script_path = os.path.join(
-            source_base, 'domains', 'webapp', 'execution', 'linuxaioperf.py')
-        script_dest = os.path.join(unique_dir, 'linuxaioperf.py')
-        shutil.copyfile(script_path, script_dest)
-        self.logger.info(f"Copied script to: {script_dest}")
-        return script_dest
-
-    def copy_domain_directories(self, source_base: str,
-                                unique_dir: str) -> None:
-        """
-        Copy core and domains directories to processing directory.
-
-        Args:
-            source_base: Base source directory
-            unique_dir: Destination directory
-        """
-        # Copy core directory
-        core_path = os.path.join(source_base, 'core')
-        core_dest = os.path.join(unique_dir, 'core')
-        if os.path.exists(core_path):
-            shutil.copytree(core_path, core_dest)
-            self.logger.info("Copied core directory")
-
-        # Copy domains directory
-        domains_path = os.path.join(source_base, 'domains')
-        domains_dest = os.path.join(unique_dir, 'domains')
-        if os.path.exists(domains_path):
-            shutil.copytree(domains_path, domains_dest)
-            self.logger.info("Copied domains directory")
-
-    def process_upload(self, uploaded_file, base_path: str,
-                       source_base: str) -> Tuple[str, str]:
-        """
-        Complete file processing workflow.
+        Complete file processing workflow. The unique directory ends up
+        holding only capture data; the report generator runs from the
+        installed code against it.
 
         Args:
             uploaded_file: Flask uploaded file object
             base_path: Base path for unique directories
-            source_base: Base path for source files
 
         Returns:
             Tuple of (unique_id, unique_dir)
 
         Raises:
-            tarfile.ReadError: If uploaded file is not a valid tarfile
+            tarfile.TarError: If uploaded file is not a valid tarfile
         """
         # Create unique directory
         unique_id, unique_dir = self.create_unique_directory(base_path)
 
-        # Save uploaded file
-        tar_path = self.save_uploaded_file(uploaded_file, unique_dir)
-
-        # Extract tarfile
-        self.extract_tarfile(tar_path, unique_dir)
-
-        # Reorganize files
-        self.reorganize_extracted_files(unique_dir)
-
-        # Copy script
-        self.copy_script_file(source_base, unique_dir)
-
-        # Copy domain directories
-        self.copy_domain_directories(source_base, unique_dir)
+        # Extract the capture from the upload stream
+        try:
+            self.extract_upload(uploaded_file, unique_dir)
+        except BaseException:
+            shutil.rmtree(unique_dir, ignore_errors=True)
+            raise
 
         return unique_id, unique_dir
@@ -0,0 +1,11 @@
+"""
+gunicorn settings, read from the working directory (/app in the image).
+"""
+
+
+def post_worker_init(worker):
+    # Take the report queue and start the background services as the worker
+    # boots, so a worker that cannot own the queue (WORKERS > 1) fails to
+    # boot and stops the server instead of refusing every upload
+    from app import start_background_services
+    start_background_services()